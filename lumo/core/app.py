@@ -1,6 +1,8 @@
 from flask import Flask, render_template, jsonify, g, request
 from .extensions import db, login_manager, csrf, limiter, compress
 from ..services.tmdb_service import TMDBService
+from ..services.refresh_scheduler import CacheRefreshScheduler
+from ..web.template_cache import FragmentCacheExtension
 from flask_login import current_user
 from flask_talisman import Talisman
 from flask_wtf.csrf import CSRFError
@@ -160,14 +162,31 @@ def _wire_sql_observability(app):
     app.extensions["slow_query_hooks_registered"] = True
 
 
-def _startup_tmdb_warmup(app):
-    """Run TMDB warmup at startup with lock/cooldown to avoid duplicate work."""
+# Blueprints whose views fetch from TMDB and get a per-request TMDB budget.
+TMDB_BUDGET_BLUEPRINTS = frozenset({"main", "movies", "users"})
+
+
+def _run_refresh_task(app, task):
+    """Run one refresh task against TMDB; raise if it did not actually refresh anything."""
+    with app.app_context():
+        # Re-fetch from TMDB even though the entry is still fresh in cache.
+        g.tmdb_force_refresh = True
+        result = task.fn()
+        # Service calls swallow TMDB failures; report them so the task is retried next tick.
+        if getattr(g, "tmdb_degraded", False):
+            raise RuntimeError("TMDB degraded during refresh")
+        if not result:
+            raise RuntimeError("TMDB returned no data")
+
+
+def _start_tmdb_refresh_scheduler(app):
+    """Keep the TMDB warm set fresh with a leader-elected background refresher."""
     if not app.config.get("TMDB_WARMUP_ON_STARTUP", True):
-        app.logger.info("TMDB startup warmup disabled")
+        app.logger.info("TMDB refresh scheduler disabled")
         return
 
     if not app.config.get("TMDB_API_KEY") or app.config.get("TMDB_API_KEY") == "YOUR_TMDB_API_KEY_HERE":
-        app.logger.info("TMDB startup warmup skipped: TMDB API key not configured")
+        app.logger.info("TMDB refresh scheduler skipped: TMDB API key not configured")
         return
 
     # Skip Flask reloader parent process to avoid duplicate startup work in debug mode.
@@ -176,55 +195,63 @@ def _startup_tmdb_warmup(app):
 
     instance_base_dir = os.environ.get("LUMO_DESKTOP_DATA_DIR") or str(Path(__file__).resolve().parents[2])
     instance_dir = Path(instance_base_dir) / "instance"
-    instance_dir.mkdir(parents=True, exist_ok=True)
 
-    lock_file = instance_dir / "tmdb_warmup.lock"
-    state_file = instance_dir / "tmdb_warmup.last"
-    now_ts = time.time()
-    cooldown = int(app.config.get("TMDB_WARMUP_COOLDOWN_SECONDS", 900) or 900)
+    profile = app.config.get("TMDB_WARMUP_PROFILE", "quick")
 
-    if state_file.exists():
-        try:
-            last_ts = float(state_file.read_text(encoding="utf-8").strip() or "0")
-            if now_ts - last_ts < cooldown:
-                app.logger.info("TMDB startup warmup skipped: cooldown active")
-                return
-        except Exception:
-            pass
+    def tasks_factory():
+        with app.app_context():
+            return TMDBService.refresh_tasks(
+                profile=profile,
+                genre_count=app.config.get("TMDB_WARMUP_GENRE_COUNT", 3),
+                genre_pages=app.config.get("TMDB_REFRESH_GENRE_PAGES", 1),
+                hot_keys=app.config.get("TMDB_PREWARM_HOT_KEYS", 50),
+                hot_min_score=app.config.get("TMDB_PREWARM_MIN_SCORE", 3),
+            )
 
-    try:
-        fd = os.open(str(lock_file), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
-        with os.fdopen(fd, "w", encoding="utf-8") as handle:
-            handle.write(str(now_ts))
-    except FileExistsError:
-        app.logger.info("TMDB startup warmup skipped: another process is warming cache")
-        return
+    with app.app_context():
+        TMDBService.init_cache()
+        scheduler = CacheRefreshScheduler(
+            tasks_factory,
+            lambda task: _run_refresh_task(app, task),
+            state_dir=instance_dir,
+            redis_client=TMDBService.cache.redis_client,
+            tick_seconds=app.config.get("TMDB_REFRESH_TICK_SECONDS", 60),
+            lead_seconds=app.config.get("TMDB_REFRESH_LEAD_SECONDS", 600),
+            max_workers=app.config.get("TMDB_REFRESH_SCHEDULER_WORKERS", 3),
+            access_tracker=TMDBService.cache.access,
+        )
+    app.extensions["tmdb_refresh_scheduler"] = scheduler
 
-    def run_warmup():
+    if app.config.get("TMDB_WARMUP_BLOCKING", False):
         try:
-            with app.app_context():
-                TMDBService.warm_cache(
-                    profile=app.config.get("TMDB_WARMUP_PROFILE", "quick"),
-                    genre_count=app.config.get("TMDB_WARMUP_GENRE_COUNT", 3),
-                )
-                state_file.write_text(str(time.time()), encoding="utf-8")
+            scheduler.run_once()
         except Exception as exc:
-            app.logger.warning("TMDB startup warmup failed: %s", exc)
-        finally:
-            try:
-                if lock_file.exists():
-                    lock_file.unlink()
-            except Exception:
-                pass
+            app.logger.warning("TMDB startup refresh failed: %s", exc)
+    scheduler.start()
+    app.logger.info(
+        "TMDB refresh scheduler started (profile=%s, tick=%ss, lead=%ss)",
+        profile,
+        scheduler.tick_seconds,
+        scheduler.lead_seconds,
+    )
+
+def _start_tmdb_cache_janitor(app):
+    """Start the background sweeper that expires and size-caps the filesystem TMDB cache."""
+    if not app.config.get("TMDB_DISK_CACHE_JANITOR_ENABLED", True):
+        return
 
-    if app.config.get("TMDB_WARMUP_BLOCKING", False):
-        run_warmup()
-    else:
-        threading.Thread(target=run_warmup, daemon=True, name="tmdb-startup-warmup").start()
-        app.logger.info(
-            "TMDB startup warmup scheduled (profile=%s)",
-            app.config.get("TMDB_WARMUP_PROFILE", "quick"),
-        )
+    # Skip Flask reloader parent process; the serving child starts its own janitor.
+    if app.debug and os.environ.get("WERKZEUG_RUN_MAIN") != "true":
+        return
+
+    with app.app_context():
+        TMDBService.init_cache()
+        if TMDBService.cache.janitor.start():
+            app.logger.info(
+                "TMDB disk cache janitor started (interval=%ss, max_bytes=%s)",
+                TMDBService.cache.janitor.interval_seconds,
+                TMDBService.cache.janitor.max_bytes,
+            )
 
 def create_app():
     runtime_root = os.environ.get("LUMO_RUNTIME_ROOT")
@@ -418,11 +445,15 @@ def create_app():
         try:
             # Check database connection
             db.session.execute(db.text('SELECT 1'))
-            return jsonify({
+            payload = {
                 'status': 'healthy',
                 'database': 'connected',
                 'timestamp': datetime.utcnow().isoformat()
-            }), 200
+            }
+            refresh_scheduler = app.extensions.get('tmdb_refresh_scheduler')
+            if refresh_scheduler is not None:
+                payload['tmdb_refresh'] = refresh_scheduler.status()
+            return jsonify(payload), 200
         except Exception as e:
             app.logger.error(f'Health check failed: {str(e)}')
             return jsonify({
@@ -441,6 +472,7 @@ def create_app():
     # Register Jinja2 filters
     app.jinja_env.filters['datetime_difference'] = datetime_difference
     app.jinja_env.filters['truncate_words'] = truncate_words
+    app.jinja_env.add_extension(FragmentCacheExtension)
 
     # Context processor for notifications
     @app.context_processor
@@ -459,10 +491,26 @@ def create_app():
                 return {'unread_notifications_count': 0}
         return {'unread_notifications_count': 0}
 
+    @app.context_processor
+    def inject_tmdb_degraded():
+        # Set when a TMDB call was short-circuited while rendering this request.
+        return {'tmdb_degraded': bool(getattr(g, 'tmdb_degraded', False))}
+
     @app.before_request
     def _track_request_start_time():
         g.request_start_time = time.perf_counter()
 
+    @app.before_request
+    def _set_tmdb_deadline():
+        # TMDBService caps timeouts and retries to this and serves cached data once it passes.
+        route_budgets = app.config.get('TMDB_ROUTE_BUDGETS') or {}
+        if request.endpoint not in route_budgets and request.blueprint not in TMDB_BUDGET_BLUEPRINTS:
+            # Static files, health checks, auth and admin pages make no TMDB calls.
+            return
+        budget = route_budgets.get(request.endpoint, app.config.get('TMDB_REQUEST_BUDGET_SECONDS', 20))
+        if budget and float(budget) > 0:
+            g.tmdb_deadline = time.monotonic() + float(budget)
+
     @app.after_request
     def _apply_performance_headers_and_log(response):
         elapsed = None
@@ -524,7 +572,8 @@ def create_app():
         return render_template('errors/400.html', 
                              error_message="Security token expired. Please refresh and try again."), 400
 
-    _startup_tmdb_warmup(app)
+    _start_tmdb_cache_janitor(app)
+    _start_tmdb_refresh_scheduler(app)
 
     return app
 
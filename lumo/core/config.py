@@ -1,3 +1,4 @@
+import json
 import os
 import secrets
 import socket
@@ -11,6 +12,73 @@ FORCE_LOCAL_DB = os.environ.get("LUMO_FORCE_LOCAL_DB", "0").lower() in {"1", "tr
 REQUIRE_REMOTE_DB = os.environ.get("LUMO_REQUIRE_REMOTE_DB", "0").lower() in {"1", "true", "yes", "on"}
 
 
+DEFAULT_TMDB_CACHE_POLICIES = [
+    # Genre lists barely change; keep them for days.
+    {"pattern": "genre/*", "ttl": 3 * 86400, "hard_ttl": 7 * 86400},
+    # Trending rotates hourly.
+    {"pattern": "trending/*", "ttl": 3600, "hard_ttl": 6 * 3600},
+    # Search is long-tail: skip the per-worker memory tier.
+    {"pattern": "search/*", "ttl": 1800, "hard_ttl": 6 * 3600, "tiers": ["shared", "redis", "disk"]},
+    # Slim card projections back every grid; they are tiny, so keep them long and in memory.
+    {"pattern": "card/*", "ttl": 12 * 3600, "hard_ttl": 7 * 86400},
+    # tmdb_id -> media type index entries; an id never changes type, so keep them for months.
+    {"pattern": "mediatype/*", "ttl": 30 * 86400, "hard_ttl": 180 * 86400},
+    # Full detail payloads (credits, videos, images...) are large and grids read cards
+    # instead, so keep only small ones in the memory tier.
+    {"pattern": "movie/[0-9]*", "ttl": 6 * 3600, "max_bytes": {"memory": 64 * 1024}},
+    {"pattern": "tv/[0-9]*", "ttl": 6 * 3600, "max_bytes": {"memory": 64 * 1024}},
+]
+
+
+# Seconds of TMDB work each route may spend before it renders with what it has.
+# Keyed by Flask endpoint; routes not listed use TMDB_REQUEST_BUDGET_SECONDS.
+DEFAULT_TMDB_ROUTE_BUDGETS = {
+    "main.home": 8,
+    "main.movies_section": 8,
+    "main.anime_section": 8,
+    "main.series_section": 8,
+    "movies.movie_detail": 10,
+    "movies.tv_detail": 10,
+    "movies.recommendations": 12,
+    "movies.load_more_recommendations": 10,
+    "users.profile": 10,
+    "users.public_profile": 10,
+    "users.activity_feed": 8,
+}
+
+
+def _load_tmdb_route_budgets():
+    """Return per-route TMDB budgets, with TMDB_ROUTE_BUDGETS_JSON entries taking precedence."""
+    budgets = dict(DEFAULT_TMDB_ROUTE_BUDGETS)
+    raw_budgets = (os.environ.get("TMDB_ROUTE_BUDGETS_JSON") or "").strip()
+    if not raw_budgets:
+        return budgets
+
+    try:
+        custom_budgets = json.loads(raw_budgets)
+    except ValueError as exc:
+        raise RuntimeError(f"TMDB_ROUTE_BUDGETS_JSON is not valid JSON: {exc}") from exc
+    if not isinstance(custom_budgets, dict) or not all(isinstance(v, (int, float)) for v in custom_budgets.values()):
+        raise RuntimeError("TMDB_ROUTE_BUDGETS_JSON must be a JSON object mapping endpoints to seconds")
+    budgets.update(custom_budgets)
+    return budgets
+
+
+def _load_tmdb_cache_policies():
+    """Return TMDB cache policies, with TMDB_CACHE_POLICIES_JSON rules taking precedence."""
+    raw_rules = (os.environ.get("TMDB_CACHE_POLICIES_JSON") or "").strip()
+    if not raw_rules:
+        return list(DEFAULT_TMDB_CACHE_POLICIES)
+
+    try:
+        custom_rules = json.loads(raw_rules)
+    except ValueError as exc:
+        raise RuntimeError(f"TMDB_CACHE_POLICIES_JSON is not valid JSON: {exc}") from exc
+    if not isinstance(custom_rules, list) or not all(isinstance(rule, dict) and rule.get("pattern") for rule in custom_rules):
+        raise RuntimeError("TMDB_CACHE_POLICIES_JSON must be a JSON list of objects with a 'pattern' key")
+    return custom_rules + list(DEFAULT_TMDB_CACHE_POLICIES)
+
+
 def _normalize_database_url(raw_url):
     """Normalize DATABASE_URL for SQLAlchemy + psycopg and validate host format."""
     db_url = (raw_url or "").strip()
@@ -166,12 +234,28 @@ class Config:
     PUBLIC_HERO_CACHE_SECONDS = max(10, int(os.environ.get("PUBLIC_HERO_CACHE_SECONDS", "180")))
     PUBLIC_GENRES_CACHE_SECONDS = max(30, int(os.environ.get("PUBLIC_GENRES_CACHE_SECONDS", "3600")))
     PUBLIC_FRAGMENT_CACHE_MAX_ENTRIES = max(64, int(os.environ.get("PUBLIC_FRAGMENT_CACHE_MAX_ENTRIES", "512")))
+    # Public payloads are shared across workers through Redis, or a SQLite file next to the TMDB cache.
+    PUBLIC_FRAGMENT_SHARED_ENABLED = os.environ.get("PUBLIC_FRAGMENT_SHARED_ENABLED", "true").lower() == "true"
+    PUBLIC_FRAGMENT_SHARED_PATH = os.environ.get("PUBLIC_FRAGMENT_SHARED_PATH") or None
+    PUBLIC_FRAGMENT_STALE_SECONDS = max(0, int(os.environ.get("PUBLIC_FRAGMENT_STALE_SECONDS", "300")))
+    PUBLIC_FRAGMENT_LOCK_SECONDS = max(5, int(os.environ.get("PUBLIC_FRAGMENT_LOCK_SECONDS", "30")))
+    PUBLIC_FRAGMENT_WAIT_SECONDS = max(0.0, float(os.environ.get("PUBLIC_FRAGMENT_WAIT_SECONDS", "5")))
+    # {% cache %} blocks in templates: rendered card grids keyed on the payloads they were rendered from.
+    TEMPLATE_FRAGMENT_CACHE_ENABLED = os.environ.get("TEMPLATE_FRAGMENT_CACHE_ENABLED", "true").lower() == "true"
+    TEMPLATE_FRAGMENT_CACHE_SECONDS = max(10, int(os.environ.get("TEMPLATE_FRAGMENT_CACHE_SECONDS", "300")))
+    PUBLIC_PAGE_CACHE_ENABLED = os.environ.get("PUBLIC_PAGE_CACHE_ENABLED", "true").lower() == "true"
+    PUBLIC_PAGE_CACHE_SECONDS = max(5, int(os.environ.get("PUBLIC_PAGE_CACHE_SECONDS", "60")))
+    PUBLIC_PAGE_CACHE_MAX_ENTRIES = max(16, int(os.environ.get("PUBLIC_PAGE_CACHE_MAX_ENTRIES", "256")))
     PUBLIC_FRAGMENT_CACHE_VERSION = (
         (os.environ.get("PUBLIC_FRAGMENT_CACHE_VERSION") or "").strip()
         or (os.environ.get("RENDER_GIT_COMMIT") or "").strip()
         or (os.environ.get("APP_RELEASE") or "").strip()
         or "v1"
     )
+    # One bounded pool per worker for route fan-out; past workers + queue, calls run on the request thread.
+    ROUTE_FANOUT_WORKERS = max(1, int(os.environ.get("ROUTE_FANOUT_WORKERS", "8")))
+    ROUTE_FANOUT_QUEUE = max(0, int(os.environ.get("ROUTE_FANOUT_QUEUE", "32")))
+    ROUTE_FANOUT_TIMEOUT_SECONDS = max(1.0, float(os.environ.get("ROUTE_FANOUT_TIMEOUT_SECONDS", "15")))
     UNREAD_COUNT_CACHE_SECONDS = max(5, int(os.environ.get("UNREAD_COUNT_CACHE_SECONDS", "30")))
     AUTO_CREATE_SCHEMA = os.environ.get("AUTO_CREATE_SCHEMA", "false" if os.environ.get("FLASK_ENV") == "production" else "true").lower() == "true"
     SLOW_REQUEST_LOG_SECONDS = max(0.0, float(os.environ.get("SLOW_REQUEST_LOG_SECONDS", "0.35")))
@@ -235,11 +319,66 @@ class Config:
     TMDB_REQUEST_TIMEOUT = max(3, int(os.environ.get("TMDB_REQUEST_TIMEOUT", "10")))
     TMDB_POSTER_SIZE = "w500"  # Options: w92, w154, w185, w342, w500, w780, original
     TMDB_BACKDROP_SIZE = "w1280"  # Options: w300, w780, w1280, original
+    # The warm set (TMDBService.refresh_tasks) is kept fresh by a leader-elected scheduler
+    # that re-fetches each list TMDB_REFRESH_LEAD_SECONDS before its soft TTL runs out.
     TMDB_WARMUP_ON_STARTUP = os.environ.get("TMDB_WARMUP_ON_STARTUP", "true").lower() == "true"
     TMDB_WARMUP_BLOCKING = os.environ.get("TMDB_WARMUP_BLOCKING", "false").lower() == "true"
     TMDB_WARMUP_PROFILE = (os.environ.get("TMDB_WARMUP_PROFILE") or "quick").strip().lower()
     TMDB_WARMUP_GENRE_COUNT = max(0, int(os.environ.get("TMDB_WARMUP_GENRE_COUNT", "3")))
-    TMDB_WARMUP_COOLDOWN_SECONDS = max(60, int(os.environ.get("TMDB_WARMUP_COOLDOWN_SECONDS", "900")))
+    TMDB_REFRESH_GENRE_PAGES = max(1, int(os.environ.get("TMDB_REFRESH_GENRE_PAGES", "1")))
+    TMDB_REFRESH_TICK_SECONDS = max(10, int(os.environ.get("TMDB_REFRESH_TICK_SECONDS", "60")))
+    TMDB_REFRESH_LEAD_SECONDS = max(0, int(os.environ.get("TMDB_REFRESH_LEAD_SECONDS", "600")))
+    TMDB_REFRESH_SCHEDULER_WORKERS = max(1, int(os.environ.get("TMDB_REFRESH_SCHEDULER_WORKERS", "3")))
+    # Decayed per-key access counts pick the TMDB_PREWARM_HOT_KEYS most requested entries
+    # (detail pages, deep genre pages) to refresh alongside the warmup profile.
+    TMDB_ACCESS_TRACKING_ENABLED = os.environ.get("TMDB_ACCESS_TRACKING_ENABLED", "true").lower() == "true"
+    TMDB_ACCESS_HALF_LIFE_SECONDS = max(600, int(os.environ.get("TMDB_ACCESS_HALF_LIFE_SECONDS", str(6 * 3600))))
+    TMDB_ACCESS_MAX_KEYS = max(100, int(os.environ.get("TMDB_ACCESS_MAX_KEYS", "2000")))
+    TMDB_PREWARM_HOT_KEYS = max(0, int(os.environ.get("TMDB_PREWARM_HOT_KEYS", "50")))
+    TMDB_PREWARM_MIN_SCORE = max(0.0, float(os.environ.get("TMDB_PREWARM_MIN_SCORE", "3")))
+    # Outbound token bucket, shared across workers through Redis when REDIS_URL is set.
+    TMDB_RATE_LIMIT_PER_SECOND = max(0.1, float(os.environ.get("TMDB_RATE_LIMIT_PER_SECOND", "4")))
+    TMDB_RATE_LIMIT_BURST = max(1, int(os.environ.get("TMDB_RATE_LIMIT_BURST", "10")))
+    TMDB_RATE_LIMIT_MAX_WAIT_SECONDS = max(0.5, float(os.environ.get("TMDB_RATE_LIMIT_MAX_WAIT_SECONDS", "5")))
+    # Per-request TMDB deadline (see DEFAULT_TMDB_ROUTE_BUDGETS); 0 disables it. Keep it
+    # well under gunicorn's worker timeout so pages degrade instead of workers dying.
+    TMDB_REQUEST_BUDGET_SECONDS = max(0.0, float(os.environ.get("TMDB_REQUEST_BUDGET_SECONDS", "20")))
+    TMDB_ROUTE_BUDGETS = _load_tmdb_route_budgets()
+    # Circuit breaker: once most calls in the window fail, TMDB calls fail fast for
+    # TMDB_CIRCUIT_OPEN_SECONDS and pages render from cache. Shared through Redis when configured.
+    TMDB_CIRCUIT_ENABLED = os.environ.get("TMDB_CIRCUIT_ENABLED", "true").lower() == "true"
+    TMDB_CIRCUIT_FAILURE_THRESHOLD = max(1, int(os.environ.get("TMDB_CIRCUIT_FAILURE_THRESHOLD", "5")))
+    TMDB_CIRCUIT_FAILURE_RATIO = min(1.0, max(0.05, float(os.environ.get("TMDB_CIRCUIT_FAILURE_RATIO", "0.5"))))
+    TMDB_CIRCUIT_WINDOW_SECONDS = max(5, int(os.environ.get("TMDB_CIRCUIT_WINDOW_SECONDS", "30")))
+    TMDB_CIRCUIT_OPEN_SECONDS = max(5, int(os.environ.get("TMDB_CIRCUIT_OPEN_SECONDS", "30")))
+    # Batched fetches (TMDBService.fetch_many) run on one asyncio loop per worker.
+    TMDB_ASYNC_ENABLED = os.environ.get("TMDB_ASYNC_ENABLED", "true").lower() == "true"
+    TMDB_ASYNC_MAX_CONCURRENCY = max(1, int(os.environ.get("TMDB_ASYNC_MAX_CONCURRENCY", "16")))
+    # Upper bound on titles enriched per get_details_many call (e.g. very long watchlists).
+    TMDB_DETAILS_BATCH_MAX_ITEMS = max(1, int(os.environ.get("TMDB_DETAILS_BATCH_MAX_ITEMS", "48")))
+    TMDB_MEMORY_CACHE_MAX_BYTES = max(1024 * 1024, int(os.environ.get("TMDB_MEMORY_CACHE_MAX_BYTES", str(32 * 1024 * 1024))))
+    TMDB_MEMORY_CACHE_SHARDS = max(1, int(os.environ.get("TMDB_MEMORY_CACHE_SHARDS", "16")))
+    TMDB_SINGLE_FLIGHT_WAIT_SECONDS = max(1.0, float(os.environ.get("TMDB_SINGLE_FLIGHT_WAIT_SECONDS", "15")))
+    TMDB_CACHE_HARD_TTL_SECONDS = max(3600, int(os.environ.get("TMDB_CACHE_HARD_TTL_SECONDS", "86400")))
+    # 404s and other non-retryable TMDB failures are cached briefly in every tier.
+    TMDB_NEGATIVE_CACHE_SECONDS = max(30, int(os.environ.get("TMDB_NEGATIVE_CACHE_SECONDS", "600")))
+    TMDB_CACHE_POLICIES = _load_tmdb_cache_policies()
+    TMDB_DISK_CACHE_COMPRESS_LEVEL = min(9, max(1, int(os.environ.get("TMDB_DISK_CACHE_COMPRESS_LEVEL", "6"))))
+    TMDB_DISK_CACHE_JANITOR_ENABLED = os.environ.get("TMDB_DISK_CACHE_JANITOR_ENABLED", "true").lower() == "true"
+    TMDB_DISK_CACHE_SWEEP_SECONDS = max(30, int(os.environ.get("TMDB_DISK_CACHE_SWEEP_SECONDS", "600")))
+    TMDB_DISK_CACHE_MAX_BYTES = max(
+        1024 * 1024,
+        int(os.environ.get("TMDB_DISK_CACHE_MAX_BYTES", str((64 if DESKTOP_MODE else 256) * 1024 * 1024))),
+    )
+    # Host-local SQLite tier shared by all workers when REDIS_URL is not set.
+    TMDB_SHARED_CACHE_ENABLED = os.environ.get("TMDB_SHARED_CACHE_ENABLED", "true").lower() == "true"
+    TMDB_SHARED_CACHE_PATH = (os.environ.get("TMDB_SHARED_CACHE_PATH") or "").strip() or None
+    TMDB_SHARED_CACHE_MAX_BYTES = max(
+        1024 * 1024,
+        int(os.environ.get("TMDB_SHARED_CACHE_MAX_BYTES", str((32 if DESKTOP_MODE else 128) * 1024 * 1024))),
+    )
+    TMDB_REFRESH_WORKERS = max(1, int(os.environ.get("TMDB_REFRESH_WORKERS", "2")))
+    TMDB_REFRESH_MAX_PENDING = max(1, int(os.environ.get("TMDB_REFRESH_MAX_PENDING", "64")))
 
     # LLM Recommendations
     ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY") or ""
@@ -0,0 +1,158 @@
+"""
+In-process counters and latency histograms for the TMDB cache tiers.
+
+Lookups are recorded per endpoint family (``trending``, ``discover``,
+``movie/{id}``, ``search``...) and per tier (``request``, ``memory``,
+``shared``, ``redis``, ``disk``, ``network``). Numbers are per worker process;
+the admin stats endpoint reports the pid so samples from different workers
+can be told apart.
+"""
+
+import bisect
+import threading
+import time
+
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Endpoints whose first path segment is enough to group them.
+_PREFIX_FAMILIES = {'trending', 'discover', 'search', 'genre', 'card', 'mediatype', 'find', 'person'}
+_MAX_FAMILIES = 256
+
+
+def endpoint_family(endpoint):
+    """Collapse an endpoint to a low-cardinality family, e.g. ``movie/550`` -> ``movie/{id}``."""
+    parts = [part for part in (endpoint or '').split('/') if part]
+    if not parts:
+        return 'unknown'
+    if parts[0] in _PREFIX_FAMILIES:
+        return parts[0]
+    return '/'.join('{id}' if part.isdigit() else part for part in parts)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram; not thread-safe on its own (guarded by CacheMetrics)."""
+
+    __slots__ = ('buckets', 'count', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms):
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+
+    def _quantile(self, q):
+        """Upper bucket bound containing quantile ``q`` (the max for the open bucket)."""
+        target = q * self.count
+        running = 0
+        for index, bucket_count in enumerate(self.buckets):
+            running += bucket_count
+            if running >= target and bucket_count:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else round(self.max_ms, 2)
+        return 0.0
+
+    def snapshot(self):
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 3),
+            'max_ms': round(self.max_ms, 3),
+            'p50_ms': self._quantile(0.5),
+            'p95_ms': self._quantile(0.95),
+            'p99_ms': self._quantile(0.99),
+            'buckets': {
+                (f"le_{bound}" if index < len(LATENCY_BUCKETS_MS) else 'inf'): bucket_count
+                for index, (bound, bucket_count) in enumerate(
+                    zip(LATENCY_BUCKETS_MS + (None,), self.buckets)
+                )
+                if bucket_count
+            },
+        }
+
+
+class _TierStats:
+    __slots__ = ('outcomes', 'latency')
+
+    def __init__(self):
+        self.outcomes = {}
+        self.latency = LatencyHistogram()
+
+
+class CacheMetrics:
+    """Thread-safe outcome counters and latency histograms keyed by (family, tier)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.started_at = time.time()
+
+    def _tier(self, family, tier):
+        stats = self._stats.get((family, tier))
+        if stats is None:
+            if len({key[0] for key in self._stats}) >= _MAX_FAMILIES:
+                family = 'other'
+                stats = self._stats.get((family, tier))
+            if stats is None:
+                stats = self._stats[(family, tier)] = _TierStats()
+        return stats
+
+    def record(self, family, tier, outcome, elapsed_ms=None, count=1):
+        """Count ``count`` lookups with ``outcome`` and optionally one latency sample."""
+        with self._lock:
+            stats = self._tier(family, tier)
+            stats.outcomes[outcome] = stats.outcomes.get(outcome, 0) + count
+            if elapsed_ms is not None:
+                stats.latency.observe(elapsed_ms)
+
+    def observe(self, family, tier, elapsed_ms):
+        """Record a latency sample without counting an outcome (e.g. one batched round trip)."""
+        with self._lock:
+            self._tier(family, tier).latency.observe(elapsed_ms)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.started_at = time.time()
+
+    @staticmethod
+    def _hit_ratio(outcomes):
+        # A negative entry still saves the network round trip, so it counts as a hit.
+        hits = outcomes.get('hit', 0) + outcomes.get('stale', 0) + outcomes.get('negative', 0)
+        lookups = hits + outcomes.get('miss', 0)
+        return round(hits / lookups, 4) if lookups else None
+
+    def snapshot(self):
+        """Return per-family and per-tier aggregates as plain JSON-serializable dicts."""
+        with self._lock:
+            families = {}
+            tiers = {}
+            for (family, tier), stats in sorted(self._stats.items()):
+                entry = {
+                    'outcomes': dict(stats.outcomes),
+                    'hit_ratio': self._hit_ratio(stats.outcomes),
+                    'latency': stats.latency.snapshot(),
+                }
+                families.setdefault(family, {})[tier] = entry
+
+                totals = tiers.setdefault(tier, {'outcomes': {}})
+                for outcome, count in stats.outcomes.items():
+                    totals['outcomes'][outcome] = totals['outcomes'].get(outcome, 0) + count
+
+            for totals in tiers.values():
+                totals['hit_ratio'] = self._hit_ratio(totals['outcomes'])
+
+            return {
+                'since': self.started_at,
+                'uptime_seconds': round(time.time() - self.started_at, 1),
+                'tiers': tiers,
+                'families': families,
+            }
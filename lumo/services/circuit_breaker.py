@@ -0,0 +1,234 @@
+"""
+Circuit breaker for outbound TMDB calls.
+
+While TMDB is failing, every request would otherwise run its full retry loop
+with backoff sleeps and tie up a worker thread. The breaker watches call
+outcomes over a short window and, once failures dominate, opens: calls fail
+fast for ``open_seconds`` and callers fall back to cached (possibly stale)
+data. After that a limited number of probe calls are let through (half-open);
+a successful probe closes the circuit, a failed one opens it again.
+
+``CircuitBreaker`` is shared by all threads of a process.
+``RedisCircuitBreaker`` additionally publishes the open state through Redis so
+one worker tripping the circuit stops the others too, and lets a single
+worker at a time probe for recovery. It falls back to per-process behaviour
+while Redis is unreachable.
+"""
+
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Thread-safe closed / open / half-open breaker driven by call outcomes."""
+
+    def __init__(self, failure_threshold=5, failure_ratio=0.5, window_seconds=30, open_seconds=30,
+                 half_open_max_calls=1):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.failure_ratio = min(1.0, max(0.0, float(failure_ratio)))
+        self.window_seconds = max(1.0, float(window_seconds))
+        self.open_seconds = max(1.0, float(open_seconds))
+        self.half_open_max_calls = max(1, int(half_open_max_calls))
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_until = 0.0
+        self._window_started = time.monotonic()
+        self._successes = 0
+        self._failures = 0
+        self._probes = 0
+        self._probe_started = 0.0
+        self.trips = 0
+        self.short_circuits = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now):
+        if self._state == OPEN and now >= self._opened_until:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def _reset_window(self, now):
+        self._window_started = now
+        self._successes = 0
+        self._failures = 0
+
+    def _open(self, now, seconds):
+        self._state = OPEN
+        self._opened_until = now + seconds
+        self._probes = 0
+        self._reset_window(now)
+
+    def allow(self):
+        """Whether a call may go out now; counts a short circuit when it may not."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN:
+                # A probe whose outcome was never reported must not wedge the breaker.
+                if self._probes >= self.half_open_max_calls and now - self._probe_started > self.open_seconds:
+                    self._probes = 0
+                if self._probes < self.half_open_max_calls:
+                    self._probes += 1
+                    self._probe_started = now
+                    return True
+            self.short_circuits += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == HALF_OPEN:
+                logger.info("TMDB circuit closed after successful probe")
+                self._state = CLOSED
+                self._reset_window(now)
+            elif state == CLOSED:
+                if now - self._window_started > self.window_seconds:
+                    self._reset_window(now)
+                self._successes += 1
+
+    def record_failure(self):
+        """Count a failed call; returns True when this failure opened the circuit."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == HALF_OPEN:
+                logger.warning("TMDB circuit re-opened: probe failed")
+                self._open(now, self.open_seconds)
+                self.trips += 1
+                return True
+            if state == OPEN:
+                return False
+            if now - self._window_started > self.window_seconds:
+                self._reset_window(now)
+            self._failures += 1
+            total = self._failures + self._successes
+            if self._failures >= self.failure_threshold and self._failures / total >= self.failure_ratio:
+                logger.warning("TMDB circuit opened: %s/%s calls failed in %.0fs",
+                               self._failures, total, now - self._window_started)
+                self._open(now, self.open_seconds)
+                self.trips += 1
+                return True
+            return False
+
+    def force_open(self, seconds):
+        """Open the circuit for ``seconds`` (e.g. when another worker tripped it)."""
+        with self._lock:
+            now = time.monotonic()
+            if self._current_state(now) != OPEN or self._opened_until < now + seconds:
+                self._open(now, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            return {
+                'state': state,
+                'open_remaining_seconds': round(max(0.0, self._opened_until - now), 1) if state == OPEN else 0,
+                'window_failures': self._failures,
+                'window_successes': self._successes,
+                'trips': self.trips,
+                'short_circuits': self.short_circuits,
+            }
+
+
+class RedisCircuitBreaker(CircuitBreaker):
+    """Breaker whose open state and recovery probe are coordinated through Redis."""
+
+    # Back off from Redis for this long after an error before trying it again.
+    REDIS_RETRY_SECONDS = 30
+    # How often a breaker that is not open checks whether another worker opened the circuit.
+    POLL_SECONDS = 1.0
+
+    def __init__(self, redis_client, key='tmdb:circuit', **kwargs):
+        super().__init__(**kwargs)
+        self.redis_client = redis_client
+        self.open_key = f"{key}:open"
+        self.probe_key = f"{key}:probe"
+        self._redis_down_until = 0.0
+        self._next_poll = 0.0
+
+    def _redis_available(self):
+        return time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, exc):
+        logger.warning("TMDB shared circuit breaker unavailable, using per-process state: %s", exc)
+        self._redis_down_until = time.monotonic() + self.REDIS_RETRY_SECONDS
+
+    def _poll_shared_state(self):
+        now = time.monotonic()
+        if now < self._next_poll or not self._redis_available():
+            return
+        self._next_poll = now + self.POLL_SECONDS
+        try:
+            remaining_ms = self.redis_client.pttl(self.open_key)
+        except Exception as exc:
+            self._redis_failed(exc)
+            return
+        if remaining_ms and remaining_ms > 0:
+            self.force_open(remaining_ms / 1000.0)
+
+    def allow(self):
+        if self.state != OPEN:
+            self._poll_shared_state()
+        allowed = super().allow()
+        if not allowed or self.state != HALF_OPEN or not self._redis_available():
+            return allowed
+        # Only one worker probes a recovering TMDB at a time.
+        try:
+            if self.redis_client.set(self.probe_key, '1', nx=True, px=int(self.open_seconds * 1000)):
+                return True
+        except Exception as exc:
+            self._redis_failed(exc)
+            return True
+        with self._lock:
+            self._probes = max(0, self._probes - 1)
+            self.short_circuits += 1
+        return False
+
+    def record_success(self):
+        was_half_open = self.state == HALF_OPEN
+        super().record_success()
+        if was_half_open and self._redis_available():
+            try:
+                self.redis_client.delete(self.open_key, self.probe_key)
+            except Exception as exc:
+                self._redis_failed(exc)
+
+    def record_failure(self):
+        opened = super().record_failure()
+        if opened and self._redis_available():
+            try:
+                pipe = self.redis_client.pipeline()
+                pipe.set(self.open_key, '1', px=int(self.open_seconds * 1000))
+                pipe.delete(self.probe_key)
+                pipe.execute()
+            except Exception as exc:
+                self._redis_failed(exc)
+        return opened
+
+    def snapshot(self):
+        snapshot = super().snapshot()
+        snapshot['shared'] = self._redis_available()
+        return snapshot
+
+
+def build_circuit_breaker(redis_client=None, key='tmdb:circuit', **kwargs):
+    """Return a Redis-coordinated breaker when a client is available, else a per-process one."""
+    if redis_client is not None:
+        return RedisCircuitBreaker(redis_client, key=key, **kwargs)
+    return CircuitBreaker(**kwargs)
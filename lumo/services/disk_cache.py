@@ -0,0 +1,321 @@
+"""
+Filesystem cache backend for TMDB responses.
+
+Entries are stored as ``<cache_dir>/ab/cd/<md5>.cache`` files made of a fixed
+binary header followed by a zlib-compressed JSON payload. The header carries
+the soft and hard expiry timestamps so expiry checks and misses never have to
+decompress or parse the payload. Writes go to a temporary file in the same
+directory and are moved into place with ``os.replace`` so readers never see a
+half-written entry.
+"""
+
+import hashlib
+import logging
+import os
+import random
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+# magic, format version, fresh_until, expires_at
+HEADER = struct.Struct(">4sBdd")
+MAGIC = b"LTMC"
+FORMAT_VERSION = 1
+ENTRY_SUFFIX = ".cache"
+TEMP_PREFIX = ".tmp-"
+# Access times only need to be precise enough to order entries for eviction.
+ATIME_RESOLUTION_SECONDS = 600
+
+
+class DiskCacheBackend:
+    """Sharded, atomically written on-disk store with header-encoded expiry."""
+
+    def __init__(self, cache_dir, compress_level=6):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.compress_level = int(compress_level)
+
+    def path_for(self, key):
+        """Return the two-level hashed path for a cache key."""
+        key_hash = hashlib.md5(key.encode("utf-8")).hexdigest()
+        return self.cache_dir / key_hash[:2] / key_hash[2:4] / f"{key_hash}{ENTRY_SUFFIX}"
+
+    @staticmethod
+    def read_header(handle):
+        """Parse the fixed header from an open file; return (fresh_until, expires_at) or None."""
+        header = handle.read(HEADER.size)
+        if len(header) != HEADER.size:
+            return None
+        magic, version, fresh_until, expires_at = HEADER.unpack(header)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            return None
+        return fresh_until, expires_at
+
+    def read_deadlines(self, path):
+        """Return (fresh_until, expires_at) for an entry file without touching its payload."""
+        try:
+            with open(path, "rb") as handle:
+                return self.read_header(handle)
+        except OSError:
+            return None
+
+    def read(self, key, now_ts):
+        """Return ``(fresh_until, expires_at, payload_text)`` for a live entry, else None.
+
+        Expired and unreadable entries are removed on the way out.
+        """
+        path = self.path_for(key)
+        try:
+            with open(path, "rb") as handle:
+                deadlines = self.read_header(handle)
+                if deadlines is None:
+                    raise ValueError("bad cache header")
+                fresh_until, expires_at = deadlines
+                if expires_at <= now_ts:
+                    handle.close()
+                    self._unlink(path)
+                    return None
+                payload = zlib.decompress(handle.read()).decode("utf-8")
+                self._touch(path, handle.fileno(), now_ts)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zlib.error) as exc:
+            logger.warning("TMDB disk cache read error: %s", exc)
+            self._unlink(path)
+            return None
+        return fresh_until, expires_at, payload
+
+    @staticmethod
+    def _touch(path, fileno, now_ts):
+        """Record the access time used for LRU eviction, even on relatime/noatime mounts."""
+        try:
+            stat = os.fstat(fileno)
+            if now_ts - stat.st_atime > ATIME_RESOLUTION_SECONDS:
+                os.utime(path, (now_ts, stat.st_mtime))
+        except OSError:
+            pass
+
+    def write(self, key, payload_text, fresh_until, expires_at):
+        """Atomically write an entry; return the on-disk size in bytes or None on failure."""
+        path = self.path_for(key)
+        blob = HEADER.pack(MAGIC, FORMAT_VERSION, float(fresh_until), float(expires_at))
+        blob += zlib.compress(payload_text.encode("utf-8"), self.compress_level)
+
+        temp_path = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=path.parent)
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(blob)
+            os.replace(temp_path, path)
+            return len(blob)
+        except OSError as exc:
+            logger.warning("TMDB disk cache write error: %s", exc)
+            if temp_path:
+                self._unlink(Path(temp_path))
+            return None
+
+    def delete(self, key):
+        self._unlink(self.path_for(key))
+
+    def iter_entry_paths(self):
+        """Yield every entry file in the sharded layout."""
+        for item, kind in self._scan():
+            if kind == "entry":
+                yield Path(item.path)
+
+    def _scan(self):
+        """Yield ``(DirEntry, kind)`` for entry, temp and legacy flat JSON files."""
+        try:
+            top_level = list(os.scandir(self.cache_dir))
+        except FileNotFoundError:
+            return
+
+        for first in top_level:
+            if first.is_file():
+                if first.name.endswith(".json"):
+                    yield first, "legacy"
+                continue
+            if len(first.name) != 2 or not first.is_dir():
+                continue
+            for second in os.scandir(first.path):
+                if not second.is_dir():
+                    continue
+                for item in os.scandir(second.path):
+                    if item.name.startswith(TEMP_PREFIX):
+                        yield item, "temp"
+                    elif item.name.endswith(ENTRY_SUFFIX):
+                        yield item, "entry"
+
+    def sweep(self, now_ts=None, max_bytes=None, remove_all=False, temp_grace_seconds=3600):
+        """Delete expired entries and evict least recently accessed ones above ``max_bytes``.
+
+        Only entry headers are read. Returns a report of what was removed and what remains.
+        """
+        now_ts = time.time() if now_ts is None else now_ts
+        report = {
+            "scanned": 0,
+            "expired": 0,
+            "evicted": 0,
+            "reclaimed_bytes": 0,
+            "remaining_entries": 0,
+            "remaining_bytes": 0,
+        }
+        live_entries = []
+
+        for item, kind in self._scan():
+            try:
+                stat = item.stat()
+            except FileNotFoundError:
+                continue
+            report["scanned"] += 1
+
+            if remove_all or kind == "legacy":
+                drop = True
+            elif kind == "temp":
+                drop = now_ts - stat.st_mtime > temp_grace_seconds
+            else:
+                deadlines = self.read_deadlines(item.path)
+                drop = deadlines is None or deadlines[1] <= now_ts
+
+            if drop:
+                if self._unlink(Path(item.path)):
+                    report["expired"] += 1
+                    report["reclaimed_bytes"] += stat.st_size
+                continue
+
+            if kind == "entry":
+                live_entries.append((stat.st_atime, stat.st_size, item.path))
+                report["remaining_bytes"] += stat.st_size
+
+        if max_bytes and report["remaining_bytes"] > max_bytes:
+            live_entries.sort()
+            for _, size, path in live_entries:
+                if report["remaining_bytes"] <= max_bytes:
+                    break
+                if self._unlink(Path(path)):
+                    report["evicted"] += 1
+                    report["reclaimed_bytes"] += size
+                    report["remaining_bytes"] -= size
+
+        report["remaining_entries"] = len(live_entries) - report["evicted"]
+        return report
+
+    def clear(self):
+        """Remove all entries, stray temp files and legacy flat JSON files."""
+        return self.sweep(remove_all=True)
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError as exc:
+            logger.debug("TMDB disk cache unlink failed for %s: %s", path, exc)
+            return False
+
+
+class DiskCacheJanitor:
+    """Background sweeper for a DiskCacheBackend.
+
+    Every worker process runs one, but a lock file and a last-sweep marker in the
+    cache directory ensure only one process per host sweeps in each interval.
+    An optional ``shared`` backend (the host-local SQLite tier) is swept in the
+    same pass.
+    """
+
+    def __init__(self, backend, interval_seconds=600, max_bytes=None, shared=None):
+        self.backend = backend
+        self.shared = shared
+        self.interval_seconds = max(1, int(interval_seconds))
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self.lock_path = backend.cache_dir / ".janitor.lock"
+        self.state_path = backend.cache_dir / ".janitor.last"
+        self.last_report = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the sweeper thread; returns False if it is already running."""
+        if self._thread is not None and self._thread.is_alive():
+            return False
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="tmdb-cache-janitor")
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        # Stagger workers that boot together so they do not race for the lock.
+        delay = random.uniform(0.1, 0.5) * min(self.interval_seconds, 120)
+        while not self._stop_event.wait(delay):
+            try:
+                self.run_once()
+            except Exception as exc:
+                logger.warning("TMDB disk cache sweep failed: %s", exc)
+            delay = self.interval_seconds * random.uniform(0.9, 1.1)
+
+    def _swept_recently(self, now_ts):
+        try:
+            last_ts = float(self.state_path.read_text(encoding="utf-8").strip() or "0")
+        except (OSError, ValueError):
+            return False
+        return now_ts - last_ts < self.interval_seconds
+
+    def _acquire_lock(self, now_ts):
+        for _ in range(2):
+            try:
+                fd = os.open(str(self.lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    handle.write(str(now_ts))
+                return True
+            except FileExistsError:
+                # Reclaim locks left behind by a worker that died mid-sweep.
+                try:
+                    if now_ts - self.lock_path.stat().st_mtime < self.interval_seconds:
+                        return False
+                    self.lock_path.unlink()
+                except FileNotFoundError:
+                    continue
+                except OSError:
+                    return False
+        return False
+
+    def run_once(self, now_ts=None, force=False):
+        """Sweep if no other process has done so this interval; return the report or None."""
+        now_ts = time.time() if now_ts is None else now_ts
+        if not force and self._swept_recently(now_ts):
+            return None
+        if not self._acquire_lock(now_ts):
+            return None
+
+        try:
+            started = time.perf_counter()
+            report = self.backend.sweep(now_ts, max_bytes=self.max_bytes)
+            if self.shared is not None:
+                report["shared"] = self.shared.sweep(now_ts)
+            report["duration_ms"] = int((time.perf_counter() - started) * 1000)
+            report["finished_at"] = time.time()
+            self.state_path.write_text(str(report["finished_at"]), encoding="utf-8")
+            self.last_report = report
+            logger.info(
+                "TMDB disk cache sweep: %s expired, %s evicted, %s bytes reclaimed (%s entries, %s bytes remaining)",
+                report["expired"],
+                report["evicted"],
+                report["reclaimed_bytes"],
+                report["remaining_entries"],
+                report["remaining_bytes"],
+            )
+            return report
+        finally:
+            self.backend._unlink(self.lock_path)
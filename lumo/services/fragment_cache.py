@@ -0,0 +1,450 @@
+"""
+Shared cache for public (non user specific) route payloads.
+
+Section pages build the same payload in every worker: ``sections:movies``
+alone fans out into half a dozen TMDB list calls. ``PublicFragmentCache``
+keeps a small in-process tier in front of a store shared by every worker
+(Redis when configured, otherwise the host-local SQLite backend), and makes
+sure only one builder runs per key:
+
+- concurrent misses inside a worker queue on a per-key lock;
+- across workers a build lock in the shared store elects the builder and the
+  others wait for its result (or build themselves if it never arrives);
+- past its TTL an entry stays servable for ``stale_seconds`` while the lock
+  winner rebuilds it, so readers do not pile onto the rebuild.
+
+``purge`` bumps a generation number kept in the shared store. Keys embed the
+generation, so every worker drops its view of the old entries within
+``generation_poll_seconds``.
+"""
+
+import heapq
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+from flask import current_app
+
+from .shared_cache import SQLiteCacheBackend
+from .tmdb_service import TMDBService
+
+
+logger = logging.getLogger(__name__)
+
+# Delete a build lock only while it still holds our token.
+_REDIS_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class _ExpiringLRUShard:
+    """One independently locked slice of an ExpiringLRUCache."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        # (expires_at, key) pairs; entries that were replaced or evicted are skipped lazily.
+        self.expiry_heap = []
+        self.lock = threading.Lock()
+
+    def prune(self, now_ts):
+        heap = self.expiry_heap
+        while heap and heap[0][0] <= now_ts:
+            expires_at, key = heapq.heappop(heap)
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == expires_at:
+                del self.entries[key]
+        # Rebuild once dead heap items outnumber live entries, keeping the heap O(entries).
+        if len(heap) > 2 * len(self.entries) + 64:
+            self.expiry_heap = [(expires_at, key) for key, (expires_at, _) in self.entries.items()]
+            heapq.heapify(self.expiry_heap)
+
+
+class ExpiringLRUCache:
+    """Entry-bounded LRU cache with per-entry expiry, split into independently locked shards.
+
+    Reads are a dict lookup plus an LRU bump. Writes drop expired entries from
+    the top of an expiry heap and evict least recently used ones past the
+    shard's share of ``max_entries``, so neither ever scans the whole cache.
+    """
+
+    def __init__(self, max_entries, shard_count=8):
+        self.shard_count = max(1, int(shard_count or 1))
+        self.max_entries = max(self.shard_count, int(max_entries or 0))
+        per_shard = -(-self.max_entries // self.shard_count)
+        self._shards = [_ExpiringLRUShard(per_shard) for _ in range(self.shard_count)]
+
+    def _shard_for(self, key):
+        return self._shards[hash(key) % self.shard_count]
+
+    def get(self, key, now_ts=None):
+        """Return a live value and mark it most recently used, or None."""
+        shard = self._shard_for(key)
+        now_ts = time.time() if now_ts is None else now_ts
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now_ts:
+                del shard.entries[key]
+                return None
+            shard.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, expires_at, now_ts=None):
+        shard = self._shard_for(key)
+        now_ts = time.time() if now_ts is None else now_ts
+        with shard.lock:
+            shard.prune(now_ts)
+            shard.entries.pop(key, None)
+            shard.entries[key] = (expires_at, value)
+            heapq.heappush(shard.expiry_heap, (expires_at, key))
+            while len(shard.entries) > shard.max_entries:
+                shard.entries.popitem(last=False)
+
+    def pop(self, key):
+        shard = self._shard_for(key)
+        with shard.lock:
+            entry = shard.entries.pop(key, None)
+        return entry[1] if entry else None
+
+    def clear(self):
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+                shard.expiry_heap = []
+
+    def __len__(self):
+        total = 0
+        for shard in self._shards:
+            with shard.lock:
+                total += len(shard.entries)
+        return total
+
+
+class _RedisFragmentStore:
+    name = 'redis'
+
+    def __init__(self, redis_client, prefix='public:fragment:'):
+        self.redis_client = redis_client
+        self.prefix = prefix
+        self.generation_key = f"{prefix}generation"
+        self._release_script = redis_client.register_script(_REDIS_RELEASE_SCRIPT)
+
+    def get(self, key):
+        raw = self.redis_client.get(f"{self.prefix}{key}")
+        if not raw:
+            return None
+        entry = json.loads(raw)
+        return entry['fresh_until'], entry['expires_at'], entry['value']
+
+    def set(self, key, payload_text, fresh_until, expires_at):
+        # Written as text so the JSON payload is not decoded twice on read.
+        entry = f'{{"fresh_until": {fresh_until}, "expires_at": {expires_at}, "value": {payload_text}}}'
+        ttl_ms = max(1, int((expires_at - time.time()) * 1000))
+        self.redis_client.set(f"{self.prefix}{key}", entry, px=ttl_ms)
+
+    def acquire(self, key, seconds):
+        """Take the build lock; returns the owner token, or None when another worker holds it."""
+        token = uuid.uuid4().hex
+        if self.redis_client.set(f"{self.prefix}lock:{key}", token, nx=True, px=int(seconds * 1000)):
+            return token
+        return None
+
+    def release(self, key, token):
+        self._release_script(keys=[f"{self.prefix}lock:{key}"], args=[token])
+
+    def generation(self):
+        return int(self.redis_client.get(self.generation_key) or 0)
+
+    def bump_generation(self):
+        return int(self.redis_client.incr(self.generation_key))
+
+
+class _SQLiteFragmentStore:
+    name = 'shared'
+    # Far enough out that the generation row is never purged as expired.
+    FOREVER_SECONDS = 10 * 365 * 24 * 3600
+
+    def __init__(self, backend, prefix='public:fragment:'):
+        self.backend = backend
+        self.prefix = prefix
+        self.generation_key = f"{prefix}generation"
+
+    def get(self, key):
+        entry = self.backend.read(f"{self.prefix}{key}", time.time())
+        if entry is None:
+            return None
+        fresh_until, expires_at, payload_text = entry
+        return fresh_until, expires_at, json.loads(payload_text)
+
+    def set(self, key, payload_text, fresh_until, expires_at):
+        self.backend.write(f"{self.prefix}{key}", payload_text, fresh_until, expires_at)
+
+    def acquire(self, key, seconds):
+        """Take the build lock; returns the owner token, or None when another worker holds it."""
+        token = uuid.uuid4().hex
+        expires_at = time.time() + seconds
+        if self.backend.add(f"{self.prefix}lock:{key}", token, expires_at, expires_at):
+            return token
+        return None
+
+    def release(self, key, token):
+        self.backend.delete(f"{self.prefix}lock:{key}", payload_text=token)
+
+    def generation(self):
+        entry = self.backend.read(self.generation_key, time.time())
+        return int(entry[2]) if entry else 0
+
+    def bump_generation(self):
+        generation = self.generation() + 1
+        expires_at = time.time() + self.FOREVER_SECONDS
+        self.backend.write(self.generation_key, str(generation), expires_at, expires_at)
+        return generation
+
+
+class PublicFragmentCache:
+    """Two-tier, stampede-protected cache for public route payloads."""
+
+    def __init__(self, store=None, max_entries=512, stale_seconds=300, lock_seconds=30, wait_seconds=5.0,
+                 generation_poll_seconds=1.0):
+        self.store = store
+        self.max_entries = max(1, int(max_entries))
+        self.stale_seconds = max(0, int(stale_seconds))
+        self.lock_seconds = max(1, int(lock_seconds))
+        self.wait_seconds = max(0.0, float(wait_seconds))
+        self.generation_poll_seconds = max(0.0, float(generation_poll_seconds))
+        self._local = ExpiringLRUCache(self.max_entries)
+        self._lock = threading.Lock()
+        # key -> [lock, holders]; only keys with a lookup in progress are kept.
+        self._build_locks = {}
+        self._generation = 0
+        self._generation_checked_at = 0.0
+        self.counters = {
+            'hits': 0,
+            'shared_hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'builds': 0,
+            'build_waits': 0,
+            'build_errors': 0,
+        }
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _store_call(self, method, *args, default=None):
+        if self.store is None:
+            return default
+        try:
+            return getattr(self.store, method)(*args)
+        except Exception as exc:
+            logger.warning("Public fragment cache %s store %s failed: %s", self.store.name, method, exc)
+            return default
+
+    def current_generation(self):
+        """Generation of the shared store, re-read at most every ``generation_poll_seconds``."""
+        now = time.monotonic()
+        if self.store is None or now - self._generation_checked_at < self.generation_poll_seconds:
+            return self._generation
+        self._generation_checked_at = now
+        generation = self._store_call('generation', default=self._generation)
+        if generation != self._generation:
+            with self._lock:
+                self._generation = generation
+                self._local.clear()
+        return generation
+
+    def _lookup(self, key, now_ts):
+        """Return ``(entry, source)``; a stale local entry is checked against the shared store."""
+        entry = self._local.get(key, now_ts)
+        if entry is not None and entry[0] > now_ts:
+            return entry, 'hits'
+        shared = self._store_call('get', key)
+        if shared is not None and shared[1] > now_ts and (entry is None or shared[0] > entry[0]):
+            self._local.set(key, shared, shared[1], now_ts)
+            return shared, 'shared_hits'
+        return entry, 'hits' if entry is not None else None
+
+    def _release_shared(self, key, token):
+        # True stands in for a token when there is no shared store, or it failed: nothing to release.
+        if token is not True:
+            self._store_call('release', key, token)
+
+    def _hold_build_lock(self, key):
+        """Return the per-key build lock, registering the caller as a holder."""
+        with self._lock:
+            slot = self._build_locks.get(key)
+            if slot is None:
+                slot = self._build_locks[key] = [threading.Lock(), 0]
+            slot[1] += 1
+            return slot[0]
+
+    def _drop_build_lock(self, key):
+        with self._lock:
+            slot = self._build_locks.get(key)
+            if slot is not None:
+                slot[1] -= 1
+                if slot[1] <= 0:
+                    del self._build_locks[key]
+
+    def _build(self, key, builder, ttl_seconds, store_if):
+        self._count('builds')
+        value = builder()
+        if store_if is not None and not store_if():
+            return None, None, value
+
+        now_ts = time.time()
+        entry = (now_ts + ttl_seconds, now_ts + ttl_seconds + self.stale_seconds, value)
+        self._local.set(key, entry, entry[1], now_ts)
+        try:
+            payload_text = json.dumps(value)
+        except (TypeError, ValueError) as exc:
+            logger.debug("Public fragment %s kept local only: %s", key, exc)
+            return entry
+        self._store_call('set', key, payload_text, entry[0], entry[1])
+        return entry
+
+    def _wait_for_shared(self, key):
+        """Poll the shared store while another worker builds ``key``; returns the entry or None."""
+        self._count('build_waits')
+        give_up_at = time.monotonic() + self.wait_seconds
+        delay = 0.02
+        while time.monotonic() < give_up_at:
+            time.sleep(delay)
+            delay = min(delay * 2, 0.25)
+            entry, _ = self._lookup(key, time.time())
+            if entry is not None and entry[0] > time.time():
+                return entry
+        return None
+
+    def get_or_build(self, key, builder, ttl_seconds, version='v1', store_if=None):
+        """Return the cached payload for ``key``, building it once across workers on a miss.
+
+        ``store_if`` is called after a build; returning False serves the value
+        without caching it (e.g. a payload assembled while TMDB was degraded).
+        """
+        return self.get_entry_or_build(key, builder, ttl_seconds, version, store_if)[2]
+
+    def get_entry_or_build(self, key, builder, ttl_seconds, version='v1', store_if=None):
+        """Like ``get_or_build`` but return ``(fresh_until, expires_at, value)``.
+
+        ``fresh_until`` identifies the build that produced the value (it is the
+        same in every worker) and is None when the value was not stored.
+        """
+        full_key = f"{version}:{self.current_generation()}:{key}"
+        now_ts = time.time()
+        entry, source = self._lookup(full_key, now_ts)
+        if entry is not None and entry[0] > now_ts:
+            self._count(source)
+            return entry
+
+        build_lock = self._hold_build_lock(full_key)
+        try:
+            return self._build_or_wait(full_key, key, entry, build_lock, builder, ttl_seconds, store_if)
+        finally:
+            self._drop_build_lock(full_key)
+
+    def _build_or_wait(self, full_key, key, entry, build_lock, builder, ttl_seconds, store_if):
+        if entry is not None:
+            # Stale: whoever wins the build lock rebuilds, everyone else keeps serving the old payload.
+            if build_lock.acquire(blocking=False):
+                try:
+                    token = self._store_call('acquire', full_key, self.lock_seconds, default=True)
+                    if token:
+                        try:
+                            return self._build(full_key, builder, ttl_seconds, store_if)
+                        except Exception as exc:
+                            self._count('build_errors')
+                            logger.warning("Public fragment rebuild failed for %s, serving stale: %s", key, exc)
+                        finally:
+                            self._release_shared(full_key, token)
+                finally:
+                    build_lock.release()
+            self._count('stale_hits')
+            return entry
+
+        self._count('misses')
+        with build_lock:
+            # Another thread of this worker may have built it while we queued.
+            entry, _ = self._lookup(full_key, time.time())
+            if entry is not None and entry[0] > time.time():
+                return entry
+
+            token = self._store_call('acquire', full_key, self.lock_seconds, default=True)
+            if not token:
+                entry = self._wait_for_shared(full_key)
+                if entry is not None:
+                    return entry
+                logger.info("Public fragment %s not built by its lock holder in %ss, building", key, self.wait_seconds)
+                return self._build(full_key, builder, ttl_seconds, store_if)
+            try:
+                return self._build(full_key, builder, ttl_seconds, store_if)
+            finally:
+                self._release_shared(full_key, token)
+
+    def purge(self):
+        """Drop every entry for all workers sharing the store."""
+        with self._lock:
+            self._local.clear()
+        generation = self._store_call('bump_generation')
+        with self._lock:
+            self._generation = generation if generation is not None else self._generation + 1
+            self._generation_checked_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.store.name if self.store is not None else 'local',
+                'entries': len(self._local),
+                'generation': self._generation,
+                **self.counters,
+            }
+
+
+_cache_lock = threading.Lock()
+
+
+def get_public_fragment_cache():
+    """Return the app's ``PublicFragmentCache``, creating it on first use."""
+    app = current_app._get_current_object()
+    cache = app.extensions.get('public_fragment_cache')
+    if cache is not None:
+        return cache
+
+    with _cache_lock:
+        cache = app.extensions.get('public_fragment_cache')
+        if cache is not None:
+            return cache
+
+        config = app.config
+        store = None
+        if config.get('PUBLIC_FRAGMENT_SHARED_ENABLED', True):
+            if TMDBService.cache is None:
+                TMDBService.init_cache()
+            if TMDBService.cache.redis_client is not None:
+                store = _RedisFragmentStore(TMDBService.cache.redis_client)
+            else:
+                path = config.get('PUBLIC_FRAGMENT_SHARED_PATH') or Path(TMDBService.cache.cache_dir) / 'public-fragments.sqlite3'
+                try:
+                    store = _SQLiteFragmentStore(SQLiteCacheBackend(path))
+                except Exception as exc:
+                    logger.warning("Public fragment shared store unavailable, using per-process cache: %s", exc)
+
+        cache = PublicFragmentCache(
+            store,
+            max_entries=config.get('PUBLIC_FRAGMENT_CACHE_MAX_ENTRIES', 512),
+            stale_seconds=config.get('PUBLIC_FRAGMENT_STALE_SECONDS', 300),
+            lock_seconds=config.get('PUBLIC_FRAGMENT_LOCK_SECONDS', 30),
+            wait_seconds=config.get('PUBLIC_FRAGMENT_WAIT_SECONDS', 5),
+        )
+        app.extensions['public_fragment_cache'] = cache
+        return cache
@@ -0,0 +1,81 @@
+"""
+Persistent ``tmdb_id -> media_type`` index.
+
+TMDB numbers movies and TV shows independently, so a bare id (a review row,
+an old session entry) does not say which endpoint to call and the fallback
+logic ends up fetching both. This index records which media types have been
+seen for each id: from successful detail fetches, from list and search
+results, and from local rows that carry an explicit type (watchlist, watch
+progress). Entries live in the regular TMDB cache tiers under
+``mediatype/{id}`` keys, so they are shared by every worker and survive
+restarts on the disk, SQLite and Redis tiers.
+"""
+
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = ('movie', 'tv')
+
+
+def media_type_cache_key(tmdb_id):
+    return f"mediatype/{tmdb_id}_{{}}"
+
+
+class MediaTypeIndex:
+    """Learns and answers which media types exist for a TMDB id."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def lookup_many(self, tmdb_ids):
+        """Return ``{tmdb_id: frozenset(media_types)}`` for the ids the index knows."""
+        keys = {media_type_cache_key(tmdb_id): tmdb_id for tmdb_id in tmdb_ids if tmdb_id}
+        if not keys:
+            return {}
+        try:
+            found = self.cache.get_many(list(keys))
+        except Exception as exc:
+            logger.warning("TMDB media type index read failed: %s", exc)
+            return {}
+        known = {}
+        for key, (types, _) in found.items():
+            if isinstance(types, list):
+                known[keys[key]] = frozenset(t for t in types if t in MEDIA_TYPES)
+        return known
+
+    @staticmethod
+    def choose(known_types, hint=None):
+        """Pick the media type to try first for an id with ``known_types``.
+
+        An explicit hint always wins: ids overlap between movies and shows, so
+        having seen one type does not rule out the other. Without a hint a
+        single known type is used, and movie is the default otherwise.
+        """
+        if hint in MEDIA_TYPES:
+            return hint
+        if known_types and len(known_types) == 1:
+            return next(iter(known_types))
+        return 'movie'
+
+    def learn(self, pairs):
+        """Record ``(tmdb_id, media_type)`` observations; only changed entries are written."""
+        observed = {}
+        for tmdb_id, media_type in pairs:
+            if tmdb_id and media_type in MEDIA_TYPES:
+                observed.setdefault(tmdb_id, set()).add(media_type)
+        if not observed:
+            return
+
+        try:
+            known = self.lookup_many(observed)
+            updates = {}
+            for tmdb_id, types in observed.items():
+                merged = types | known.get(tmdb_id, frozenset())
+                if merged != known.get(tmdb_id):
+                    updates[media_type_cache_key(tmdb_id)] = sorted(merged)
+            if updates:
+                self.cache.set_many(updates)
+        except Exception as exc:
+            logger.warning("TMDB media type index write failed: %s", exc)
@@ -0,0 +1,141 @@
+"""
+Token-bucket rate limiting for outbound TMDB calls.
+
+A bucket holds up to ``burst`` tokens and refills at ``rate`` tokens per
+second; each request takes one. ``LocalTokenBucket`` is shared by all threads
+of a process. ``RedisTokenBucket`` keeps the bucket in Redis so every worker
+process draws from one budget, and falls back to its local bucket while Redis
+is unreachable.
+"""
+
+import logging
+import random
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class LocalTokenBucket:
+    """Thread-safe in-process token bucket; waiters block on a condition."""
+
+    def __init__(self, rate, burst):
+        self.rate = max(0.001, float(rate))
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._condition = threading.Condition()
+
+    def _refill(self, now):
+        elapsed = now - self._updated_at
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+
+    def try_acquire(self, tokens=1):
+        """Take ``tokens`` if available; return 0.0 on success or the seconds until they will be."""
+        with self._condition:
+            return self._try_acquire_locked(tokens)
+
+    def _try_acquire_locked(self, tokens):
+        self._refill(time.monotonic())
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens=1, timeout=None):
+        """Block until ``tokens`` are available; return False if ``timeout`` seconds pass first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                wait = self._try_acquire_locked(tokens)
+                if wait <= 0:
+                    # Leftover tokens may satisfy another waiter straight away.
+                    if self._tokens >= 1:
+                        self._condition.notify()
+                    return True
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                self._condition.wait(wait)
+
+
+# Atomically refill and take one token. Uses the Redis server clock so workers
+# on hosts with skewed clocks still share one budget. Returns 0 when a token
+# was taken, otherwise the milliseconds until one is available.
+_REDIS_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait_ms = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait_ms = math.ceil((requested - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return wait_ms
+"""
+
+
+class RedisTokenBucket:
+    """Token bucket stored in Redis and shared by every worker process."""
+
+    # Back off from Redis for this long after an error before trying it again.
+    REDIS_RETRY_SECONDS = 30
+
+    def __init__(self, redis_client, rate, burst, key='tmdb:ratelimit'):
+        self.redis_client = redis_client
+        self.key = key
+        self.rate = max(0.001, float(rate))
+        self.burst = max(1.0, float(burst))
+        self.local = LocalTokenBucket(self.rate, self.burst)
+        self._script = redis_client.register_script(_REDIS_TAKE_SCRIPT)
+        self._redis_down_until = 0.0
+        self._condition = threading.Condition()
+
+    def try_acquire(self, tokens=1):
+        if time.monotonic() < self._redis_down_until:
+            return self.local.try_acquire(tokens)
+        try:
+            return int(self._script(keys=[self.key], args=[self.rate, self.burst, tokens])) / 1000.0
+        except Exception as exc:
+            logger.warning("TMDB shared rate limiter unavailable, using per-process bucket: %s", exc)
+            self._redis_down_until = time.monotonic() + self.REDIS_RETRY_SECONDS
+            return self.local.try_acquire(tokens)
+
+    def acquire(self, tokens=1, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            # Spread retries so waiting threads do not hit Redis in lockstep.
+            with self._condition:
+                self._condition.wait(wait * random.uniform(1.0, 1.2))
+
+
+def build_rate_limiter(rate, burst, redis_client=None, key='tmdb:ratelimit'):
+    """Return a Redis-shared bucket when a client is available, else a per-process one."""
+    if redis_client is not None:
+        try:
+            return RedisTokenBucket(redis_client, rate, burst, key=key)
+        except Exception as exc:
+            logger.warning("TMDB shared rate limiter setup failed, using per-process bucket: %s", exc)
+    return LocalTokenBucket(rate, burst)
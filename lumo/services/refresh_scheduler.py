@@ -0,0 +1,361 @@
+"""
+Continuous refresh of the TMDB warm set.
+
+The scheduler owns a list of ``RefreshTask`` entries (homepage lists, section
+pages, genre pages...). Each task is re-fetched shortly before the soft TTL of
+the endpoint it fills runs out, so pages keep reading fresh entries instead of
+waiting for a visitor to hit a stale one.
+
+Every worker process runs a scheduler thread, but each tick is led by a single
+process: a Redis lock when the cache uses Redis, otherwise a lock file next to
+the state file. Per-task refresh times and the last run summary are kept in
+that shared state (Redis key or JSON file), so leadership can move between
+workers and across restarts without refreshing everything again.
+
+``AccessTracker`` keeps exponentially decayed access counts per cache key so
+the warm set can follow real traffic (popular detail pages, deep genre
+pages) instead of only the hand-picked lists.
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshTask:
+    """A named refresh step; ``ttl_seconds`` is the soft TTL of the entries it fills."""
+
+    __slots__ = ('name', 'ttl_seconds', 'fn')
+
+    def __init__(self, name, ttl_seconds, fn):
+        self.name = name
+        self.ttl_seconds = max(60, int(ttl_seconds))
+        self.fn = fn
+
+    def __repr__(self):
+        return f"RefreshTask({self.name!r}, ttl_seconds={self.ttl_seconds})"
+
+
+class _FileLeaderStore:
+    """Lock file plus JSON state file shared by the processes on one host."""
+
+    def __init__(self, state_dir, name="tmdb_refresh"):
+        state_dir = Path(state_dir)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        self.lock_path = state_dir / f"{name}.lock"
+        self.state_path = state_dir / f"{name}.json"
+
+    def acquire(self, ttl_seconds):
+        now_ts = time.time()
+        for _ in range(2):
+            try:
+                fd = os.open(str(self.lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    handle.write(str(os.getpid()))
+                return True
+            except FileExistsError:
+                # Reclaim locks left behind by a worker that died mid-run.
+                try:
+                    if now_ts - self.lock_path.stat().st_mtime < ttl_seconds:
+                        return False
+                    self.lock_path.unlink()
+                except FileNotFoundError:
+                    continue
+                except OSError:
+                    return False
+        return False
+
+    def release(self):
+        try:
+            self.lock_path.unlink()
+        except OSError:
+            pass
+
+    def load(self):
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, state):
+        tmp_path = self.state_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp_path, self.state_path)
+
+
+class _RedisLeaderStore:
+    """Lock and state kept in Redis so one process across all hosts leads a tick."""
+
+    def __init__(self, redis_client, key="tmdb:refresh"):
+        self.redis_client = redis_client
+        self.lock_key = f"{key}:lock"
+        self.state_key = f"{key}:state"
+        self.token = f"{os.getpid()}:{random.random()}"
+
+    def acquire(self, ttl_seconds):
+        return bool(self.redis_client.set(self.lock_key, self.token, nx=True, ex=int(ttl_seconds)))
+
+    def release(self):
+        try:
+            current = self.redis_client.get(self.lock_key)
+            if current is not None and (current.decode() if isinstance(current, bytes) else current) == self.token:
+                self.redis_client.delete(self.lock_key)
+        except Exception as exc:
+            logger.debug("TMDB refresh lock release failed: %s", exc)
+
+    def load(self):
+        raw = self.redis_client.get(self.state_key)
+        if not raw:
+            return {}
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return {}
+
+    def save(self, state):
+        self.redis_client.set(self.state_key, json.dumps(state))
+
+
+class AccessTracker:
+    """Exponentially decayed access counts per cache key, merged into shared state.
+
+    ``record`` only bumps an in-process counter. ``flush`` decays the shared
+    scores to now (halving every ``half_life_seconds``), adds the pending
+    counts and keeps the ``max_keys`` hottest keys. Each key remembers the
+    endpoint and params needed to fetch it again.
+    """
+
+    def __init__(self, state_dir, redis_client=None, half_life_seconds=6 * 3600, max_keys=2000,
+                 lock_ttl_seconds=60):
+        self.half_life_seconds = max(60.0, float(half_life_seconds))
+        self.max_keys = max(1, int(max_keys))
+        self.lock_ttl_seconds = max(5, int(lock_ttl_seconds))
+        self._file_store = _FileLeaderStore(state_dir, name="tmdb_access")
+        self._redis_store = _RedisLeaderStore(redis_client, key="tmdb:access") if redis_client is not None else None
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def _store(self):
+        return self._redis_store or self._file_store
+
+    def record(self, cache_key, endpoint, params):
+        with self._lock:
+            pending = self._pending.get(cache_key)
+            if pending is not None:
+                pending[0] += 1
+            elif len(self._pending) < self.max_keys:
+                self._pending[cache_key] = [1, endpoint, params]
+
+    def _decay(self, scores, elapsed):
+        factor = 0.5 ** (max(0.0, elapsed) / self.half_life_seconds)
+        for entry in scores.values():
+            entry[0] *= factor
+
+    def flush(self, now_ts=None):
+        """Merge pending counts into shared state; returns False if they stay pending."""
+        now_ts = time.time() if now_ts is None else now_ts
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return True
+
+        store = self._store()
+        try:
+            acquired = store.acquire(self.lock_ttl_seconds)
+        except Exception as exc:
+            logger.warning("TMDB access stats lock unavailable, using host lock: %s", exc)
+            store = self._file_store
+            acquired = store.acquire(self.lock_ttl_seconds)
+        if not acquired:
+            self._requeue(pending)
+            return False
+
+        try:
+            state = store.load()
+            scores = state.get("keys") or {}
+            self._decay(scores, now_ts - float(state.get("updated_at") or now_ts))
+            for cache_key, (count, endpoint, params) in pending.items():
+                entry = scores.setdefault(cache_key, [0.0, endpoint, params])
+                entry[0] += count
+            if len(scores) > self.max_keys:
+                hottest = sorted(scores.items(), key=lambda item: item[1][0], reverse=True)[:self.max_keys]
+                scores = dict(hottest)
+            store.save({"updated_at": now_ts, "keys": scores})
+            return True
+        except Exception as exc:
+            logger.warning("TMDB access stats flush failed: %s", exc)
+            self._requeue(pending)
+            return False
+        finally:
+            store.release()
+
+    def _requeue(self, pending):
+        with self._lock:
+            for cache_key, (count, endpoint, params) in pending.items():
+                current = self._pending.get(cache_key)
+                if current is not None:
+                    current[0] += count
+                elif len(self._pending) < self.max_keys:
+                    self._pending[cache_key] = [count, endpoint, params]
+
+    def top(self, limit, min_score=0.0, now_ts=None):
+        """Return up to ``limit`` ``(cache_key, endpoint, params, score)`` tuples, hottest first."""
+        if limit <= 0:
+            return []
+        now_ts = time.time() if now_ts is None else now_ts
+        try:
+            state = self._store().load()
+        except Exception as exc:
+            logger.warning("TMDB access stats unavailable: %s", exc)
+            return []
+        scores = state.get("keys") or {}
+        self._decay(scores, now_ts - float(state.get("updated_at") or now_ts))
+        ranked = sorted(scores.items(), key=lambda item: item[1][0], reverse=True)
+        return [
+            (cache_key, endpoint, params, score)
+            for cache_key, (score, endpoint, params) in ranked[:limit]
+            if score >= min_score
+        ]
+
+
+class CacheRefreshScheduler:
+    """Leader-elected background refresher for a fixed set of ``RefreshTask``s.
+
+    ``tasks_factory`` returns the current task list and ``run_task`` executes
+    one task (e.g. inside an app context with cache reads bypassed). A task is
+    due ``lead_seconds`` before its TTL runs out, or immediately when it has
+    never run.
+    """
+
+    def __init__(self, tasks_factory, run_task, state_dir, redis_client=None, tick_seconds=60,
+                 lead_seconds=600, max_workers=3, lock_ttl_seconds=900, access_tracker=None):
+        self.tasks_factory = tasks_factory
+        self.run_task = run_task
+        # Every worker flushes its access counts each tick so the leader sees all traffic.
+        self.access_tracker = access_tracker
+        self.tick_seconds = max(5, int(tick_seconds))
+        self.lead_seconds = max(0, int(lead_seconds))
+        self.max_workers = max(1, int(max_workers))
+        self.lock_ttl_seconds = max(self.tick_seconds, int(lock_ttl_seconds))
+        self._file_store = _FileLeaderStore(state_dir)
+        self._redis_store = _RedisLeaderStore(redis_client) if redis_client is not None else None
+        self.last_run = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _store(self):
+        return self._redis_store or self._file_store
+
+    def start(self):
+        """Start the scheduler thread; returns False if it is already running."""
+        if self._thread is not None and self._thread.is_alive():
+            return False
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="tmdb-refresh-scheduler")
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        # Stagger workers that boot together so they do not race for the lock.
+        delay = random.uniform(1, 5)
+        while not self._stop_event.wait(delay):
+            try:
+                if self.access_tracker is not None:
+                    self.access_tracker.flush()
+                self.run_once()
+            except Exception as exc:
+                logger.warning("TMDB refresh scheduler tick failed: %s", exc)
+            delay = self.tick_seconds * random.uniform(0.9, 1.1)
+
+    def due_tasks(self, tasks, refreshed_at, now_ts):
+        return [
+            task for task in tasks
+            if task.name not in refreshed_at
+            or now_ts >= float(refreshed_at[task.name]) + task.ttl_seconds - self.lead_seconds
+        ]
+
+    def run_once(self, now_ts=None):
+        """Refresh due tasks if this process wins the tick; returns the run summary or None."""
+        now_ts = time.time() if now_ts is None else now_ts
+        store = self._store()
+        try:
+            if not store.acquire(self.lock_ttl_seconds):
+                return None
+        except Exception as exc:
+            logger.warning("TMDB refresh scheduler lock unavailable, using host lock: %s", exc)
+            store = self._file_store
+            if not store.acquire(self.lock_ttl_seconds):
+                return None
+
+        try:
+            state = store.load()
+            refreshed_at = state.get("refreshed_at") or {}
+            tasks = self.tasks_factory()
+            due = self.due_tasks(tasks, refreshed_at, now_ts)
+            if not due:
+                return None
+
+            started = time.perf_counter()
+            summary = {
+                "started_at": now_ts,
+                "pid": os.getpid(),
+                "due": len(due),
+                "refreshed": [],
+                "failed": [],
+            }
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(due)),
+                                    thread_name_prefix="tmdb-refresh-task") as executor:
+                futures = [(task, executor.submit(self.run_task, task)) for task in due]
+                for task, future in futures:
+                    try:
+                        future.result()
+                        refreshed_at[task.name] = time.time()
+                        summary["refreshed"].append(task.name)
+                    except Exception as exc:
+                        logger.warning("TMDB refresh task failed (%s): %s", task.name, exc)
+                        summary["failed"].append(task.name)
+
+            summary["duration_ms"] = int((time.perf_counter() - started) * 1000)
+            summary["finished_at"] = time.time()
+            known = {task.name for task in tasks}
+            state = {
+                "refreshed_at": {name: ts for name, ts in refreshed_at.items() if name in known},
+                "last_run": summary,
+            }
+            store.save(state)
+            self.last_run = summary
+            logger.info(
+                "TMDB refresh run: %s refreshed, %s failed in %sms",
+                len(summary["refreshed"]),
+                len(summary["failed"]),
+                summary["duration_ms"],
+            )
+            return summary
+        finally:
+            store.release()
+
+    def status(self):
+        """Shared last-run state for health output; falls back to this process's view."""
+        try:
+            state = self._store().load()
+        except Exception:
+            state = {}
+        last_run = state.get("last_run") or self.last_run
+        refreshed_at = state.get("refreshed_at") or {}
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "last_run": last_run,
+            "tasks_tracked": len(refreshed_at),
+            "oldest_refresh_at": min(refreshed_at.values()) if refreshed_at else None,
+        }
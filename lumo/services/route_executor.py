@@ -0,0 +1,133 @@
+"""
+Long-lived, bounded executor for route-level TMDB fan-out.
+
+Section pages fetch several independent lists at once. Creating a thread pool
+per call multiplies OS threads per request under threaded workers; this
+module keeps one pool per worker process instead. Submissions beyond
+``max_workers`` running plus ``max_queue`` waiting are refused, and the
+caller runs the task on its own thread. So a burst of section pages slows
+down gracefully instead of growing an unbounded queue behind the pool.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache_metrics import LatencyHistogram
+
+
+class RouteExecutor:
+    """Per-process bounded pool with queue-depth and task latency metrics."""
+
+    def __init__(self, max_workers=8, max_queue=32):
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._queued = 0
+        self._running = 0
+        self._abandoned = 0
+        self.max_queue_depth = 0
+        self.counters = {'submitted': 0, 'completed': 0, 'failed': 0, 'saturated': 0, 'timed_out': 0}
+        self.queue_wait = LatencyHistogram()
+        self.run_time = LatencyHistogram()
+
+    def _get_executor(self):
+        # A pool inherited across fork has no threads behind it; start a fresh one.
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='route-fanout')
+            self._pid = os.getpid()
+            self._queued = 0
+            self._running = 0
+        return self._executor
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue ``fn`` on the pool; returns its Future, or None when the pool is saturated."""
+        with self._lock:
+            executor = self._get_executor()
+            if self._queued + self._running >= self.max_workers + self.max_queue:
+                self.counters['saturated'] += 1
+                return None
+            self._queued += 1
+            self.counters['submitted'] += 1
+            self.max_queue_depth = max(self.max_queue_depth, self._queued)
+            future = executor.submit(self._run, time.perf_counter(), fn, args, kwargs)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future):
+        # A task cancelled before it started never reaches _run to leave the queue.
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def _run(self, submitted_at, fn, args, kwargs):
+        started = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self.queue_wait.observe((started - submitted_at) * 1000)
+        outcome = 'failed'
+        try:
+            result = fn(*args, **kwargs)
+            outcome = 'completed'
+            return result
+        finally:
+            with self._lock:
+                self._running -= 1
+                self.counters[outcome] += 1
+                self.run_time.observe((time.perf_counter() - started) * 1000)
+
+    def record_timeout(self, count=1):
+        with self._lock:
+            self.counters['timed_out'] += count
+
+    def abandon(self, future):
+        """Give up on ``future``: cancel it if it has not started, else track it until it ends.
+
+        An abandoned task still holds a pool slot; the ``abandoned`` gauge shows
+        how many slots are busy with results nobody is waiting for.
+        """
+        if future.cancel():
+            return
+        with self._lock:
+            self._abandoned += 1
+        future.add_done_callback(self._on_abandoned_done)
+
+    def _on_abandoned_done(self, _future):
+        with self._lock:
+            self._abandoned -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'queue_depth': self._queued,
+                'running': self._running,
+                'abandoned': self._abandoned,
+                'max_queue_depth': self.max_queue_depth,
+                **self.counters,
+                'queue_wait': self.queue_wait.snapshot(),
+                'run_time': self.run_time.snapshot(),
+            }
+
+
+_executor_lock = threading.Lock()
+
+
+def get_route_executor(app):
+    """Return the app's ``RouteExecutor``, creating it on first use."""
+    executor = app.extensions.get('route_executor')
+    if executor is None:
+        with _executor_lock:
+            executor = app.extensions.get('route_executor')
+            if executor is None:
+                executor = RouteExecutor(
+                    max_workers=app.config.get('ROUTE_FANOUT_WORKERS', 8),
+                    max_queue=app.config.get('ROUTE_FANOUT_QUEUE', 32),
+                )
+                app.extensions['route_executor'] = executor
+    return executor
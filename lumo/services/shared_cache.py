@@ -0,0 +1,298 @@
+"""
+Host-local shared cache tier for TMDB responses.
+
+Without Redis every gunicorn worker keeps a private memory tier, so a title
+fetched by one worker is a miss for its siblings until the filesystem tier is
+consulted. This module keeps a single SQLite database in WAL mode that all
+workers on a host read and write concurrently: readers never block writers,
+writes are serialized by SQLite's own locking, and each row carries its soft
+and hard expiry so stale entries can be served and dead ones skipped without
+decoding the payload.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+# Access times only need to be precise enough to order entries for eviction.
+ATIME_RESOLUTION_SECONDS = 600
+# Keep IN (...) lists below SQLite's bound-parameter limit.
+MAX_BATCH_KEYS = 500
+# Drop expired rows opportunistically every N writes even if no janitor runs.
+PURGE_EVERY_WRITES = 512
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    fresh_until REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    payload BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+"""
+
+
+class SQLiteCacheBackend:
+    """SQLite (WAL) key-value store shared by every worker process on a host.
+
+    Connections are opened lazily per thread and reopened after ``fork`` so a
+    backend created before gunicorn forks its workers stays usable.
+    """
+
+    def __init__(self, path, max_bytes=None, compress_level=6, busy_timeout_ms=2000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self.compress_level = int(compress_level)
+        self.busy_timeout_ms = int(busy_timeout_ms)
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        self._connect()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and getattr(self._local, "pid", None) == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(
+            str(self.path),
+            timeout=self.busy_timeout_ms / 1000.0,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL only risks losing the last commits on power loss, which is fine for a cache.
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _decode(self, key, row, now_ts):
+        fresh_until, expires_at, accessed_at, payload = row
+        if expires_at <= now_ts:
+            return None
+        try:
+            return fresh_until, expires_at, zlib.decompress(payload).decode("utf-8")
+        except (zlib.error, UnicodeDecodeError, TypeError) as exc:
+            logger.warning("TMDB shared cache decode error for %s: %s", key[:50], exc)
+            self.delete(key)
+            return None
+
+    def _touch(self, conn, keys, now_ts):
+        if not keys:
+            return
+        try:
+            conn.executemany(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                [(now_ts, key) for key in keys],
+            )
+        except sqlite3.Error as exc:
+            logger.debug("TMDB shared cache touch failed: %s", exc)
+
+    def read(self, key, now_ts):
+        """Return ``(fresh_until, expires_at, payload_text)`` for a live entry, else None."""
+        return self.read_many([key], now_ts).get(key)
+
+    def read_many(self, keys, now_ts):
+        """Return ``{key: (fresh_until, expires_at, payload_text)}`` for the live entries among ``keys``."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        if not keys:
+            return found
+
+        try:
+            conn = self._connect()
+            rows = []
+            for start in range(0, len(keys), MAX_BATCH_KEYS):
+                chunk = keys[start:start + MAX_BATCH_KEYS]
+                placeholders = ",".join("?" * len(chunk))
+                rows.extend(conn.execute(
+                    "SELECT key, fresh_until, expires_at, accessed_at, payload FROM entries "
+                    f"WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall())
+        except sqlite3.Error as exc:
+            logger.warning("TMDB shared cache read error: %s", exc)
+            return found
+
+        touched = []
+        for key, *row in rows:
+            entry = self._decode(key, row, now_ts)
+            if entry is None:
+                continue
+            found[key] = entry
+            if now_ts - row[2] > ATIME_RESOLUTION_SECONDS:
+                touched.append(key)
+        self._touch(conn, touched, now_ts)
+        return found
+
+    def write(self, key, payload_text, fresh_until, expires_at):
+        """Insert or replace an entry; return the stored size in bytes or None on failure."""
+        sizes = self.write_many([(key, payload_text, fresh_until, expires_at)])
+        return sizes.get(key)
+
+    def write_many(self, entries):
+        """Store ``(key, payload_text, fresh_until, expires_at)`` tuples in one transaction.
+
+        Returns ``{key: stored_size}`` for the rows written.
+        """
+        now_ts = time.time()
+        rows = []
+        for key, payload_text, fresh_until, expires_at in entries:
+            blob = zlib.compress(payload_text.encode("utf-8"), self.compress_level)
+            rows.append((key, float(fresh_until), float(expires_at), now_ts, len(blob), blob))
+        if not rows:
+            return {}
+
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO entries (key, fresh_until, expires_at, accessed_at, size, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        except sqlite3.Error as exc:
+            logger.warning("TMDB shared cache write error: %s", exc)
+            return {}
+
+        with self._writes_lock:
+            self._writes += len(rows)
+            purge = self._writes >= PURGE_EVERY_WRITES
+            if purge:
+                self._writes = 0
+        if purge:
+            self._purge_expired(conn, now_ts)
+
+        return {row[0]: row[4] for row in rows}
+
+    def add(self, key, payload_text, fresh_until, expires_at):
+        """Insert an entry only if ``key`` is absent or past its hard TTL; True when inserted.
+
+        Gives callers an atomic "set if not exists" across processes, e.g. for build locks.
+        """
+        now_ts = time.time()
+        blob = zlib.compress(payload_text.encode("utf-8"), self.compress_level)
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                changed = conn.execute(
+                    "INSERT INTO entries (key, fresh_until, expires_at, accessed_at, size, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET fresh_until = excluded.fresh_until, "
+                    "expires_at = excluded.expires_at, accessed_at = excluded.accessed_at, "
+                    "size = excluded.size, payload = excluded.payload "
+                    "WHERE entries.expires_at <= ?",
+                    (key, float(fresh_until), float(expires_at), now_ts, len(blob), blob, now_ts),
+                ).rowcount
+        except sqlite3.Error as exc:
+            logger.warning("TMDB shared cache add error: %s", exc)
+            return False
+        return changed > 0
+
+    def delete(self, key, payload_text=None):
+        """Delete ``key``; with ``payload_text``, only while the entry still holds that payload."""
+        try:
+            if payload_text is None:
+                self._connect().execute("DELETE FROM entries WHERE key = ?", (key,))
+            else:
+                blob = zlib.compress(payload_text.encode("utf-8"), self.compress_level)
+                self._connect().execute("DELETE FROM entries WHERE key = ? AND payload = ?", (key, blob))
+        except sqlite3.Error as exc:
+            logger.debug("TMDB shared cache delete failed: %s", exc)
+
+    def _purge_expired(self, conn, now_ts):
+        """Delete rows past their hard TTL; returns ``(count, bytes)`` removed."""
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                expired_count, expired_bytes = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE expires_at <= ?",
+                    (now_ts,),
+                ).fetchone()
+                if expired_count:
+                    conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now_ts,))
+            return expired_count, expired_bytes
+        except sqlite3.Error as exc:
+            logger.warning("TMDB shared cache purge error: %s", exc)
+            return 0, 0
+
+    def sweep(self, now_ts=None, max_bytes=None):
+        """Delete expired rows and evict least recently accessed ones above ``max_bytes``.
+
+        Returns a report shaped like ``DiskCacheBackend.sweep``.
+        """
+        now_ts = time.time() if now_ts is None else now_ts
+        max_bytes = max_bytes or self.max_bytes
+        report = {
+            "expired": 0,
+            "evicted": 0,
+            "reclaimed_bytes": 0,
+            "remaining_entries": 0,
+            "remaining_bytes": 0,
+        }
+        try:
+            conn = self._connect()
+            report["expired"], report["reclaimed_bytes"] = self._purge_expired(conn, now_ts)
+            entries, total_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+
+            if max_bytes and total_bytes > max_bytes:
+                victims = []
+                for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+                    if total_bytes <= max_bytes:
+                        break
+                    victims.append((key,))
+                    total_bytes -= size
+                    report["reclaimed_bytes"] += size
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+                report["evicted"] = len(victims)
+                entries -= len(victims)
+
+            report["remaining_entries"] = entries
+            report["remaining_bytes"] = total_bytes
+            # Fold the WAL back into the main file so it does not grow without bound.
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as exc:
+            logger.warning("TMDB shared cache sweep error: %s", exc)
+        return report
+
+    def clear(self):
+        """Remove every entry; returns the number of rows deleted."""
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                deleted = conn.execute("DELETE FROM entries").rowcount
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return deleted
+        except sqlite3.Error as exc:
+            logger.warning("TMDB shared cache clear error: %s", exc)
+            return 0
+
+    def stats(self):
+        try:
+            entries, total_bytes = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        except sqlite3.Error:
+            entries, total_bytes = 0, 0
+        return {"entries": entries, "bytes": total_bytes, "max_bytes": self.max_bytes}
@@ -0,0 +1,225 @@
+"""
+Asyncio engine for batched TMDB requests.
+
+``AsyncTMDBClient`` runs one event loop in a daemon thread per worker process
+and keeps an ``httpx.AsyncClient`` on it, so a single request thread can have
+many TMDB calls in flight without a thread per call. Callers stay synchronous:
+``fetch_many`` submits a batch to the loop and blocks until it finishes.
+Caching and single-flight coalescing stay in ``TMDBService``; this module only
+does HTTP, retries and rate limiting.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import os
+import threading
+import time
+
+try:
+    import httpx
+except Exception:  # pragma: no cover - graceful fallback when httpx is unavailable
+    httpx = None
+
+from .cache_metrics import endpoint_family
+from .rate_limiter import LocalTokenBucket
+
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class AsyncTMDBClient:
+    """Bounded-concurrency TMDB client driven from synchronous code."""
+
+    def __init__(self, base_url, rate_limiter, max_concurrency=16, max_wait_seconds=5, metrics=None,
+                 circuit_breaker=None, negative_status_codes=(), negative_entry=None):
+        if httpx is None:
+            raise RuntimeError("httpx is required for the async TMDB client")
+        self.base_url = base_url.rstrip('/')
+        self.rate_limiter = rate_limiter
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_wait_seconds = float(max_wait_seconds)
+        self.metrics = metrics
+        self.circuit_breaker = circuit_breaker
+        # Non-retryable statuses turned into ``negative_entry(status)`` results for the caller to cache.
+        self.negative_status_codes = frozenset(negative_status_codes) if negative_entry else frozenset()
+        self.negative_entry = negative_entry
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._client = None
+        self._semaphore = None
+        self._pid = None
+
+    def _ensure_loop(self):
+        with self._lock:
+            # A loop inherited across fork has no thread behind it; start a fresh one.
+            if self._loop is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(loop)
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.max_concurrency,
+                        max_keepalive_connections=self.max_concurrency,
+                    ),
+                    headers={'Accept': 'application/json', 'User-Agent': 'LUMO/1.0'},
+                )
+                ready.set()
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run, daemon=True, name='tmdb-async')
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+            self._pid = os.getpid()
+            return loop
+
+    async def _acquire_token(self, deadline=None):
+        max_wait = self.max_wait_seconds
+        if deadline is not None:
+            max_wait = min(max_wait, deadline - time.monotonic())
+        give_up_at = time.monotonic() + max_wait
+        # The shared bucket is a Redis round trip; keep it off the loop thread.
+        blocking = not isinstance(self.rate_limiter, LocalTokenBucket)
+        while True:
+            if blocking:
+                wait = await asyncio.get_running_loop().run_in_executor(None, self.rate_limiter.try_acquire)
+            else:
+                wait = self.rate_limiter.try_acquire()
+            if wait <= 0:
+                return True
+            if time.monotonic() + wait > give_up_at:
+                return False
+            await asyncio.sleep(wait)
+
+    def _record(self, endpoint, outcome, started=None):
+        if self.metrics is not None:
+            elapsed_ms = None if started is None else (time.perf_counter() - started) * 1000
+            self.metrics.record(endpoint_family(endpoint), 'network', outcome, elapsed_ms)
+
+    def _record_circuit(self, ok):
+        if self.circuit_breaker is None:
+            return
+        if ok:
+            self.circuit_breaker.record_success()
+        else:
+            self.circuit_breaker.record_failure()
+
+    @staticmethod
+    def _out_of_time(deadline, needed=0.0):
+        return deadline is not None and time.monotonic() + needed >= deadline
+
+    async def _fetch_one(self, endpoint, params, timeout, retries, stats, deadline=None):
+        """Mirror ``TMDBService._request_with_retries``: same retry classes and backoff.
+
+        ``deadline`` is a ``time.monotonic()`` value past which no attempt or
+        retry is started.
+        """
+        async with self._semaphore:
+            for attempt in range(retries + 1):
+                if self._out_of_time(deadline):
+                    logger.info("TMDB request budget spent, skipping: %s", endpoint)
+                    self._record(endpoint, 'deadline')
+                    return None
+                if self.circuit_breaker is not None and not self.circuit_breaker.allow():
+                    logger.info("TMDB circuit open, failing fast: %s", endpoint)
+                    self._record(endpoint, 'short_circuit')
+                    return None
+                if not await self._acquire_token(deadline):
+                    logger.warning("TMDB rate limiter wait exceeded, skipping request: %s", endpoint)
+                    return None
+
+                stats['api_calls'] += 1
+                if attempt > 0:
+                    logger.info("TMDB retry %s/%s: %s", attempt, retries, endpoint)
+                else:
+                    logger.debug("TMDB async API request: %s", endpoint)
+
+                backoff = None
+                started = time.perf_counter()
+                try:
+                    attempt_timeout = timeout if deadline is None else max(0.0, min(timeout, deadline - time.monotonic()))
+                    response = await self._client.get(f"{self.base_url}/{endpoint}", params=params, timeout=attempt_timeout)
+                    self._record(endpoint, 'error' if response.is_error else 'ok', started)
+                    self._record_circuit(response.status_code not in RETRYABLE_STATUS_CODES)
+                    if response.status_code in RETRYABLE_STATUS_CODES:
+                        if attempt < retries:
+                            backoff = min(2 ** (attempt + 1), 30)
+                            logger.warning("TMDB API HTTP %s, retrying in %ss (%s/%s): %s",
+                                           response.status_code, backoff, attempt + 1, retries, endpoint)
+                        else:
+                            logger.error("TMDB API HTTP error %s for %s", response.status_code, endpoint)
+                            return None
+                    elif response.is_error:
+                        if response.status_code in self.negative_status_codes:
+                            logger.info("TMDB API HTTP %s for %s, caching negative result", response.status_code, endpoint)
+                            return self.negative_entry(response.status_code)
+                        logger.error("TMDB API HTTP error %s for %s", response.status_code, endpoint)
+                        return None
+                    else:
+                        return response.json()
+                except httpx.TimeoutException:
+                    self._record(endpoint, 'error', started)
+                    self._record_circuit(False)
+                    if attempt >= retries:
+                        logger.error("TMDB API timeout after %s retries: %s", retries, endpoint)
+                        return None
+                    backoff = min(2 ** attempt, 8)
+                    logger.warning("TMDB API timeout, retrying in %ss (%s/%s): %s", backoff, attempt + 1, retries, endpoint)
+                except (httpx.HTTPError, ValueError) as exc:
+                    self._record(endpoint, 'error', started)
+                    self._record_circuit(False)
+                    if attempt >= retries:
+                        logger.error("TMDB API error after %s retries: %s", retries, exc)
+                        return None
+                    backoff = min(2 ** attempt, 8)
+                    logger.warning("TMDB API error, retrying in %ss (%s/%s): %s", backoff, attempt + 1, retries, endpoint)
+
+                if self._out_of_time(deadline, backoff):
+                    logger.info("TMDB request budget too short to retry: %s", endpoint)
+                    return None
+                await asyncio.sleep(backoff)
+        return None
+
+    async def _gather(self, calls, timeout, retries, stats, deadline):
+        return await asyncio.gather(*[
+            self._fetch_one(endpoint, params, timeout, retries, stats, deadline)
+            for endpoint, params in calls
+        ])
+
+    def fetch_many(self, calls, timeout=10, retries=3, deadline=None):
+        """Fetch ``(endpoint, params)`` calls concurrently, giving up at ``deadline`` (monotonic).
+
+        Returns ``(results, api_calls)``: parsed JSON, a negative entry or None
+        per call in order, and the number of HTTP attempts made. The caller
+        blocks at most until ``deadline``, or for the longest run the retry
+        schedule allows without one; past that the batch is cancelled.
+        """
+        calls = list(calls)
+        if not calls:
+            return [], 0
+
+        stats = {'api_calls': 0}
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._gather(calls, timeout, retries, stats, deadline), loop)
+        try:
+            return future.result(timeout=self._batch_timeout(timeout, retries, deadline)), stats['api_calls']
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            logger.error("TMDB async batch of %s calls did not finish in time, cancelled", len(calls))
+            return [None] * len(calls), stats['api_calls']
+
+    def _batch_timeout(self, timeout, retries, deadline):
+        # Attempts stop at the deadline on their own; allow one more second for them to unwind.
+        if deadline is not None:
+            return max(0.0, deadline - time.monotonic()) + 1.0
+        # Each attempt: rate limiter wait + request timeout + the longest backoff (30s for HTTP 429/5xx).
+        return (self.max_wait_seconds + float(timeout) + 30.0) * (retries + 1)
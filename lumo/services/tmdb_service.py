@@ -14,9 +14,22 @@ import time
 import math
 import logging
 import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 import hashlib
+import fnmatch
+import re
+
+from .cache_metrics import CacheMetrics, endpoint_family
+from .circuit_breaker import OPEN, build_circuit_breaker
+from .disk_cache import DiskCacheBackend, DiskCacheJanitor
+from .media_type_index import MediaTypeIndex
+from .rate_limiter import build_rate_limiter
+from .refresh_scheduler import AccessTracker, RefreshTask
+from .tmdb_async import RETRYABLE_STATUS_CODES, AsyncTMDBClient
+from .shared_cache import SQLiteCacheBackend
 
 try:
     import redis
@@ -26,21 +39,349 @@ except Exception:  # pragma: no cover - graceful fallback when redis client unav
 
 logger = logging.getLogger(__name__)
 
+# Extra payload requested by the movie/TV detail pages.
+DETAIL_APPEND_PARAMS = {
+    'append_to_response': 'credits,videos,similar,recommendations,images',
+    'include_image_language': 'en,null',
+}
+
+# Fields grids need; everything else in a detail payload stays out of the card tier.
+CARD_FIELDS = (
+    'id', 'title', 'name', 'poster_path', 'backdrop_path',
+    'release_date', 'first_air_date', 'vote_average', 'media_type',
+)
+_DETAIL_ENDPOINT_RE = re.compile(r'^(movie|tv)/(\d+)$')
+
+
+# A TMDB call is not started with less than this much of the request budget left.
+TMDB_MIN_CALL_SECONDS = 0.25
+
+# Responses that will not change on retry (bad ids, invalid params) are cached
+# briefly as negative entries so repeated lookups skip the guaranteed failure.
+NEGATIVE_CACHE_STATUS_CODES = frozenset({400, 404, 422})
+NEGATIVE_CACHE_MARKER = '__tmdb_negative__'
+
+
+def negative_entry(status_code):
+    """Cache value recording a non-retryable TMDB failure."""
+    return {NEGATIVE_CACHE_MARKER: int(status_code)}
+
+
+def is_negative(value):
+    return isinstance(value, dict) and NEGATIVE_CACHE_MARKER in value
+
+
+def card_cache_key(media_type, tmdb_id):
+    """Cache key for the slim card projection of a title."""
+    return f"card/{media_type}/{tmdb_id}_{{}}"
+
+
+def project_card(item, media_type):
+    """Reduce a movie/TV payload (detail or list item) to the fields grids render."""
+    card = {field: item[field] for field in CARD_FIELDS if item.get(field) is not None}
+    card['media_type'] = media_type
+    return card
+
+
+def cards_from_payload(endpoint, data):
+    """Yield ``(media_type, card)`` for every title in a detail or list response."""
+    if not isinstance(data, dict):
+        return
+
+    match = _DETAIL_ENDPOINT_RE.match(endpoint)
+    if match:
+        if data.get('id'):
+            yield match.group(1), project_card(data, match.group(1))
+        return
+
+    results = data.get('results')
+    if not isinstance(results, list):
+        return
+    parts = endpoint.split('/')
+    default_type = 'tv' if 'tv' in parts else 'movie' if 'movie' in parts else None
+    for item in results:
+        if not isinstance(item, dict) or not item.get('id'):
+            continue
+        media_type = item.get('media_type') or default_type
+        if media_type in {'movie', 'tv'}:
+            yield media_type, project_card(item, media_type)
+
+
+def _estimate_payload_size(value):
+    """Approximate the memory footprint of a cached payload by its compact JSON length."""
+    try:
+        return len(json.dumps(value, ensure_ascii=False, separators=(',', ':')))
+    except (TypeError, ValueError):
+        return 1024
+
+
+class _LRUShard:
+    """One independently locked slice of a ShardedLRUCache."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes_used -= entry[1]
+        return entry
+
+
+class ShardedLRUCache:
+    """Byte-budgeted LRU cache split into independently locked shards.
+
+    Each shard owns an equal slice of ``max_bytes`` and evicts its least recently
+    used entries once that slice is exceeded, so hot list pages survive bursts of
+    cold detail lookups and threads touching different keys rarely share a lock.
+    """
+
+    def __init__(self, max_bytes, shard_count=16):
+        self.shard_count = max(1, int(shard_count or 1))
+        self.max_bytes = max(self.shard_count, int(max_bytes or 0))
+        shard_budget = self.max_bytes // self.shard_count
+        self._shards = [_LRUShard(shard_budget) for _ in range(self.shard_count)]
+
+    def _shard_for(self, key):
+        return self._shards[hash(key) % self.shard_count]
+
+    def get(self, key, now_ts=None):
+        """Return a live value and mark it most recently used, or None."""
+        shard = self._shard_for(key)
+        now_ts = time.time() if now_ts is None else now_ts
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now_ts:
+                shard.discard(key)
+                return None
+            shard.entries.move_to_end(key)
+            return entry[2]
+
+    def set(self, key, value, expires_at, size=None):
+        """Store a value, evicting least recently used entries to stay under budget.
+
+        Returns False when the payload alone exceeds a shard's budget; such entries
+        are left to the shared tiers instead of flushing a whole shard.
+        """
+        if size is None:
+            size = _estimate_payload_size(value)
+        shard = self._shard_for(key)
+        with shard.lock:
+            shard.discard(key)
+            if size > shard.max_bytes:
+                return False
+            shard.entries[key] = (expires_at, size, value)
+            shard.bytes_used += size
+            while shard.bytes_used > shard.max_bytes:
+                _, (_, evicted_size, _) = shard.entries.popitem(last=False)
+                shard.bytes_used -= evicted_size
+        return True
+
+    def pop(self, key):
+        shard = self._shard_for(key)
+        with shard.lock:
+            entry = shard.discard(key)
+        return entry[2] if entry else None
+
+    def clear(self):
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+                shard.bytes_used = 0
+
+    def stats(self):
+        """Return entry count and approximate bytes held across all shards."""
+        entries = 0
+        bytes_used = 0
+        for shard in self._shards:
+            with shard.lock:
+                entries += len(shard.entries)
+                bytes_used += shard.bytes_used
+        return {'entries': entries, 'bytes': bytes_used, 'max_bytes': self.max_bytes}
+
+    def __len__(self):
+        return self.stats()['entries']
+
+
+class SingleFlightTimeout(Exception):
+    """Raised when waiting on another thread's in-flight call exceeds the bound."""
+
+
+class _InFlightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait for its outcome, receiving the same result or re-raising the
+    same exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def claim(self, key):
+        """Register interest in ``key``; return ``(call, is_leader)``.
+
+        The leader must finish the call with ``resolve``; followers wait with ``wait``.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = _InFlightCall()
+            self._calls[key] = call
+            return call, True
+
+    def resolve(self, key, call, result=None, error=None):
+        call.result = result
+        call.error = error
+        with self._lock:
+            self._calls.pop(key, None)
+        call.done.set()
+
+    @staticmethod
+    def wait(key, call, wait_timeout=None):
+        if not call.done.wait(wait_timeout):
+            raise SingleFlightTimeout(key)
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def do(self, key, fn, wait_timeout=None):
+        """Run ``fn`` once per in-flight key and return ``(result, shared)``."""
+        call, is_leader = self.claim(key)
+        if not is_leader:
+            return self.wait(key, call, wait_timeout), True
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            self.resolve(key, call, error=exc)
+            raise
+        self.resolve(key, call, result=result)
+        return result, False
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+def endpoint_from_cache_key(cache_key):
+    """Recover the TMDB endpoint from a ``{endpoint}_{json params}`` cache key."""
+    return cache_key.split('_{', 1)[0]
+
+
+class CachePolicy:
+    """TTL and tier placement for TMDB endpoints matching a glob pattern.
+
+    ``ttl`` is the soft TTL after which entries are refreshed in the background,
+    ``hard_ttl`` the point after which they are no longer served. ``tiers`` lists
+    where entries may be stored and ``max_bytes`` optionally caps the serialized
+    payload size accepted per tier.
+    """
+
+    TIERS = ('memory', 'shared', 'redis', 'disk')
+
+    def __init__(self, pattern='*', ttl=6 * 3600, hard_ttl=None, tiers=TIERS, max_bytes=None):
+        self.pattern = pattern
+        self.ttl = max(0, int(ttl))
+        self.hard_ttl = max(self.ttl, int(hard_ttl if hard_ttl is not None else self.ttl))
+        self.tiers = frozenset(tier for tier in tiers if tier in self.TIERS)
+        self.max_bytes = {tier: int(limit) for tier, limit in (max_bytes or {}).items()}
+
+    def matches(self, endpoint):
+        return fnmatch.fnmatchcase(endpoint, self.pattern)
+
+    def allows(self, tier, size=0):
+        """Whether a payload of ``size`` bytes may be stored in ``tier``."""
+        if tier not in self.tiers:
+            return False
+        limit = self.max_bytes.get(tier)
+        return limit is None or size <= limit
+
+    def __repr__(self):
+        return f"CachePolicy({self.pattern!r}, ttl={self.ttl}, hard_ttl={self.hard_ttl}, tiers={sorted(self.tiers)})"
+
+
+class CachePolicyTable:
+    """Ordered list of cache policies; the first matching pattern wins."""
+
+    MAX_MEMOIZED_ENDPOINTS = 4096
+
+    def __init__(self, rules=None, default_ttl=6 * 3600, default_hard_ttl=24 * 3600):
+        self.policies = []
+        for rule in rules or []:
+            rule = dict(rule)
+            rule.setdefault('hard_ttl', max(int(rule.get('ttl', default_ttl)), default_hard_ttl))
+            self.policies.append(CachePolicy(**rule))
+        self.default = CachePolicy('*', ttl=default_ttl, hard_ttl=max(default_ttl, default_hard_ttl))
+        self._resolved = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, endpoint):
+        policy = self._resolved.get(endpoint)
+        if policy is not None:
+            return policy
+
+        policy = next((candidate for candidate in self.policies if candidate.matches(endpoint)), self.default)
+        with self._lock:
+            # Detail endpoints embed ids, so keep the memo bounded.
+            if len(self._resolved) >= self.MAX_MEMOIZED_ENDPOINTS:
+                self._resolved.clear()
+            self._resolved[endpoint] = policy
+        return policy
+
+
 class TMDBCache:
-    """Handles caching of TMDB API responses"""
+    """Handles caching of TMDB API responses
+
+    Entries carry a soft TTL (``fresh_until``) and a hard TTL. Between the two an
+    entry is stale: it can still be served while a refresh runs in the background.
+    TTLs and tier placement come from the ``TMDB_CACHE_POLICIES`` table.
+
+    Lookups go memory -> Redis when configured, otherwise memory -> host-local
+    shared SQLite tier -> filesystem.
+    """
     
     def __init__(self, cache_dir='instance/cache'):
+        config = current_app.config if has_app_context() else {}
         self.redis_client = None
         self.redis_prefix = 'tmdb:cache:'
         self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.disk = DiskCacheBackend(self.cache_dir, compress_level=config.get('TMDB_DISK_CACHE_COMPRESS_LEVEL', 6))
+        self.shared = None
         self.cache_duration = timedelta(hours=6)  # Cache for 6 hours
         self.cache_duration_seconds = int(self.cache_duration.total_seconds())
-        self.memory_cache = {}
-        self.memory_cache_max_entries = 2000
-        self.memory_lock = threading.Lock()
+        self.hard_ttl_seconds = max(
+            self.cache_duration_seconds,
+            int(config.get('TMDB_CACHE_HARD_TTL_SECONDS', 24 * 3600)),
+        )
+        self.policies = CachePolicyTable(
+            config.get('TMDB_CACHE_POLICIES'),
+            default_ttl=self.cache_duration_seconds,
+            default_hard_ttl=self.hard_ttl_seconds,
+        )
+        # Negative entries live in every tier and are never served stale.
+        negative_ttl = max(1, int(config.get('TMDB_NEGATIVE_CACHE_SECONDS', 600)))
+        self.negative_policy = CachePolicy('negative', ttl=negative_ttl, hard_ttl=negative_ttl)
+        self.memory_cache = ShardedLRUCache(
+            max_bytes=config.get('TMDB_MEMORY_CACHE_MAX_BYTES', 32 * 1024 * 1024),
+            shard_count=config.get('TMDB_MEMORY_CACHE_SHARDS', 16),
+        )
 
-        redis_url = current_app.config.get('REDIS_URL') if has_app_context() else None
+        redis_url = config.get('REDIS_URL')
         if redis_url and redis is not None:
             try:
                 self.redis_client = redis.Redis.from_url(redis_url, decode_responses=True)
@@ -50,122 +391,368 @@ class TMDBCache:
                 logger.warning("Redis cache unavailable, falling back to filesystem: %s", exc)
                 self.redis_client = None
 
+        if self.redis_client is None and config.get('TMDB_SHARED_CACHE_ENABLED', True):
+            shared_path = config.get('TMDB_SHARED_CACHE_PATH') or self.cache_dir / 'tmdb-shared.sqlite3'
+            try:
+                self.shared = SQLiteCacheBackend(
+                    shared_path,
+                    max_bytes=config.get('TMDB_SHARED_CACHE_MAX_BYTES', 128 * 1024 * 1024),
+                    compress_level=config.get('TMDB_DISK_CACHE_COMPRESS_LEVEL', 6),
+                )
+                logger.info("TMDB cache backend: shared sqlite (%s)", shared_path)
+            except Exception as exc:
+                logger.warning("Shared sqlite cache unavailable, using filesystem only: %s", exc)
+                self.shared = None
+
+        self.janitor = DiskCacheJanitor(
+            self.disk,
+            interval_seconds=config.get('TMDB_DISK_CACHE_SWEEP_SECONDS', 600),
+            max_bytes=config.get('TMDB_DISK_CACHE_MAX_BYTES', 256 * 1024 * 1024),
+            shared=self.shared,
+        )
+
+        self._io_executor = None
+        self._io_lock = threading.Lock()
+        self.metrics = CacheMetrics()
+        self.media_types = MediaTypeIndex(self)
+        # Kept out of the top level of cache_dir, whose stray JSON files the janitor removes.
+        self.access = None
+        if config.get('TMDB_ACCESS_TRACKING_ENABLED', True):
+            self.access = AccessTracker(
+                self.cache_dir / 'stats',
+                redis_client=self.redis_client,
+                half_life_seconds=config.get('TMDB_ACCESS_HALF_LIFE_SECONDS', 6 * 3600),
+                max_keys=config.get('TMDB_ACCESS_MAX_KEYS', 2000),
+            )
+
         logger.info("TMDB cache directory: %s", self.cache_dir.absolute())
     
     def get_cache_path(self, key):
         """Get the file path for a cache key using hash for safe filenames"""
-        # Use hash to create safe, consistent filenames
-        key_hash = hashlib.md5(key.encode('utf-8')).hexdigest()
-        return self.cache_dir / f"{key_hash}.json"
+        return self.disk.path_for(key)
 
     def get_redis_key(self, key):
         key_hash = hashlib.md5(key.encode('utf-8')).hexdigest()
         return f"{self.redis_prefix}{key_hash}"
-    
-    def get(self, key):
-        """Get cached data if it exists and is not expired"""
+
+    def policy_for(self, key):
+        """Resolve the cache policy for a cache key."""
+        return self.policies.resolve(endpoint_from_cache_key(key))
+
+    def _uses_redis(self, policy):
+        return self.redis_client is not None and 'redis' in policy.tiers
+
+    def _uses_shared(self, policy):
+        return self.shared is not None and 'shared' in policy.tiers
+
+    def _entry_deadlines(self, cache_data, policy):
+        """Return (fresh_until, expires_at) for a stored envelope, including legacy ones."""
+        fresh_until = cache_data.get('fresh_until')
+        expires_at = cache_data.get('expires_at')
+        if fresh_until is None or expires_at is None:
+            stored_at = datetime.fromisoformat(cache_data['timestamp']).timestamp()
+            fresh_until = stored_at + policy.ttl
+            expires_at = stored_at + policy.hard_ttl
+        return float(fresh_until), float(expires_at)
+
+    def _promote_to_memory(self, key, value, fresh_until, expires_at, size, policy):
+        if policy.allows('memory', size):
+            self.memory_cache.set(key, (fresh_until, value), expires_at, size=size)
+
+    def get_fresh_from_memory(self, key):
+        """Return a fresh value from the memory tier only, without touching shared tiers."""
+        entry = self.memory_cache.get(key)
+        if entry is None or entry[0] <= time.time():
+            return None
+        return entry[1]
+
+    def _decode_redis_entry(self, key, raw, policy, now_ts):
+        cache_data = json.loads(raw)
+        logger.debug("TMDB redis cache hit: %s", key[:50])
+        fresh_until, expires_at = self._entry_deadlines(cache_data, policy)
+        value = cache_data.get('data')
+        self._promote_to_memory(key, value, fresh_until, expires_at, len(raw), policy)
+        return value, fresh_until <= now_ts
+
+    def _decode_local_entry(self, key, local_entry, policy, now_ts, backend):
+        """Decode a ``(fresh_until, expires_at, payload)`` hit from the shared or disk tier."""
+        fresh_until, expires_at, raw = local_entry
+        try:
+            value = json.loads(raw)['data']
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("TMDB cache read error: %s", e)
+            # Delete corrupted cache entry
+            backend.delete(key)
+            return None
+
+        logger.debug("TMDB cache hit: %s", key[:50])
+        self._promote_to_memory(key, value, fresh_until, expires_at, len(raw), policy)
+        return value, fresh_until <= now_ts
+
+    def _read_disk_entry(self, key, policy, now_ts):
+        disk_entry = self.disk.read(key, now_ts)
+        if disk_entry is None:
+            return None
+        return self._decode_local_entry(key, disk_entry, policy, now_ts, self.disk)
+
+    def _get_io_executor(self):
+        with self._io_lock:
+            if self._io_executor is None:
+                self._io_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='tmdb-cache-io')
+            return self._io_executor
+
+    def _record(self, key, tier, hit, started=None):
+        """Count a lookup outcome for ``key`` in ``tier``; ``hit`` is a found entry or None."""
+        if hit is None:
+            outcome = 'miss'
+        elif is_negative(hit[0]):
+            outcome = 'negative'
+        else:
+            outcome = 'stale' if hit[1] else 'hit'
+        elapsed_ms = None if started is None else (time.perf_counter() - started) * 1000
+        self.metrics.record(endpoint_family(endpoint_from_cache_key(key)), tier, outcome, elapsed_ms)
+
+    def get_with_state(self, key, policy=None):
+        """Return ``(value, is_stale)`` for an entry within its hard TTL, else None."""
+        policy = policy or self.policy_for(key)
         now_ts = time.time()
-        with self.memory_lock:
-            entry = self.memory_cache.get(key)
-            if entry:
-                expires_at, value = entry
-                if expires_at > now_ts:
-                    return value
-                self.memory_cache.pop(key, None)
+        started = time.perf_counter()
+        entry = self.memory_cache.get(key, now_ts)
+        if entry is not None:
+            fresh_until, value = entry
+            hit = (value, fresh_until <= now_ts)
+            self._record(key, 'memory', hit, started)
+            return hit
+        self._record(key, 'memory', None, started)
 
-        if self.redis_client:
+        if self._uses_redis(policy):
             redis_key = self.get_redis_key(key)
+            started = time.perf_counter()
             try:
                 raw = self.redis_client.get(redis_key)
-                if not raw:
-                    return None
-                cache_data = json.loads(raw)
-                logger.debug("TMDB redis cache hit: %s", key[:50])
-                value = cache_data.get('data')
-                with self.memory_lock:
-                    if len(self.memory_cache) >= self.memory_cache_max_entries:
-                        self.memory_cache.pop(next(iter(self.memory_cache)), None)
-                    self.memory_cache[key] = (now_ts + self.cache_duration_seconds, value)
-                return value
+                hit = self._decode_redis_entry(key, raw, policy, now_ts) if raw else None
             except Exception as exc:
                 logger.warning("TMDB redis cache read error: %s", exc)
+                self.metrics.record(endpoint_family(endpoint_from_cache_key(key)), 'redis', 'error')
                 return None
+            self._record(key, 'redis', hit, started)
+            return hit
 
-        cache_path = self.get_cache_path(key)
-        
-        if not cache_path.exists():
+        if self._uses_shared(policy):
+            started = time.perf_counter()
+            shared_entry = self.shared.read(key, now_ts)
+            shared_hit = None
+            if shared_entry is not None:
+                shared_hit = self._decode_local_entry(key, shared_entry, policy, now_ts, self.shared)
+            self._record(key, 'shared', shared_hit, started)
+            if shared_hit is not None:
+                return shared_hit
+
+        if 'disk' not in policy.tiers:
             return None
-        
-        try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-            
-            # Check if cache is expired
-            cache_time = datetime.fromisoformat(cache_data['timestamp'])
-            if datetime.now() - cache_time > self.cache_duration:
-                # Cache expired, delete it
-                try:
-                    cache_path.unlink()
-                except:
-                    pass
-                return None
-            
-            logger.debug("TMDB cache hit: %s", key[:50])
-            value = cache_data['data']
-            with self.memory_lock:
-                if len(self.memory_cache) >= self.memory_cache_max_entries:
-                    self.memory_cache.pop(next(iter(self.memory_cache)), None)
-                self.memory_cache[key] = (now_ts + self.cache_duration_seconds, value)
-            return value
-        except Exception as e:
-            logger.warning("TMDB cache read error: %s", e)
-            # Delete corrupted cache file
+
+        started = time.perf_counter()
+        disk_hit = self._read_disk_entry(key, policy, now_ts)
+        self._record(key, 'disk', disk_hit, started)
+        return disk_hit
+
+    def get_many(self, keys, policies=None):
+        """Batch lookup returning ``{key: (value, is_stale)}`` for every key found.
+
+        Memory hits are served first, remaining Redis-backed keys are fetched with
+        a single MGET, shared-tier keys with a single query, and whatever is left
+        on disk is read in parallel. Batched round trips are timed once, under the
+        ``batch`` family.
+        """
+        policies = policies or {}
+        now_ts = time.time()
+        found = {}
+        redis_keys = []
+        shared_keys = []
+        disk_keys = []
+
+        for key in dict.fromkeys(keys):
+            entry = self.memory_cache.get(key, now_ts)
+            if entry is not None:
+                found[key] = (entry[1], entry[0] <= now_ts)
+                self._record(key, 'memory', found[key])
+                continue
+            self._record(key, 'memory', None)
+            policy = policies.get(key) or self.policy_for(key)
+            if self._uses_redis(policy):
+                redis_keys.append((key, policy))
+            elif self._uses_shared(policy):
+                shared_keys.append((key, policy))
+            elif 'disk' in policy.tiers:
+                disk_keys.append((key, policy))
+
+        if redis_keys:
+            started = time.perf_counter()
             try:
-                cache_path.unlink()
-            except:
-                pass
+                raws = self.redis_client.mget([self.get_redis_key(key) for key, _ in redis_keys])
+            except Exception as exc:
+                logger.warning("TMDB redis cache batch read error: %s", exc)
+                self.metrics.record('batch', 'redis', 'error')
+                raws = [None] * len(redis_keys)
+            self.metrics.observe('batch', 'redis', (time.perf_counter() - started) * 1000)
+            for (key, policy), raw in zip(redis_keys, raws):
+                hit = None
+                if raw:
+                    try:
+                        hit = self._decode_redis_entry(key, raw, policy, now_ts)
+                    except Exception as exc:
+                        logger.warning("TMDB redis cache read error: %s", exc)
+                self._record(key, 'redis', hit)
+                if hit is not None:
+                    found[key] = hit
+
+        if shared_keys:
+            started = time.perf_counter()
+            shared_entries = self.shared.read_many([key for key, _ in shared_keys], now_ts)
+            self.metrics.observe('batch', 'shared', (time.perf_counter() - started) * 1000)
+            for key, policy in shared_keys:
+                shared_hit = None
+                if key in shared_entries:
+                    shared_hit = self._decode_local_entry(key, shared_entries[key], policy, now_ts, self.shared)
+                self._record(key, 'shared', shared_hit)
+                if shared_hit is not None:
+                    found[key] = shared_hit
+                elif 'disk' in policy.tiers:
+                    disk_keys.append((key, policy))
+
+        if disk_keys:
+            started = time.perf_counter()
+            if len(disk_keys) == 1:
+                key, policy = disk_keys[0]
+                disk_hits = [(key, self._read_disk_entry(key, policy, now_ts))]
+            else:
+                executor = self._get_io_executor()
+                futures = [
+                    (key, executor.submit(self._read_disk_entry, key, policy, now_ts))
+                    for key, policy in disk_keys
+                ]
+                disk_hits = [(key, future.result()) for key, future in futures]
+            self.metrics.observe('batch', 'disk', (time.perf_counter() - started) * 1000)
+            for key, disk_hit in disk_hits:
+                self._record(key, 'disk', disk_hit)
+                if disk_hit is not None:
+                    found[key] = disk_hit
+
+        return found
+    
+    def get(self, key, policy=None):
+        """Get cached data if it exists and is not expired"""
+        cached = self.get_with_state(key, policy)
+        if cached is None or cached[1]:
+            return None
+        return cached[0]
+
+    def _prepare_entry(self, key, data, policy, now_ts):
+        """Build and serialize the stored envelope; returns None if it cannot be encoded."""
+        fresh_until = now_ts + policy.ttl
+        expires_at = now_ts + policy.hard_ttl
+        cache_data = {
+            'timestamp': datetime.now().isoformat(),
+            'fresh_until': fresh_until,
+            'expires_at': expires_at,
+            'key': key,  # Store original key for debugging
+            'data': data,
+        }
+        try:
+            serialized = json.dumps(cache_data, ensure_ascii=False, separators=(',', ':'))
+        except (TypeError, ValueError) as exc:
+            logger.warning("TMDB cache serialization error: %s", exc)
             return None
+
+        if policy.allows('memory', len(serialized)):
+            self.memory_cache.set(key, (fresh_until, data), expires_at, size=len(serialized))
+        else:
+            self.memory_cache.pop(key)
+        return serialized, fresh_until, expires_at
+
+    def _write_disk_entry(self, key, entry, policy):
+        serialized, fresh_until, expires_at = entry
+        if not policy.allows('disk', len(serialized)):
+            return
+        if self.disk.write(key, serialized, fresh_until, expires_at) is not None:
+            logger.debug("TMDB cache set: %s", key[:50])
     
-    def set(self, key, data):
-        """Cache data with timestamp"""
-        now_ts = time.time()
-        with self.memory_lock:
-            if len(self.memory_cache) >= self.memory_cache_max_entries:
-                self.memory_cache.pop(next(iter(self.memory_cache)), None)
-            self.memory_cache[key] = (now_ts + self.cache_duration_seconds, data)
+    def set(self, key, data, policy=None):
+        """Cache data with timestamp in the tiers allowed by the key's policy"""
+        policy = policy or self.policy_for(key)
+        if not policy.tiers:
+            return
 
-        if self.redis_client:
+        entry = self._prepare_entry(key, data, policy, time.time())
+        if entry is None:
+            return
+        serialized = entry[0]
+
+        if self._uses_redis(policy):
+            if not policy.allows('redis', len(serialized)):
+                return
             redis_key = self.get_redis_key(key)
             try:
-                cache_data = {
-                    'timestamp': datetime.now().isoformat(),
-                    'key': key,
-                    'data': data,
-                }
-                self.redis_client.setex(redis_key, self.cache_duration_seconds, json.dumps(cache_data, ensure_ascii=False))
+                self.redis_client.setex(redis_key, policy.hard_ttl, serialized)
                 logger.debug("TMDB redis cache set: %s", key[:50])
                 return
             except Exception as exc:
                 logger.warning("TMDB redis cache write error: %s", exc)
+        elif self._uses_shared(policy) and policy.allows('shared', len(serialized)):
+            if self.shared.write(key, serialized, entry[1], entry[2]) is not None:
+                logger.debug("TMDB shared cache set: %s", key[:50])
+                return
 
-        cache_path = self.get_cache_path(key)
-        
-        try:
-            cache_data = {
-                'timestamp': datetime.now().isoformat(),
-                'key': key,  # Store original key for debugging
-                'data': data
-            }
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
-            logger.debug("TMDB cache set: %s", key[:50])
-        except Exception as e:
-            logger.warning("TMDB cache write error: %s", e)
+        self._write_disk_entry(key, entry, policy)
+
+    def set_many(self, mapping, policies=None):
+        """Store several entries, pipelining Redis SETEX calls into one round trip
+        and shared-tier writes into one transaction."""
+        policies = policies or {}
+        now_ts = time.time()
+        redis_entries = []
+        shared_entries = []
+        disk_entries = []
+
+        for key, data in mapping.items():
+            policy = policies.get(key) or self.policy_for(key)
+            if not policy.tiers:
+                continue
+            entry = self._prepare_entry(key, data, policy, now_ts)
+            if entry is None:
+                continue
+            if self._uses_redis(policy):
+                if policy.allows('redis', len(entry[0])):
+                    redis_entries.append((key, entry, policy))
+            elif self._uses_shared(policy) and policy.allows('shared', len(entry[0])):
+                shared_entries.append((key, entry, policy))
+            else:
+                disk_entries.append((key, entry, policy))
+
+        if redis_entries:
+            try:
+                pipeline = self.redis_client.pipeline(transaction=False)
+                for key, entry, policy in redis_entries:
+                    pipeline.setex(self.get_redis_key(key), policy.hard_ttl, entry[0])
+                pipeline.execute()
+                logger.debug("TMDB redis cache batch set: %s keys", len(redis_entries))
+            except Exception as exc:
+                logger.warning("TMDB redis cache batch write error: %s", exc)
+                disk_entries.extend(redis_entries)
+
+        if shared_entries:
+            written = self.shared.write_many(
+                (key, serialized, fresh_until, expires_at)
+                for key, (serialized, fresh_until, expires_at), _ in shared_entries
+            )
+            disk_entries.extend(item for item in shared_entries if item[0] not in written)
+
+        for key, entry, policy in disk_entries:
+            self._write_disk_entry(key, entry, policy)
     
     def clear(self):
         """Clear all cache files"""
-        with self.memory_lock:
-            self.memory_cache.clear()
+        self.memory_cache.clear()
 
         if self.redis_client:
             try:
@@ -175,19 +762,34 @@ class TMDBCache:
             except Exception as exc:
                 logger.warning("TMDB redis cache clear error: %s", exc)
 
+        if self.shared is not None:
+            logger.info("TMDB shared cache cleared (%s entries)", self.shared.clear())
+
         try:
-            for cache_file in self.cache_dir.glob('*.json'):
-                cache_file.unlink()
-            logger.info("TMDB cache cleared")
+            report = self.disk.clear()
+            logger.info(
+                "TMDB cache cleared (%s files, %s bytes reclaimed)",
+                report['expired'],
+                report['reclaimed_bytes'],
+            )
         except Exception as e:
             logger.warning("TMDB cache clear error: %s", e)
 
 class TMDBService:
     cache = None
-    last_request_time = 0
-    min_request_interval = 0.25  # 4 requests per second (well under 40/10s limit)
+    _rate_limiter = None
+    _rate_limiter_lock = threading.Lock()
+    _async_client = None
+    _async_client_lock = threading.Lock()
+    _async_unavailable = False
+    _circuit_breaker = None
+    _circuit_breaker_lock = threading.Lock()
     _http_session = None
     _session_lock = threading.Lock()
+    _single_flight = SingleFlight()
+    _refresh_executor = None
+    _refresh_lock = threading.Lock()
+    _refresh_pending = set()
 
     @staticmethod
     def _get_http_session():
@@ -196,12 +798,14 @@ class TMDBService:
             if TMDBService._http_session is not None:
                 return TMDBService._http_session
 
+            # Only retry connection setup here. Status and read retries belong to
+            # _request_with_retries, where the circuit breaker sees every attempt.
             retry = Retry(
-                total=2,
-                connect=2,
-                read=2,
+                total=1,
+                connect=1,
+                read=0,
+                status=0,
                 backoff_factor=0.2,
-                status_forcelist=[429, 500, 502, 503, 504],
                 allowed_methods=frozenset(["GET"]),
                 raise_on_status=False,
             )
@@ -304,22 +908,135 @@ class TMDBService:
         )
         return logos[0]
     
+    @staticmethod
+    def cache_stats():
+        """Counters, latency histograms and tier gauges for this worker process."""
+        if TMDBService.cache is None:
+            TMDBService.init_cache()
+        cache = TMDBService.cache
+        with TMDBService._refresh_lock:
+            refresh_pending = len(TMDBService._refresh_pending)
+        return {
+            'pid': os.getpid(),
+            'backend': 'redis' if cache.redis_client is not None else ('shared' if cache.shared is not None else 'disk'),
+            'gauges': {
+                'memory': cache.memory_cache.stats(),
+                'shared': cache.shared.stats() if cache.shared is not None else None,
+                'disk_last_sweep': cache.janitor.last_report,
+                'single_flight_in_flight': TMDBService._single_flight.in_flight(),
+                'refresh_pending': refresh_pending,
+                'circuit': TMDBService._circuit_breaker.snapshot() if TMDBService._circuit_breaker else None,
+            },
+            'metrics': cache.metrics.snapshot(),
+        }
+
     @staticmethod
     def init_cache():
         """Initialize cache (called from app startup)"""
         if TMDBService.cache is None:
             TMDBService.cache = TMDBCache()
     
+    @staticmethod
+    def _get_rate_limiter():
+        """Build the token bucket once, shared through Redis when the cache uses it."""
+        with TMDBService._rate_limiter_lock:
+            if TMDBService._rate_limiter is None:
+                if TMDBService.cache is None:
+                    TMDBService.init_cache()
+                TMDBService._rate_limiter = build_rate_limiter(
+                    rate=current_app.config.get('TMDB_RATE_LIMIT_PER_SECOND', 4.0),
+                    burst=current_app.config.get('TMDB_RATE_LIMIT_BURST', 10),
+                    redis_client=TMDBService.cache.redis_client,
+                )
+            return TMDBService._rate_limiter
+
+    @staticmethod
+    def _get_circuit_breaker():
+        """Build the circuit breaker once; None when TMDB_CIRCUIT_ENABLED is off."""
+        if not current_app.config.get('TMDB_CIRCUIT_ENABLED', True):
+            return None
+        with TMDBService._circuit_breaker_lock:
+            if TMDBService._circuit_breaker is None:
+                if TMDBService.cache is None:
+                    TMDBService.init_cache()
+                config = current_app.config
+                TMDBService._circuit_breaker = build_circuit_breaker(
+                    redis_client=TMDBService.cache.redis_client,
+                    failure_threshold=config.get('TMDB_CIRCUIT_FAILURE_THRESHOLD', 5),
+                    failure_ratio=config.get('TMDB_CIRCUIT_FAILURE_RATIO', 0.5),
+                    window_seconds=config.get('TMDB_CIRCUIT_WINDOW_SECONDS', 30),
+                    open_seconds=config.get('TMDB_CIRCUIT_OPEN_SECONDS', 30),
+                )
+            return TMDBService._circuit_breaker
+
+    @staticmethod
+    def circuit_open():
+        """Whether TMDB calls are currently being short-circuited."""
+        breaker = TMDBService._get_circuit_breaker()
+        return breaker is not None and breaker.state == OPEN
+
+    @staticmethod
+    def _mark_degraded():
+        """Flag the current request so templates can say some TMDB data is missing."""
+        if has_app_context():
+            g.tmdb_degraded = True
+
+    @staticmethod
+    def _deadline_remaining():
+        """Seconds left in the current request's TMDB budget, or None when unbounded.
+
+        The deadline is set per route in ``before_request`` as ``g.tmdb_deadline``
+        (a ``time.monotonic()`` value). Background refreshes run without one.
+        """
+        deadline = getattr(g, 'tmdb_deadline', None) if has_app_context() else None
+        if deadline is None:
+            return None
+        return deadline - time.monotonic()
+
+    @staticmethod
+    def _budget_spent(endpoint, needed=0.0):
+        """True (and the request marked degraded) when ``needed`` more seconds do not fit the budget."""
+        remaining = TMDBService._deadline_remaining()
+        if remaining is None or remaining - needed >= TMDB_MIN_CALL_SECONDS:
+            return False
+        logger.info("TMDB request budget spent (%.2fs left), skipping: %s", max(remaining, 0.0), endpoint)
+        TMDBService._record_network(endpoint, 'deadline')
+        TMDBService._mark_degraded()
+        return True
+
+    @staticmethod
+    def _within_budget(seconds):
+        """Clamp a timeout or wait to what is left of the request budget."""
+        remaining = TMDBService._deadline_remaining()
+        if remaining is None:
+            return seconds
+        return max(0.0, min(float(seconds), remaining))
+
+    @staticmethod
+    def _circuit_allows(endpoint):
+        breaker = TMDBService._get_circuit_breaker()
+        if breaker is None or breaker.allow():
+            return True
+        logger.info("TMDB circuit open, failing fast: %s", endpoint)
+        TMDBService._record_network(endpoint, 'short_circuit')
+        TMDBService._mark_degraded()
+        return False
+
+    @staticmethod
+    def _record_circuit(ok):
+        breaker = TMDBService._circuit_breaker
+        if breaker is None:
+            return
+        if ok:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+
     @staticmethod
     def _rate_limit():
-        """Implement rate limiting"""
-        current_time = time.time()
-        time_since_last = current_time - TMDBService.last_request_time
-        
-        if time_since_last < TMDBService.min_request_interval:
-            time.sleep(TMDBService.min_request_interval - time_since_last)
-        
-        TMDBService.last_request_time = time.time()
+        """Wait for a token from the outbound limiter; returns False if the wait budget runs out."""
+        max_wait = TMDBService._within_budget(current_app.config.get('TMDB_RATE_LIMIT_MAX_WAIT_SECONDS', 5))
+        return TMDBService._get_rate_limiter().acquire(timeout=max_wait)
     
     @staticmethod
     def _make_request(endpoint, params=None, use_cache=True, retries=3, timeout=None):
@@ -328,40 +1045,451 @@ class TMDBService:
         if TMDBService.cache is None:
             TMDBService.init_cache()
         
-        base_url = current_app.config['TMDB_BASE_URL']
-        api_key = current_app.config['TMDB_API_KEY']
+        params, cache_key = TMDBService._prepare_params(endpoint, params)
+        TMDBService._record_access(cache_key, endpoint, params)
+
+        request_cache = TMDBService._get_request_cache()
+        if request_cache is not None:
+            if use_cache and cache_key in request_cache and not TMDBService._refreshing():
+                TMDBService._record_request_hit(endpoint)
+                return TMDBService._public_value(request_cache[cache_key])
         
-        if not params:
-            params = {}
-        params['api_key'] = api_key
+        # Check cache first; stale entries are served while a background refresh runs.
+        if use_cache and not TMDBService._refreshing():
+            policy = TMDBService.cache.policies.resolve(endpoint)
+            cached = TMDBService.cache.get_with_state(cache_key, policy)
+            if cached is not None:
+                cached_data, is_stale = cached
+                if is_stale:
+                    TMDBService._schedule_refresh(cache_key, endpoint, params, retries, timeout)
+                if request_cache is not None:
+                    request_cache[cache_key] = cached_data
+                return TMDBService._public_value(cached_data)
+
+        # Once the route's budget is spent the page renders without this data.
+        if TMDBService._budget_spent(endpoint):
+            return None
         
-        # Create cache key from endpoint and params (excluding api_key)
+        try:
+            data, shared = TMDBService._fetch_coalesced(cache_key, endpoint, params, use_cache, retries, timeout)
+        except SingleFlightTimeout:
+            logger.warning("TMDB coalesced request wait timed out: %s", endpoint)
+            return None
+
+        if shared:
+            TMDBService._record_network(endpoint, 'coalesced')
+            if has_request_context():
+                g.tmdb_coalesced_calls = int(getattr(g, 'tmdb_coalesced_calls', 0)) + 1
+        if data is not None and request_cache is not None:
+            request_cache[cache_key] = data
+        return TMDBService._public_value(data)
+
+    @staticmethod
+    def _public_value(value):
+        """Hide negative cache entries from callers: they read as a failed lookup."""
+        return None if is_negative(value) else value
+
+    @staticmethod
+    def _prepare_params(endpoint, params=None):
+        """Attach the API key to request params and build the cache key (which excludes it)."""
+        params = dict(params or {})
+        params['api_key'] = current_app.config['TMDB_API_KEY']
         cache_params = {k: v for k, v in params.items() if k != 'api_key'}
-        cache_key = f"{endpoint}_{json.dumps(cache_params, sort_keys=True)}"
+        return params, f"{endpoint}_{json.dumps(cache_params, sort_keys=True)}"
 
-        request_cache = None
-        if has_request_context():
-            request_cache = getattr(g, 'tmdb_request_cache', None)
-            if request_cache is None:
-                request_cache = {}
-                g.tmdb_request_cache = request_cache
-            if use_cache and cache_key in request_cache:
-                return request_cache[cache_key]
-        
-        # Check cache first
-        if use_cache:
-            cached_data = TMDBService.cache.get(cache_key)
-            if cached_data is not None:
+    @staticmethod
+    def _record_access(cache_key, endpoint, params):
+        """Count a demand read of ``cache_key`` towards the traffic-driven warm set."""
+        if TMDBService.cache.access is None or TMDBService._refreshing():
+            return
+        TMDBService.cache.access.record(
+            cache_key,
+            endpoint,
+            {k: v for k, v in params.items() if k != 'api_key'},
+        )
+
+    @staticmethod
+    def _refreshing():
+        """True inside a scheduled refresh, where cache reads are bypassed but writes still happen."""
+        return has_app_context() and bool(getattr(g, 'tmdb_force_refresh', False))
+
+    @staticmethod
+    def _get_request_cache():
+        if not has_request_context():
+            return None
+        request_cache = getattr(g, 'tmdb_request_cache', None)
+        if request_cache is None:
+            request_cache = {}
+            g.tmdb_request_cache = request_cache
+        return request_cache
+
+    @staticmethod
+    def _lookup_many(calls, retries=3, timeout=None):
+        """Resolve ``(endpoint, params)`` calls from the request cache and one batched cache read.
+
+        Returns ``(prepared, results)`` where ``prepared`` holds ``(endpoint, params, cache_key)``
+        per call and ``results`` maps cache keys to the values found. Stale hits are returned
+        and refreshed in the background, exactly like ``_make_request``.
+        """
+        if TMDBService.cache is None:
+            TMDBService.init_cache()
+
+        prepared = []
+        for endpoint, params in calls:
+            params, cache_key = TMDBService._prepare_params(endpoint, params)
+            TMDBService._record_access(cache_key, endpoint, params)
+            prepared.append((endpoint, params, cache_key))
+
+        request_cache = TMDBService._get_request_cache()
+        results = {}
+        pending = {}
+        for endpoint, params, cache_key in prepared:
+            if request_cache is not None and cache_key in request_cache:
+                results[cache_key] = request_cache[cache_key]
+                TMDBService._record_request_hit(endpoint)
+            elif cache_key not in pending:
+                pending[cache_key] = (endpoint, params)
+
+        if pending and not TMDBService._refreshing():
+            policies = {
+                cache_key: TMDBService.cache.policies.resolve(endpoint)
+                for cache_key, (endpoint, _) in pending.items()
+            }
+            cached = TMDBService.cache.get_many(list(pending), policies)
+            for cache_key, (cached_data, is_stale) in cached.items():
+                if is_stale:
+                    endpoint, params = pending[cache_key]
+                    TMDBService._schedule_refresh(cache_key, endpoint, params, retries, timeout)
+                results[cache_key] = cached_data
                 if request_cache is not None:
                     request_cache[cache_key] = cached_data
-                return cached_data
-        
+
+        return prepared, results
+
+    @staticmethod
+    def _get_async_client():
+        with TMDBService._async_client_lock:
+            if TMDBService._async_client is None:
+                TMDBService._async_client = AsyncTMDBClient(
+                    current_app.config['TMDB_BASE_URL'],
+                    TMDBService._get_rate_limiter(),
+                    max_concurrency=current_app.config.get('TMDB_ASYNC_MAX_CONCURRENCY', 16),
+                    max_wait_seconds=current_app.config.get('TMDB_RATE_LIMIT_MAX_WAIT_SECONDS', 5),
+                    metrics=TMDBService.cache.metrics,
+                    circuit_breaker=TMDBService._get_circuit_breaker(),
+                    negative_status_codes=NEGATIVE_CACHE_STATUS_CODES,
+                    negative_entry=negative_entry,
+                )
+            return TMDBService._async_client
+
+    @staticmethod
+    def _fetch_many_async(calls, request_timeout, retries):
+        """Fetch ``calls`` on the async engine; None when the engine is unusable here.
+
+        Without httpx (e.g. the desktop build) or with a broken event loop the
+        caller falls back to sequential ``_request_with_retries``.
+        """
+        if TMDBService._async_unavailable:
+            return None
+        remaining = TMDBService._deadline_remaining()
+        try:
+            payloads, api_calls = TMDBService._get_async_client().fetch_many(
+                calls,
+                timeout=TMDBService._within_budget(request_timeout),
+                retries=retries,
+                deadline=None if remaining is None else time.monotonic() + remaining,
+            )
+        except RuntimeError as exc:
+            # Raised by the client constructor when httpx is missing; don't retry on every batch.
+            if TMDBService._async_client is None:
+                TMDBService._async_unavailable = True
+            logger.warning("TMDB async engine unavailable, fetching sequentially: %s", exc)
+            return None
+        except Exception as exc:
+            logger.warning("TMDB async batch failed, fetching sequentially: %s", exc)
+            return None
+        if has_request_context():
+            g.tmdb_api_calls = int(getattr(g, 'tmdb_api_calls', 0)) + api_calls
+        if TMDBService.circuit_open():
+            TMDBService._mark_degraded()
+        return payloads
+
+    @staticmethod
+    def fetch_many(calls, retries=3, timeout=None):
+        """Batch counterpart of ``_make_request`` for a list of ``(endpoint, params)`` calls.
+
+        Cache hits for the whole batch cost a single cache round trip. Misses this
+        thread leads are fetched concurrently on the async engine and written back
+        with one ``set_many``; misses already in flight elsewhere are awaited through
+        the single-flight layer. Results are returned in call order, with None for
+        calls that failed.
+        """
+        prepared, results = TMDBService._lookup_many(calls, retries, timeout)
+        request_cache = TMDBService._get_request_cache()
+        request_timeout = timeout or current_app.config.get('TMDB_REQUEST_TIMEOUT', 10)
+
+        misses = {}
+        for endpoint, params, cache_key in prepared:
+            if cache_key not in results and cache_key not in misses:
+                misses[cache_key] = (endpoint, params)
+        if not misses:
+            return [TMDBService._public_value(results.get(cache_key)) for _, _, cache_key in prepared]
+
+        led, followed = {}, {}
+        for cache_key, call_args in misses.items():
+            call, is_leader = TMDBService._single_flight.claim(cache_key)
+            (led if is_leader else followed)[cache_key] = (call, call_args)
+
+        fetched = {}
+        for cache_key in list(led) if not TMDBService._refreshing() else ():
+            # A previous leader may have refreshed the entry between our miss and the claim.
+            recent = TMDBService.cache.get_fresh_from_memory(cache_key)
+            if recent is not None:
+                call, _ = led.pop(cache_key)
+                results[cache_key] = recent
+                TMDBService._single_flight.resolve(cache_key, call, result=recent)
+
+        if led:
+            try:
+                if TMDBService.circuit_open():
+                    # Fail the whole batch fast; callers fall back to what the cache had.
+                    for _, (endpoint, _) in led.values():
+                        TMDBService._record_network(endpoint, 'short_circuit')
+                    TMDBService._mark_degraded()
+                    payloads = [None] * len(led)
+                elif TMDBService._budget_spent('batch'):
+                    payloads = [None] * len(led)
+                else:
+                    payloads = None
+                    if current_app.config.get('TMDB_ASYNC_ENABLED', True) and len(led) > 1:
+                        payloads = TMDBService._fetch_many_async(
+                            [call_args for _, call_args in led.values()], request_timeout, retries
+                        )
+                if payloads is None:
+                    base_url = current_app.config['TMDB_BASE_URL']
+                    payloads = [
+                        TMDBService._request_with_retries(base_url, endpoint, params, request_timeout, retries)
+                        for _, (endpoint, params) in led.values()
+                    ]
+            except BaseException as exc:
+                for cache_key, (call, _) in led.items():
+                    TMDBService._single_flight.resolve(cache_key, call, error=exc)
+                raise
+
+            policies = {}
+            for (cache_key, (call, (endpoint, _))), data in zip(led.items(), payloads):
+                results[cache_key] = data
+                if data is not None:
+                    fetched[cache_key] = data
+                    policies[cache_key] = (
+                        TMDBService.cache.negative_policy if is_negative(data)
+                        else TMDBService.cache.policies.resolve(endpoint)
+                    )
+            if fetched:
+                TMDBService.cache.set_many(fetched, policies)
+                TMDBService._store_cards(
+                    (endpoint_from_cache_key(cache_key), data)
+                    for cache_key, data in fetched.items()
+                    if not is_negative(data)
+                )
+            # Publish only after the cache write so followers never race a missing entry.
+            for cache_key, (call, _) in led.items():
+                TMDBService._single_flight.resolve(cache_key, call, result=results[cache_key])
+
+        wait_timeout = current_app.config.get('TMDB_SINGLE_FLIGHT_WAIT_SECONDS', 15)
+        for cache_key, (call, (endpoint, _)) in followed.items():
+            try:
+                results[cache_key] = TMDBService._single_flight.wait(
+                    cache_key, call, TMDBService._within_budget(wait_timeout)
+                )
+            except SingleFlightTimeout:
+                logger.warning("TMDB coalesced request wait timed out: %s", endpoint)
+                results[cache_key] = None
+            TMDBService._record_network(endpoint, 'coalesced')
+            if has_request_context():
+                g.tmdb_coalesced_calls = int(getattr(g, 'tmdb_coalesced_calls', 0)) + 1
+
+        if request_cache is not None:
+            for cache_key in misses:
+                if results.get(cache_key) is not None:
+                    request_cache[cache_key] = results[cache_key]
+
+        return [TMDBService._public_value(results.get(cache_key)) for _, _, cache_key in prepared]
+
+    @staticmethod
+    def _store_cards(payloads):
+        """Derive card projections from freshly fetched ``(endpoint, data)`` payloads and cache them.
+
+        The media types seen along the way feed the id -> media type index.
+        """
+        try:
+            cards = {
+                card_cache_key(media_type, card['id']): card
+                for endpoint, data in payloads
+                for media_type, card in cards_from_payload(endpoint, data)
+            }
+            if cards:
+                TMDBService.cache.set_many(cards)
+                TMDBService.cache.media_types.learn(
+                    (card['id'], card['media_type']) for card in cards.values()
+                )
+        except Exception as exc:
+            logger.warning("TMDB card projection failed: %s", exc)
+
+    @staticmethod
+    def remember_media_types(pairs):
+        """Record ``(tmdb_id, media_type)`` pairs known from local rows (watchlist, progress)."""
+        if TMDBService.cache is None:
+            TMDBService.init_cache()
+        TMDBService.cache.media_types.learn(pairs)
+
+    @staticmethod
+    def known_media_types(tmdb_id):
+        """Media types the index has seen for ``tmdb_id`` (empty when unknown)."""
+        if TMDBService.cache is None:
+            TMDBService.init_cache()
+        return TMDBService.cache.media_types.lookup_many([tmdb_id]).get(tmdb_id, frozenset())
+
+    @staticmethod
+    def resolve_media_types(items):
+        """Return the media type to try first for each ``(tmdb_id, media_type_hint)`` pair.
+
+        Hints are kept as given; ids without one use the media type index, then movie.
+        """
+        if TMDBService.cache is None:
+            TMDBService.init_cache()
+        items = list(items)
+        unknown = [tmdb_id for tmdb_id, hint in items if tmdb_id and hint not in ('movie', 'tv')]
+        known = TMDBService.cache.media_types.lookup_many(unknown) if unknown else {}
+        return [MediaTypeIndex.choose(known.get(tmdb_id), hint) for tmdb_id, hint in items]
+
+    @staticmethod
+    def _read_cards(pending, results):
+        """Fill ``results`` from cached cards for ``(index, tmdb_id, media_type)`` items; return the misses."""
+        keys = [card_cache_key(media_type, tmdb_id) for _, tmdb_id, media_type in pending]
+        found = TMDBService.cache.get_many(keys)
+        remaining = []
+        for (index, tmdb_id, media_type), key in zip(pending, keys):
+            hit = found.get(key)
+            if hit is None:
+                remaining.append((index, tmdb_id, media_type))
+                continue
+            card, is_stale = hit
+            if is_stale:
+                endpoint = f'{media_type}/{tmdb_id}'
+                params, cache_key = TMDBService._prepare_params(endpoint)
+                TMDBService._schedule_refresh(cache_key, endpoint, params, 1, 8)
+            results[index] = TMDBService._decorate_details(dict(card), media_type)
+        return remaining
+
+    @staticmethod
+    def _fetch_coalesced(cache_key, endpoint, params, use_cache, retries, timeout):
+        """Fetch through the single-flight layer and store the result; returns (data, shared)."""
+        base_url = current_app.config['TMDB_BASE_URL']
         request_timeout = timeout or current_app.config.get('TMDB_REQUEST_TIMEOUT', 10)
+        policy = TMDBService.cache.policies.resolve(endpoint)
+
+        def fetch():
+            # A previous leader may have refreshed the entry between our miss and now.
+            if use_cache and not TMDBService._refreshing():
+                recent = TMDBService.cache.get_fresh_from_memory(cache_key)
+                if recent is not None:
+                    return recent
+
+            data = TMDBService._request_with_retries(base_url, endpoint, params, request_timeout, retries)
+            if is_negative(data):
+                if use_cache:
+                    TMDBService.cache.set(cache_key, data, TMDBService.cache.negative_policy)
+            elif data is not None and use_cache:
+                TMDBService.cache.set(cache_key, data, policy)
+                TMDBService._store_cards([(endpoint, data)])
+            return data
+
+        wait_timeout = TMDBService._within_budget(current_app.config.get('TMDB_SINGLE_FLIGHT_WAIT_SECONDS', 15))
+        return TMDBService._single_flight.do(cache_key, fetch, wait_timeout=wait_timeout)
+
+    @staticmethod
+    def _get_refresh_executor():
+        with TMDBService._refresh_lock:
+            if TMDBService._refresh_executor is None:
+                workers = int(current_app.config.get('TMDB_REFRESH_WORKERS', 2) or 2)
+                TMDBService._refresh_executor = ThreadPoolExecutor(
+                    max_workers=max(1, workers),
+                    thread_name_prefix='tmdb-refresh',
+                )
+            return TMDBService._refresh_executor
+
+    @staticmethod
+    def _schedule_refresh(cache_key, endpoint, params, retries, timeout):
+        """Queue a background refresh for a stale entry; returns False when skipped."""
+        if TMDBService.circuit_open():
+            # Keep serving the stale entry; the refresh would only fail fast.
+            TMDBService._mark_degraded()
+            return False
+        max_pending = int(current_app.config.get('TMDB_REFRESH_MAX_PENDING', 64) or 64)
+        with TMDBService._refresh_lock:
+            if cache_key in TMDBService._refresh_pending:
+                return False
+            if len(TMDBService._refresh_pending) >= max_pending:
+                logger.debug("TMDB refresh queue full, serving stale: %s", endpoint)
+                return False
+            TMDBService._refresh_pending.add(cache_key)
+
+        app = current_app._get_current_object()
+        refresh_params = dict(params)
+
+        def run_refresh():
+            try:
+                with app.app_context():
+                    TMDBService._fetch_coalesced(cache_key, endpoint, refresh_params, True, retries, timeout)
+            except Exception as exc:
+                logger.warning("TMDB background refresh failed (%s): %s", endpoint, exc)
+            finally:
+                with TMDBService._refresh_lock:
+                    TMDBService._refresh_pending.discard(cache_key)
+
+        try:
+            TMDBService._get_refresh_executor().submit(run_refresh)
+        except RuntimeError as exc:
+            # Executor shut down during interpreter exit.
+            with TMDBService._refresh_lock:
+                TMDBService._refresh_pending.discard(cache_key)
+            logger.debug("TMDB refresh not scheduled: %s", exc)
+            return False
+        return True
+
+    @staticmethod
+    def _record_network(endpoint, outcome, started=None):
+        if TMDBService.cache is None:
+            return
+        elapsed_ms = None if started is None else (time.perf_counter() - started) * 1000
+        TMDBService.cache.metrics.record(endpoint_family(endpoint), 'network', outcome, elapsed_ms)
+
+    @staticmethod
+    def _record_request_hit(endpoint):
+        TMDBService.cache.metrics.record(endpoint_family(endpoint), 'request', 'hit')
+
+    @staticmethod
+    def _request_with_retries(base_url, endpoint, params, request_timeout, retries):
+        """Call TMDB with retry and exponential backoff.
 
+        Returns parsed JSON, a negative entry for non-retryable failures such as
+        404, or None for transient failures. Within a request, attempts are
+        capped to the route's remaining TMDB budget and retries that could not
+        finish in time are skipped.
+        """
         # Try with retries and exponential backoff
         for attempt in range(retries + 1):
+            # An open circuit stops the retry loop as well as new calls.
+            if not TMDBService._circuit_allows(endpoint):
+                return None
+            if TMDBService._budget_spent(endpoint):
+                return None
+
             # Rate limit before making request
-            TMDBService._rate_limit()
+            if not TMDBService._rate_limit():
+                logger.warning("TMDB rate limiter wait exceeded, skipping request: %s", endpoint)
+                return None
 
             if has_request_context():
                 g.tmdb_api_calls = int(getattr(g, 'tmdb_api_calls', 0)) + 1
@@ -372,27 +1500,28 @@ class TMDBService:
                 else:
                     logger.debug("TMDB API request: %s", endpoint)
                     
-                response = TMDBService._get_http_session().get(
-                    f"{base_url}/{endpoint}",
-                    params=params,
-                    timeout=request_timeout,
-                    verify=True,
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                # Cache the response
-                if use_cache:
-                    TMDBService.cache.set(cache_key, data)
-                if request_cache is not None:
-                    request_cache[cache_key] = data
-                
+                started = time.perf_counter()
+                try:
+                    response = TMDBService._get_http_session().get(
+                        f"{base_url}/{endpoint}",
+                        params=params,
+                        timeout=TMDBService._within_budget(request_timeout),
+                        verify=True,
+                    )
+                    response.raise_for_status()
+                    data = response.json()
+                except Exception:
+                    TMDBService._record_network(endpoint, 'error', started)
+                    raise
+                TMDBService._record_network(endpoint, 'ok', started)
+                TMDBService._record_circuit(True)
                 return data
                 
             except requests.exceptions.Timeout:
-                if attempt < retries:
-                    # Exponential backoff for timeouts
-                    backoff = min(2 ** attempt, 8)  # Cap at 8 seconds
+                TMDBService._record_circuit(False)
+                # Exponential backoff for timeouts
+                backoff = min(2 ** attempt, 8)  # Cap at 8 seconds
+                if attempt < retries and not TMDBService._budget_spent(endpoint, backoff):
                     logger.warning("TMDB API timeout, retrying in %ss (%s/%s): %s", backoff, attempt + 1, retries, endpoint)
                     time.sleep(backoff)
                     continue
@@ -402,22 +1531,28 @@ class TMDBService:
             except requests.exceptions.HTTPError as e:
                 # Check for specific status codes that should be retried
                 status_code = e.response.status_code
-                if status_code in [429, 500, 502, 503, 504]:
-                    # Retry on rate limit and server errors
-                    if attempt < retries:
-                        # Longer backoff for rate limits (429) and server errors (5xx)
-                        backoff = min(2 ** (attempt + 1), 30)
+                # Client errors mean TMDB answered; only overload and server errors count against it.
+                TMDBService._record_circuit(status_code not in RETRYABLE_STATUS_CODES)
+                if status_code in RETRYABLE_STATUS_CODES:
+                    # Retry on rate limit and server errors.
+                    # Longer backoff for rate limits (429) and server errors (5xx)
+                    backoff = min(2 ** (attempt + 1), 30)
+                    if attempt < retries and not TMDBService._budget_spent(endpoint, backoff):
                         logger.warning("TMDB API HTTP %s, retrying in %ss (%s/%s): %s", 
                                        status_code, backoff, attempt + 1, retries, endpoint)
                         time.sleep(backoff)
                         continue
                 
+                if status_code in NEGATIVE_CACHE_STATUS_CODES:
+                    logger.info("TMDB API HTTP %s for %s, caching negative result", status_code, endpoint)
+                    return negative_entry(status_code)
                 logger.error("TMDB API HTTP error %s for %s: %s", status_code, endpoint, e)
                 return None
                 
             except requests.exceptions.RequestException as e:
-                if attempt < retries:
-                    backoff = min(2 ** attempt, 8)
+                TMDBService._record_circuit(False)
+                backoff = min(2 ** attempt, 8)
+                if attempt < retries and not TMDBService._budget_spent(endpoint, backoff):
                     logger.warning("TMDB API error, retrying in %ss (%s/%s): %s", backoff, attempt + 1, retries, endpoint)
                     time.sleep(backoff)
                     continue
@@ -426,8 +1561,9 @@ class TMDBService:
             
             except (ValueError, json.JSONDecodeError) as e:
                 # JSON parsing error - might be a transient issue
-                if attempt < retries:
-                    backoff = min(2 ** attempt, 8)
+                TMDBService._record_circuit(False)
+                backoff = min(2 ** attempt, 8)
+                if attempt < retries and not TMDBService._budget_spent(endpoint, backoff):
                     logger.warning("TMDB API response parsing error, retrying in %ss (%s/%s): %s", 
                                    backoff, attempt + 1, retries, endpoint)
                     time.sleep(backoff)
@@ -448,10 +1584,11 @@ class TMDBService:
             base_params = {}
         first_page = max(1, int(start_page or 1))
         last_page = first_page + max(1, int(max_pages or 1)) - 1
-        for p in range(first_page, last_page + 1):
-            params = dict(base_params)
-            params['page'] = p
-            data = TMDBService._make_request(endpoint, params)
+        calls = [
+            (endpoint, dict(base_params, page=p))
+            for p in range(first_page, last_page + 1)
+        ]
+        for data in TMDBService.fetch_many(calls):
             if not data or 'results' not in data:
                 break
             for item in data['results']:
@@ -702,15 +1839,38 @@ class TMDBService:
     
     # ===== DETAILS =====
 
+    @staticmethod
+    def _decorate_details(data, media_type, full=False):
+        """Add the display fields templates expect to a raw movie/TV payload."""
+        if media_type == 'tv':
+            data['title'] = data.get('name')
+        data['poster_url'] = TMDBService.get_image_url(data.get('poster_path'))
+        data['backdrop_url'] = TMDBService.get_image_url(data.get('backdrop_path'), is_backdrop=True)
+        if media_type == 'tv':
+            data['release_date'] = data.get('first_air_date')
+            data['runtime'] = data.get('episode_run_time', [45])[0] if data.get('episode_run_time') else 45
+        data['media_type'] = media_type
+        if not full:
+            return data
+
+        logo = TMDBService._select_logo(data.get('images'))
+        if logo and logo.get('file_path'):
+            data['logo_url'] = TMDBService.get_image_url(logo.get('file_path'), size='w500')
+
+        # Get trailer
+        if 'videos' in data and 'results' in data['videos']:
+            trailer = TMDBService._select_best_trailer(data['videos']['results'])
+            if trailer:
+                data['trailer_key'] = trailer['key']
+                data['trailer_url'] = f"https://www.youtube.com/watch?v={trailer['key']}"
+        return data
+
     @staticmethod
     def get_movie_card_details(movie_id):
         """Get lightweight movie details for grid/cards without heavy append payloads."""
         data = TMDBService._make_request(f'movie/{movie_id}', retries=1, timeout=8)
         if data and 'id' in data:
-            data['poster_url'] = TMDBService.get_image_url(data.get('poster_path'))
-            data['backdrop_url'] = TMDBService.get_image_url(data.get('backdrop_path'), is_backdrop=True)
-            data['media_type'] = 'movie'
-            return data
+            return TMDBService._decorate_details(data, 'movie')
         return None
 
     @staticmethod
@@ -718,71 +1878,101 @@ class TMDBService:
         """Get lightweight TV details for grid/cards without heavy append payloads."""
         data = TMDBService._make_request(f'tv/{tv_id}', retries=1, timeout=8)
         if data and 'id' in data:
-            data['title'] = data.get('name')
-            data['poster_url'] = TMDBService.get_image_url(data.get('poster_path'))
-            data['backdrop_url'] = TMDBService.get_image_url(data.get('backdrop_path'), is_backdrop=True)
-            data['release_date'] = data.get('first_air_date')
-            data['runtime'] = data.get('episode_run_time', [45])[0] if data.get('episode_run_time') else 45
-            data['media_type'] = 'tv'
-            return data
+            return TMDBService._decorate_details(data, 'tv')
         return None
     
     @staticmethod
     def get_movie_details(movie_id):
         """Get detailed information about a movie"""
         # Keep detail pages responsive under hosted-worker timeouts.
-        data = TMDBService._make_request(f'movie/{movie_id}', {
-            'append_to_response': 'credits,videos,similar,recommendations,images',
-            'include_image_language': 'en,null'
-        }, retries=2, timeout=10)
+        data = TMDBService._make_request(f'movie/{movie_id}', dict(DETAIL_APPEND_PARAMS), retries=2, timeout=10)
         if data and 'id' in data:
-            data['poster_url'] = TMDBService.get_image_url(data.get('poster_path'))
-            data['backdrop_url'] = TMDBService.get_image_url(data.get('backdrop_path'), is_backdrop=True)
-            data['media_type'] = 'movie'
-
-            logo = TMDBService._select_logo(data.get('images'))
-            if logo and logo.get('file_path'):
-                data['logo_url'] = TMDBService.get_image_url(logo.get('file_path'), size='w500')
-            
-            # Get trailer
-            if 'videos' in data and 'results' in data['videos']:
-                trailer = TMDBService._select_best_trailer(data['videos']['results'])
-                if trailer:
-                    data['trailer_key'] = trailer['key']
-                    data['trailer_url'] = f"https://www.youtube.com/watch?v={trailer['key']}"
-            
-            return data
+            return TMDBService._decorate_details(data, 'movie', full=True)
         return None
     
     @staticmethod
     def get_tv_details(tv_id):
         """Get detailed information about a TV show"""
         # Keep detail pages responsive under hosted-worker timeouts.
-        data = TMDBService._make_request(f'tv/{tv_id}', {
-            'append_to_response': 'credits,videos,similar,recommendations,images',
-            'include_image_language': 'en,null'
-        }, retries=2, timeout=10)
+        data = TMDBService._make_request(f'tv/{tv_id}', dict(DETAIL_APPEND_PARAMS), retries=2, timeout=10)
         if data and 'id' in data:
-            data['title'] = data.get('name')
-            data['poster_url'] = TMDBService.get_image_url(data.get('poster_path'))
-            data['backdrop_url'] = TMDBService.get_image_url(data.get('backdrop_path'), is_backdrop=True)
-            data['release_date'] = data.get('first_air_date')
-            data['runtime'] = data.get('episode_run_time', [45])[0] if data.get('episode_run_time') else 45
-            data['media_type'] = 'tv'
-
-            logo = TMDBService._select_logo(data.get('images'))
-            if logo and logo.get('file_path'):
-                data['logo_url'] = TMDBService.get_image_url(logo.get('file_path'), size='w500')
-            
-            # Get trailer
-            if 'videos' in data and 'results' in data['videos']:
-                trailer = TMDBService._select_best_trailer(data['videos']['results'])
-                if trailer:
-                    data['trailer_key'] = trailer['key']
-                    data['trailer_url'] = f"https://www.youtube.com/watch?v={trailer['key']}"
-            
-            return data
+            return TMDBService._decorate_details(data, 'tv', full=True)
         return None
+
+    @staticmethod
+    def is_not_found(endpoint, params=None):
+        """True when TMDB answered ``endpoint`` with a cached negative (e.g. 404).
+
+        ``_make_request`` returns None both for missing titles and for transient
+        failures (open circuit, spent budget, timeouts); only the former is a
+        definite answer.
+        """
+        if TMDBService.cache is None:
+            TMDBService.init_cache()
+        _, cache_key = TMDBService._prepare_params(endpoint, params)
+        request_cache = TMDBService._get_request_cache()
+        if request_cache is not None and cache_key in request_cache:
+            return is_negative(request_cache[cache_key])
+        cached = TMDBService.cache.get_with_state(cache_key, TMDBService.cache.policies.resolve(endpoint))
+        return cached is not None and is_negative(cached[0])
+
+    @staticmethod
+    def details_not_found(media_type, tmdb_id, fields="full"):
+        """``is_not_found`` for the details lookup ``get_details_many``/``get_*_details`` make."""
+        params = DETAIL_APPEND_PARAMS if fields == "full" else {}
+        return TMDBService.is_not_found(f'{media_type}/{tmdb_id}', dict(params))
+
+    @staticmethod
+    def get_details_many(items, fields="card"):
+        """Resolve many ``(tmdb_id, media_type)`` pairs at once; results keep input order.
+
+        ``fields="card"`` returns the slim card projection used by grids, read
+        from the card tier first; ``"full"`` the detail-page payload with credits,
+        videos and images. A media type of None is looked up in the media type
+        index, defaulting to movie. Titles TMDB reports missing under their media
+        type are retried as the other one in a second batch; transient failures
+        are not, since movie and TV ids overlap. Missing titles, and items past
+        ``TMDB_DETAILS_BATCH_MAX_ITEMS``, come back as None.
+        """
+        if TMDBService.cache is None:
+            TMDBService.init_cache()
+
+        full = fields == "full"
+        params = DETAIL_APPEND_PARAMS if full else {}
+        retries, timeout = (2, 10) if full else (1, 8)
+        max_items = int(current_app.config.get('TMDB_DETAILS_BATCH_MAX_ITEMS', 48) or 48)
+
+        items = list(items)
+        results = [None] * len(items)
+        batch = [(tmdb_id, media_type) for tmdb_id, media_type in items[:max_items]]
+        pending = [
+            (index, tmdb_id, media_type)
+            for index, ((tmdb_id, _), media_type) in enumerate(zip(batch, TMDBService.resolve_media_types(batch)))
+            if tmdb_id
+        ]
+
+        if not full and pending:
+            pending = TMDBService._read_cards(pending, results)
+
+        for attempt in range(2):
+            if not pending:
+                break
+            payloads = TMDBService.fetch_many(
+                [(f'{media_type}/{tmdb_id}', dict(params)) for _, tmdb_id, media_type in pending],
+                retries=retries,
+                timeout=timeout,
+            )
+            not_found = []
+            for (index, tmdb_id, media_type), data in zip(pending, payloads):
+                if data and 'id' in data:
+                    # Copy so per-request annotations never leak into the shared memory tier.
+                    payload = dict(data) if full else project_card(data, media_type)
+                    results[index] = TMDBService._decorate_details(payload, media_type, full=full)
+                elif attempt == 0 and TMDBService.details_not_found(media_type, tmdb_id, fields):
+                    not_found.append((index, tmdb_id, 'movie' if media_type == 'tv' else 'tv'))
+            pending = not_found
+
+        return results
     
     # ===== SEARCH =====
     
@@ -828,60 +2018,69 @@ class TMDBService:
     # ===== CACHE WARMING =====
     
     @staticmethod
-    def warm_cache(profile="quick", genre_count=3):
-        """Pre-populate high-impact TMDB cache entries.
+    def refresh_tasks(profile="quick", genre_count=3, genre_pages=1, hot_keys=0, hot_min_score=0.0):
+        """Return the warm set as ``RefreshTask``s, each tagged with the soft TTL it fills.
 
         Profiles:
-        - quick: one-page homepage and browsing essentials
-        - balanced: quick + extra list views and anime lists
-        - full: balanced + genre pages
+        - quick: homepage and movie section lists
+        - balanced: quick + series and anime sections
+        - full: balanced + the first ``genre_count`` genres, pages 1..``genre_pages`` (at least 2)
+
+        On top of the profile, the ``hot_keys`` most requested cache keys (by
+        decayed access count, at least ``hot_min_score``) are refreshed as well,
+        except keys currently cached as not found.
         """
         profile_name = (profile or "quick").strip().lower()
         if profile_name not in {"quick", "balanced", "full"}:
             profile_name = "quick"
 
-        safe_genre_count = max(0, int(genre_count or 0))
-        logger.info("Starting TMDB cache warmup (profile=%s, genre_count=%s)", profile_name, safe_genre_count)
-
-        try:
+        if TMDBService.cache is None:
             TMDBService.init_cache()
 
-            warm_steps = [
-                ("popular movies", lambda: TMDBService.get_popular_movies(page=1)),
-                ("hero movies", lambda: TMDBService.get_random_hero_movies(count=5)),
-                ("trending movies", lambda: TMDBService.get_trending_movies('week', page=1, limit=20)),
-                ("top rated movies", lambda: TMDBService.get_top_rated_movies(page=1, limit=20)),
-                ("trending tv", lambda: TMDBService.get_trending_tv('week', page=1, limit=20)),
-                ("top rated tv", lambda: TMDBService.get_top_rated_tv(page=1, limit=20)),
-            ]
+        def task(name, endpoint, fn):
+            return RefreshTask(name, TMDBService.cache.policies.resolve(endpoint).ttl, fn)
 
-            if profile_name in {"balanced", "full"}:
-                warm_steps.extend([
-                    ("popular tv", lambda: TMDBService.get_popular_tv(page=1)),
-                    ("trending anime", lambda: TMDBService.get_trending_anime(page=1)),
-                    ("top rated anime", lambda: TMDBService.get_top_rated_anime(page=1)),
-                ])
+        # One task per endpoint: the section pages ask for 24 items, so these
+        # calls also cover the 20-item page-1 lists the other routes read.
+        tasks = [
+            task("popular movies", "movie/popular", lambda: TMDBService.get_popular_movies(1, limit=24)),
+            task("trending movies", "trending/movie/week", lambda: TMDBService.get_trending_movies('week')),
+            task("top rated movies", "movie/top_rated", TMDBService.get_top_rated_movies),
+            task("genres", "genre/movie/list", TMDBService.get_genres),
+        ]
 
-            genres = []
-            if profile_name == "full" and safe_genre_count > 0:
-                genres = TMDBService.get_genres() or []
-                logger.info("Warming genre caches for %s genres", min(safe_genre_count, len(genres)))
+        if profile_name in {"balanced", "full"}:
+            tasks.extend([
+                task("trending tv", "trending/tv/week", TMDBService.get_trending_tv),
+                task("top rated tv", "tv/top_rated", TMDBService.get_top_rated_tv),
+                task("popular tv", "tv/popular", lambda: TMDBService.get_popular_tv(page=1)),
+                task("trending anime", "discover/tv", lambda: TMDBService.get_trending_anime(page=1)),
+                task("top rated anime", "discover/tv", lambda: TMDBService.get_top_rated_anime(page=1)),
+            ])
 
-            for step_name, step_callable in warm_steps:
-                try:
-                    step_callable()
-                    logger.debug("TMDB warmup step complete: %s", step_name)
-                except Exception as step_exc:
-                    logger.warning("TMDB warmup step failed (%s): %s", step_name, step_exc)
+        safe_genre_count = max(0, int(genre_count or 0))
+        if profile_name == "full" and safe_genre_count > 0:
+            # Genre rows on the movie section take 24 items, i.e. at least two pages.
+            genre_limit = max(24, 20 * max(1, int(genre_pages or 1)))
+            for genre in (TMDBService.get_genres() or [])[:safe_genre_count]:
+                tasks.append(task(
+                    f"genre {genre['id']}",
+                    "discover/movie",
+                    lambda genre_id=genre['id']: TMDBService.get_movies_by_genre(genre_id, 1, limit=genre_limit),
+                ))
 
-            if genres:
-                for i, genre in enumerate(genres[:safe_genre_count]):
-                    try:
-                        TMDBService.get_movies_by_genre(genre['id'], page=1)
-                        logger.debug("TMDB warmup genre complete %s/%s: %s", i + 1, safe_genre_count, genre.get('name'))
-                    except Exception as genre_exc:
-                        logger.warning("TMDB warmup genre failed (%s): %s", genre.get('name'), genre_exc)
+        if TMDBService.cache.access is not None:
+            for cache_key, endpoint, params, _ in TMDBService.cache.access.top(hot_keys, hot_min_score):
+                # A cached 404 stays authoritative until its negative TTL runs out.
+                if TMDBService.is_not_found(endpoint, params):
+                    continue
+                tasks.append(task(
+                    f"hot {cache_key}",
+                    endpoint,
+                    # A title TMDB now reports missing is still a completed refresh.
+                    lambda endpoint=endpoint, params=params: (
+                        TMDBService._make_request(endpoint, params) or TMDBService.is_not_found(endpoint, params)
+                    ),
+                ))
 
-            logger.info("TMDB cache warmup complete (profile=%s)", profile_name)
-        except Exception as e:
-            logger.exception("TMDB cache warming error: %s", e)
\ No newline at end of file
+        return tasks
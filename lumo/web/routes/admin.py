@@ -2,6 +2,9 @@ from flask import Blueprint, render_template, request, redirect, url_for, flash,
 from flask_login import login_required, current_user
 from ...core.extensions import db
 from ...core.models import Movie
+from ...services.fragment_cache import get_public_fragment_cache
+from ...services.route_executor import get_route_executor
+from ...services.tmdb_service import TMDBService
 from werkzeug.utils import secure_filename
 import os
 import uuid
@@ -38,18 +41,10 @@ def movies():
 @admin_bp.route('/cache/clear', methods=['POST'])
 @login_required
 def clear_public_cache():
-    """Clear the in-process public fragment cache."""
+    """Clear the public fragment cache for every worker."""
     admin_required()
 
-    cache_store = current_app.extensions.get('public_fragment_cache')
-    cache_lock = current_app.extensions.get('public_fragment_cache_lock')
-
-    if cache_store is not None:
-        if cache_lock:
-            with cache_lock:
-                cache_store.clear()
-        else:
-            cache_store.clear()
+    get_public_fragment_cache().purge()
 
     if request.accept_mimetypes.accept_json and not request.accept_mimetypes.accept_html:
         return jsonify({
@@ -61,6 +56,30 @@ def clear_public_cache():
     return redirect(url_for('admin.movies'))
 
 
+@admin_bp.route('/cache/stats')
+@login_required
+def cache_stats():
+    """TMDB cache hit ratios, tier latencies and sizes for the worker serving this request."""
+    admin_required()
+
+    stats = TMDBService.cache_stats()
+    stats['gauges']['public_fragment_cache'] = get_public_fragment_cache().stats()
+    stats['gauges']['route_executor'] = get_route_executor(current_app._get_current_object()).stats()
+    stats['gauges']['template_fragments'] = current_app.jinja_env.template_fragment_stats()
+
+    return jsonify(stats)
+
+
+@admin_bp.route('/cache/stats/reset', methods=['POST'])
+@login_required
+def reset_cache_stats():
+    """Start a fresh TMDB cache metrics window on this worker."""
+    admin_required()
+    TMDBService.init_cache()
+    TMDBService.cache.metrics.reset()
+    return jsonify({'success': True, 'message': 'Cache metrics reset'})
+
+
 @admin_bp.route('/movies/add', methods=['GET', 'POST'])
 @login_required
 def add_movie():
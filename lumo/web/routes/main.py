@@ -1,68 +1,258 @@
-from flask import Blueprint, render_template, request, session, current_app
+from flask import Blueprint, render_template, request, session, current_app, g, make_response
 from flask_login import current_user
+from ...services.fragment_cache import ExpiringLRUCache, get_public_fragment_cache
+from ...services.route_executor import get_route_executor
 from ...services.tmdb_service import TMDBService
 from ...core.models import WatchProgress
-from concurrent.futures import ThreadPoolExecutor
-import threading
+from concurrent.futures import FIRST_COMPLETED, wait
+from functools import wraps
+import hashlib
 import time
 
 main_bp = Blueprint("main", __name__)
 
-MAX_TMDB_ROUTE_WORKERS = 5
-
-
-def _run_parallel(fetchers):
-    """Run independent callables concurrently and return a name->result map."""
-    if not fetchers:
+class FetchNode:
+    """A named fetch in a route's fetch graph.
+
+    ``fn`` is called with the results of ``deps`` as keyword arguments once
+    they are all available (a dependency that timed out passes None).
+    ``timeout`` bounds the node from the moment it starts, defaulting to
+    ``ROUTE_FANOUT_TIMEOUT_SECONDS``. With ``cache_key`` the node's result is
+    read through the public fragment cache for ``cache_ttl`` seconds.
+    """
+
+    __slots__ = ("name", "fn", "deps", "timeout", "cache_key", "cache_ttl")
+
+    def __init__(self, name, fn, deps=(), timeout=None, cache_key=None, cache_ttl=None):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.timeout = timeout
+        self.cache_key = cache_key
+        self.cache_ttl = cache_ttl
+
+
+def _check_fetch_graph(nodes):
+    for node in nodes.values():
+        missing = [dep for dep in node.deps if dep not in nodes]
+        if missing:
+            raise ValueError(f"Fetch node {node.name!r} depends on unknown nodes {missing}")
+    resolved = set()
+    remaining = dict(nodes)
+    while remaining:
+        ready = [name for name, node in remaining.items() if resolved.issuperset(node.deps)]
+        if not ready:
+            raise ValueError(f"Fetch graph has a cycle between {sorted(remaining)}")
+        for name in ready:
+            resolved.add(name)
+            del remaining[name]
+
+
+def _run_fetch_graph(nodes):
+    """Run a route's fetch nodes on the route executor, each as soon as its deps finish.
+
+    Returns a name->result map. Nodes run on the request thread when the
+    executor is saturated. A node still running at its timeout (or past the
+    request's TMDB budget) yields None and marks the page degraded.
+    """
+    nodes = {node.name: node for node in nodes}
+    if not nodes:
         return {}
+    _check_fetch_graph(nodes)
 
     app = current_app._get_current_object()
-
-    def run_with_app_context(callable_fn):
+    executor = get_route_executor(app)
+    deadline = getattr(g, "tmdb_deadline", None)
+    default_timeout = float(current_app.config.get("ROUTE_FANOUT_TIMEOUT_SECONDS", 15) or 15)
+    degraded = []
+    results = {}
+
+    def call(node):
+        kwargs = {dep: results[dep] for dep in node.deps}
+        if node.cache_key:
+            return _get_cached_public_payload(node.cache_key, lambda: node.fn(**kwargs), node.cache_ttl)
+        return node.fn(**kwargs)
+
+    def run_with_app_context(node, give_up_at):
         with app.app_context():
-            return callable_fn()
+            # TMDB calls in the worker stop at the node's give-up time (never later than the
+            # request's budget), so an abandoned node frees its pool slot; the degraded flag comes back out.
+            g.tmdb_deadline = give_up_at
+            try:
+                return call(node)
+            finally:
+                if getattr(g, "tmdb_degraded", False):
+                    degraded.append(True)
+
+    waiting = dict(nodes)
+    running = {}
+    timed_out = []
+    while waiting or running:
+        for node in [node for node in waiting.values() if all(dep in results for dep in node.deps)]:
+            del waiting[node.name]
+            give_up_at = time.monotonic() + float(node.timeout or default_timeout)
+            if deadline is not None:
+                give_up_at = min(give_up_at, deadline)
+            future = executor.submit(run_with_app_context, node, give_up_at)
+            if future is None:
+                results[node.name] = call(node)
+                continue
+            running[future] = (node.name, give_up_at)
+        if not running:
+            continue
+
+        next_give_up = min(give_up_at for _, give_up_at in running.values())
+        done, _ = wait(running, timeout=max(0.0, next_give_up - time.monotonic()), return_when=FIRST_COMPLETED)
+        for future in done:
+            name, _ = running.pop(future)
+            results[name] = future.result()
+
+        now = time.monotonic()
+        for future, (name, give_up_at) in list(running.items()):
+            if give_up_at <= now and not future.done():
+                executor.abandon(future)
+                del running[future]
+                results[name] = None
+                timed_out.append(name)
+
+    if timed_out:
+        executor.record_timeout(len(timed_out))
+        current_app.logger.warning("Route fetch nodes timed out: %s", timed_out)
+        degraded.append(True)
+    if degraded:
+        g.tmdb_degraded = True
+    return {name: results[name] for name in nodes}
 
-    max_workers = min(MAX_TMDB_ROUTE_WORKERS, len(fetchers))
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            name: executor.submit(run_with_app_context, callable_fn)
-            for name, callable_fn in fetchers.items()
-        }
-        return {name: future.result() for name, future in futures.items()}
+
+def _run_parallel(fetchers):
+    """Run independent callables concurrently and return a name->result map."""
+    return _run_fetch_graph([FetchNode(name, callable_fn) for name, callable_fn in fetchers.items()])
 
 
 def _get_cached_public_payload(cache_key, builder, ttl_seconds=None):
-    """Short-lived in-process cache for non-user-specific route payloads."""
+    """Cache a non-user-specific route payload in the shared public fragment cache.
+
+    The build stamp of each payload is recorded on ``g`` so ``{% cache %}``
+    template fragments rendered from it are keyed on the payload version.
+    """
     ttl = int(ttl_seconds or current_app.config.get("PUBLIC_FRAGMENT_CACHE_SECONDS", 120) or 120)
-    cache_version = current_app.config.get("PUBLIC_FRAGMENT_CACHE_VERSION", "v1")
-    max_entries = int(current_app.config.get("PUBLIC_FRAGMENT_CACHE_MAX_ENTRIES", 512) or 512)
-    storage = current_app.extensions.setdefault("public_fragment_cache", {})
-    lock = current_app.extensions.setdefault("public_fragment_cache_lock", threading.Lock())
-    namespaced_key = f"{cache_version}:{cache_key}"
-    now_ts = time.time()
-
-    with lock:
-        cached = storage.get(namespaced_key)
-        if cached and cached[0] > now_ts:
-            return cached[1]
-        if cached and cached[0] <= now_ts:
-            storage.pop(namespaced_key, None)
-
-    value = builder()
-    with lock:
-        # Opportunistically prune expired entries first.
-        expired_keys = [k for k, (expires_at, _) in storage.items() if expires_at <= now_ts]
-        for expired_key in expired_keys:
-            storage.pop(expired_key, None)
-
-        # Keep memory usage bounded when many cache keys are created.
-        while len(storage) >= max_entries:
-            storage.pop(next(iter(storage)), None)
-
-        storage[namespaced_key] = (now_ts + ttl, value)
+    built_at, _, value = get_public_fragment_cache().get_entry_or_build(
+        cache_key,
+        builder,
+        ttl,
+        version=current_app.config.get("PUBLIC_FRAGMENT_CACHE_VERSION", "v1"),
+        # Payloads assembled from short-circuited TMDB calls are served but not kept.
+        store_if=lambda: not getattr(g, "tmdb_degraded", False),
+    )
+    payload_versions = getattr(g, "public_payload_versions", None)
+    if payload_versions is None:
+        payload_versions = g.public_payload_versions = {}
+    payload_versions[cache_key] = built_at
     return value
 
+
+# Session keys the public pages render; an anonymous session holding any of them is not page-cached.
+PAGE_CACHE_SESSION_KEYS = ("_flashes", "recently_viewed")
+
+
+def _page_cache_eligible():
+    return (
+        current_app.config.get("PUBLIC_PAGE_CACHE_ENABLED", True)
+        and request.method in {"GET", "HEAD"}
+        and not current_user.is_authenticated
+        and not any(session.get(key) for key in PAGE_CACHE_SESSION_KEYS)
+    )
+
+
+# Headers never replayed from a stored page: cookies belong to the visitor the page was rendered for.
+PAGE_CACHE_SKIP_HEADERS = {"set-cookie"}
+
+
+def _page_cache_not_modified(etag):
+    """Return a 304 when the client holds ``etag``, in any Flask-Compress encoding of it."""
+    for candidate in request.if_none_match.as_set():
+        if candidate == etag or candidate.startswith(f"{etag}:"):
+            response = current_app.response_class(status=304)
+            response.set_etag(candidate)
+            response.vary.add("Cookie")
+            response.vary.add("Accept-Encoding")
+            return response
+    return None
+
+
+def _page_cache_storage():
+    storage = current_app.extensions.get("public_page_cache")
+    if storage is None:
+        max_entries = int(current_app.config.get("PUBLIC_PAGE_CACHE_MAX_ENTRIES", 256) or 256)
+        storage = current_app.extensions.setdefault("public_page_cache", ExpiringLRUCache(max_entries))
+    return storage
+
+
+def cached_anonymous_page(view):
+    """Cache the response of a public page for anonymous visitors.
+
+    Entries are keyed by URL and ``PUBLIC_FRAGMENT_CACHE_VERSION`` and keep the
+    view's status, headers (minus cookies) and body with a strong ETag, so
+    revalidation answers 304 without rendering. Hits go out through the normal
+    response path, where Flask-Compress encodes them. Purging the public
+    fragment cache retires them too. Pages rendered while TMDB was degraded, or
+    that flashed a message, are not stored.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _page_cache_eligible():
+            return view(*args, **kwargs)
+
+        ttl = int(current_app.config.get("PUBLIC_PAGE_CACHE_SECONDS", 60) or 60)
+        cache_version = current_app.config.get("PUBLIC_FRAGMENT_CACHE_VERSION", "v1")
+        storage = _page_cache_storage()
+        # The fragment generation ties pages to admin purges of the shared payload cache.
+        page_key = f"{cache_version}:{get_public_fragment_cache().current_generation()}:{request.url}"
+        now_ts = time.time()
+
+        entry = storage.get(page_key, now_ts)
+        if entry is not None:
+            response = _page_cache_not_modified(entry["etag"]) or current_app.response_class(
+                entry["body"], status=entry["status"], headers=entry["headers"]
+            )
+            response.headers["X-Page-Cache"] = "hit"
+            return response
+
+        response = make_response(view(*args, **kwargs))
+        if (
+            response.status_code != 200
+            or response.is_streamed
+            or not (response.mimetype or "").startswith("text/html")
+            or getattr(g, "tmdb_degraded", False)
+            or session.get("_flashes")
+        ):
+            return response
+
+        body = response.get_data()
+        etag = hashlib.sha1(cache_version.encode("utf-8") + body).hexdigest()
+        response.set_etag(etag)
+        response.vary.add("Cookie")
+        storage.set(page_key, {
+            "etag": etag,
+            "status": response.status_code,
+            "headers": [(name, value) for name, value in response.headers.items()
+                        if name.lower() not in PAGE_CACHE_SKIP_HEADERS],
+            "body": body,
+        }, now_ts + ttl, now_ts)
+
+        not_modified = _page_cache_not_modified(etag)
+        if not_modified is not None:
+            for cookie in response.headers.getlist("Set-Cookie"):
+                not_modified.headers.add("Set-Cookie", cookie)
+            response = not_modified
+        response.headers["X-Page-Cache"] = "miss"
+        return response
+
+    return wrapper
+
+
 @main_bp.route("/")
+@cached_anonymous_page
 def home():
     """Optimized home page - only load carousel to reduce API calls"""
     # Get hero carousel movies (5 random popular movies)
@@ -73,6 +263,7 @@ def home():
     )
 
     recently_viewed = []
+    unresolved = []
     for item in session.get('recently_viewed', [])[:8]:
         item_id = item.get('id')
         media_type = item.get('media_type', 'movie')
@@ -98,31 +289,42 @@ def home():
             })
             continue
 
-        details = TMDBService.get_tv_card_details(item_id) if media_type == 'tv' else TMDBService.get_movie_card_details(item_id)
-        if details:
-            recently_viewed.append(details)
+        # Keep a placeholder so resolved cards stay in session order.
+        unresolved.append((len(recently_viewed), item_id, media_type))
+        recently_viewed.append(None)
 
-    continue_watching = []
+    progress_entries = []
     if current_user.is_authenticated:
-        progress_entries = (
-            WatchProgress.query
-            .filter_by(user_id=current_user.id)
-            .order_by(WatchProgress.updated_at.desc())
-            .limit(4)
-            .all()
-        )
-        for progress in progress_entries:
-            if float(progress.progress_percent or 0.0) >= 95.0 and (progress.last_event or "") in {"ended", "complete", "finished"}:
-                continue
+        progress_entries = [
+            progress for progress in (
+                WatchProgress.query
+                .filter_by(user_id=current_user.id)
+                .order_by(WatchProgress.updated_at.desc())
+                .limit(4)
+                .all()
+            )
+            if not (float(progress.progress_percent or 0.0) >= 95.0 and (progress.last_event or "") in {"ended", "complete", "finished"})
+        ]
+
+    # Resolve all card details for the page in one batched TMDB lookup.
+    resolved = TMDBService.get_details_many(
+        [(item_id, media_type) for _, item_id, media_type in unresolved]
+        + [(progress.tmdb_id, progress.media_type) for progress in progress_entries],
+        fields="card",
+    )
+    for (position, _, _), details in zip(unresolved, resolved):
+        recently_viewed[position] = details
+    recently_viewed = [item for item in recently_viewed if item]
 
-            details = TMDBService.get_tv_card_details(progress.tmdb_id) if progress.media_type == 'tv' else TMDBService.get_movie_card_details(progress.tmdb_id)
-            if not details:
-                continue
+    continue_watching = []
+    for progress, details in zip(progress_entries, resolved[len(unresolved):]):
+        if not details:
+            continue
 
-            details['media_type'] = progress.media_type
-            details['progress_percent'] = float(progress.progress_percent or 0.0)
-            details['saved_progress'] = progress
-            continue_watching.append(details)
+        details['media_type'] = progress.media_type
+        details['progress_percent'] = float(progress.progress_percent or 0.0)
+        details['saved_progress'] = progress
+        continue_watching.append(details)
     
     return render_template(
         "index.html",
@@ -132,41 +334,45 @@ def home():
     )
 
 @main_bp.route("/movies")
+@cached_anonymous_page
 def movies_section():
     """Dedicated movies section with trending and top rated"""
     def build_payload():
-        base_sections = _run_parallel({
-            'trending': lambda: TMDBService.get_trending_movies('week'),
-            'top_rated': TMDBService.get_top_rated_movies,
-            'popular': lambda: TMDBService.get_popular_movies(1, limit=24),
-            'genres': TMDBService.get_genres,
-        })
-
-        trending_movies = base_sections.get('trending') or []
-        top_rated_movies = base_sections.get('top_rated') or []
-        popular_movies = base_sections.get('popular') or []
-        genre_list = base_sections.get('genres') or []
-
-        action_genre_id = 28
-        comedy_genre_id = 35
-        for genre in genre_list:
-            name = genre.get('name', '').lower()
-            if name == 'action':
-                action_genre_id = genre.get('id')
-            elif name == 'comedy':
-                comedy_genre_id = genre.get('id')
-
-        genre_sections = _run_parallel({
-            'action': lambda: TMDBService.get_movies_by_genre(action_genre_id, 1, limit=24),
-            'comedy': lambda: TMDBService.get_movies_by_genre(comedy_genre_id, 1, limit=24),
-        })
+        def genre_id(genres, name, default):
+            for genre in genres or []:
+                if genre.get('name', '').lower() == name:
+                    return genre.get('id')
+            return default
+
+        # The genre rows only wait for the (rarely changing) genre list, not the other sections.
+        sections = _run_fetch_graph([
+            FetchNode('trending', lambda: TMDBService.get_trending_movies('week')),
+            FetchNode('top_rated', TMDBService.get_top_rated_movies),
+            FetchNode('popular', lambda: TMDBService.get_popular_movies(1, limit=24)),
+            FetchNode(
+                'genres',
+                TMDBService.get_genres,
+                cache_key="sections:genres",
+                cache_ttl=current_app.config.get("PUBLIC_GENRES_CACHE_SECONDS"),
+            ),
+            FetchNode(
+                'action',
+                lambda genres: TMDBService.get_movies_by_genre(genre_id(genres, 'action', 28), 1, limit=24),
+                deps=('genres',),
+            ),
+            FetchNode(
+                'comedy',
+                lambda genres: TMDBService.get_movies_by_genre(genre_id(genres, 'comedy', 35), 1, limit=24),
+                deps=('genres',),
+            ),
+        ])
 
         return {
-            'trending': trending_movies,
-            'top_rated': top_rated_movies,
-            'popular': popular_movies,
-            'action': genre_sections.get('action') or [],
-            'comedy': genre_sections.get('comedy') or [],
+            'trending': sections.get('trending') or [],
+            'top_rated': sections.get('top_rated') or [],
+            'popular': sections.get('popular') or [],
+            'action': sections.get('action') or [],
+            'comedy': sections.get('comedy') or [],
         }
 
     payload = _get_cached_public_payload(
@@ -185,6 +391,7 @@ def movies_section():
     )
 
 @main_bp.route("/movies/trending")
+@cached_anonymous_page
 def movies_trending():
     """Trending movies page"""
     page = request.args.get('page', 1, type=int)
@@ -206,6 +413,7 @@ def movies_trending():
     )
 
 @main_bp.route("/movies/top-rated")
+@cached_anonymous_page
 def movies_top_rated():
     """Top rated movies and shows page"""
     page = request.args.get('page', 1, type=int)
@@ -227,6 +435,7 @@ def movies_top_rated():
     )
 
 @main_bp.route("/anime")
+@cached_anonymous_page
 def anime_section():
     """Dedicated anime section"""
     anime_sections = _get_cached_public_payload(
@@ -247,6 +456,7 @@ def anime_section():
     )
 
 @main_bp.route("/series")
+@cached_anonymous_page
 def series_section():
     """Dedicated TV series section"""
     series_sections = _get_cached_public_payload(
@@ -267,6 +477,7 @@ def series_section():
     )
 
 @main_bp.route("/genres")
+@cached_anonymous_page
 def genres_page():
     """Separate genres browsing page"""
     genres = _get_cached_public_payload(
@@ -281,6 +492,7 @@ def genres_page():
     )
 
 @main_bp.route("/genre/<int:genre_id>")
+@cached_anonymous_page
 def movies_by_genre(genre_id):
     """Movies filtered by genre"""
     page = request.args.get('page', 1, type=int)
@@ -357,7 +357,14 @@ def _is_allowed_embed_origin(url):
 def _log_route_perf(route_name, started_at):
     duration_ms = int((time.perf_counter() - started_at) * 1000)
     tmdb_calls = getattr(g, "tmdb_api_calls", 0)
-    current_app.logger.info("%s took %sms (tmdb_api_calls=%s)", route_name, duration_ms, tmdb_calls)
+    coalesced_calls = getattr(g, "tmdb_coalesced_calls", 0)
+    current_app.logger.info(
+        "%s took %sms (tmdb_api_calls=%s, tmdb_coalesced_calls=%s)",
+        route_name,
+        duration_ms,
+        tmdb_calls,
+        coalesced_calls,
+    )
 
 
 def _safe_db_call(fn, default):
@@ -584,8 +591,13 @@ def movie_detail(movie_id):
         movie = TMDBService.get_movie_details(movie_id)
         
         if not movie:
-            tv_fallback = TMDBService.get_tv_details(movie_id)
-            if tv_fallback:
+            if not TMDBService.details_not_found('movie', movie_id):
+                # TMDB is unreachable or out of time; movie and TV ids overlap, so don't guess.
+                current_app.logger.warning("Movie details unavailable: %s", movie_id)
+                return render_template("errors/500.html"), 503
+
+            # The media type index usually knows the id is a show, saving the probe fetch.
+            if 'tv' in TMDBService.known_media_types(movie_id) or TMDBService.get_tv_details(movie_id):
                 return redirect(url_for("movies.tv_detail", tv_id=movie_id))
 
             current_app.logger.warning("Movie not found: %s", movie_id)
@@ -685,8 +697,11 @@ def tv_detail(tv_id):
         show = TMDBService.get_tv_details(tv_id)
         
         if not show:
-            movie_fallback = TMDBService.get_movie_details(tv_id)
-            if movie_fallback:
+            if not TMDBService.details_not_found('tv', tv_id):
+                current_app.logger.warning("TV show details unavailable: %s", tv_id)
+                return render_template("errors/500.html"), 503
+
+            if 'movie' in TMDBService.known_media_types(tv_id) or TMDBService.get_movie_details(tv_id):
                 return redirect(url_for("movies.movie_detail", movie_id=tv_id))
 
             current_app.logger.warning("TV show not found: %s", tv_id)
@@ -866,7 +881,8 @@ def save_watch_progress():
         episode=episode,
     ).first()
 
-    if not record:
+    created = record is None
+    if created:
         record = WatchProgress(
             user_id=current_user.id,
             tmdb_id=tmdb_id,
@@ -891,6 +907,8 @@ def save_watch_progress():
     record.last_event = last_event
 
     db.session.commit()
+    if created:
+        TMDBService.remember_media_types([(tmdb_id, media_type)])
     return jsonify({"success": True})
 
 @movies_bp.route("/<int:movie_id>/review", methods=["POST"])
@@ -1020,34 +1038,25 @@ def watchlist():
             'vote_average': 0.0,
         }
 
-    def resolve_entry(entry):
-        """Get movie/TV details using stored media_type for better performance."""
-        if not getattr(entry, 'tmdb_movie_id', None):
-            return None
-
-        media_type = getattr(entry, 'media_type', 'movie')
-        if media_type == 'tv':
-            details = TMDBService.get_tv_details(entry.tmdb_movie_id)
-            return details or TMDBService.get_movie_details(entry.tmdb_movie_id)
-        details = TMDBService.get_movie_details(entry.tmdb_movie_id)
-        return details or TMDBService.get_tv_details(entry.tmdb_movie_id)
+    # Enrich every card in one batched lookup; titles that cannot be resolved
+    # keep the card built from the locally stored fields.
+    try:
+        resolved = TMDBService.get_details_many(
+            [(entry.tmdb_movie_id, getattr(entry, 'media_type', 'movie')) for entry in entries],
+            fields="card",
+        )
+    except Exception as e:
+        current_app.logger.warning("Error resolving watchlist entries: %s", e)
+        resolved = [None] * len(entries)
 
     watchlist_items = []
-    enrich_limit = 8
-    for idx, entry in enumerate(entries):
+    for entry, item in zip(entries, resolved):
         base_item = build_watchlist_card(entry)
-
-        if idx < enrich_limit:
-            try:
-                item = resolve_entry(entry)
-                if item:
-                    item['media_type'] = item.get('media_type') or base_item['media_type']
-                    watchlist_items.append(item)
-                    continue
-            except Exception as e:
-                current_app.logger.warning("Error resolving watchlist entry %s: %s", entry.tmdb_movie_id, e)
-
-        watchlist_items.append(base_item)
+        if item:
+            item['media_type'] = item.get('media_type') or base_item['media_type']
+            watchlist_items.append(item)
+        else:
+            watchlist_items.append(base_item)
 
     return render_template(
         "movies/watchlist.html",
@@ -63,30 +63,24 @@ def _get_following_ids():
     return cache[cache_key]
 
 
-def _get_tmdb_details_cached(tmdb_id, preferred_media_type=None):
-    if not tmdb_id:
-        return None
-
+def _get_tmdb_details_many(items):
+    """Resolve ``(tmdb_id, media_type)`` pairs to card details in one batch, memoized per request."""
     cache = _get_request_cache('tmdb_details_cache')
-    media_types = []
-    if preferred_media_type in {'movie', 'tv'}:
-        media_types.extend([preferred_media_type, 'tv' if preferred_media_type == 'movie' else 'movie'])
-    else:
-        media_types.extend(['movie', 'tv'])
-
-    for media_type in media_types:
-        cache_key = (tmdb_id, media_type)
-        if cache_key in cache:
-            return cache[cache_key]
+    keys = [
+        (tmdb_id, media_type if media_type in {'movie', 'tv'} else None)
+        for tmdb_id, media_type in items
+    ]
+    missing = list(dict.fromkeys(key for key in keys if key[0] and key not in cache))
+    if missing:
+        for key, details in zip(missing, TMDBService.get_details_many(missing, fields="card")):
+            cache[key] = details
+    return [cache.get(key) for key in keys]
 
-        fetch_details = TMDBService.get_tv_details if media_type == 'tv' else TMDBService.get_movie_details
-        details = fetch_details(tmdb_id)
-        if details:
-            details['media_type'] = details.get('media_type') or media_type
-            cache[cache_key] = details
-            return details
 
-    return None
+def _get_tmdb_details_cached(tmdb_id, preferred_media_type=None):
+    if not tmdb_id:
+        return None
+    return _get_tmdb_details_many([(tmdb_id, preferred_media_type)])[0]
 
 
 def _attach_directory_counts(user_page):
@@ -167,15 +161,6 @@ def profile():
     # Get user's reviews with movie details from TMDB
     reviews = Review.query.filter_by(user_id=user.id).order_by(Review.created_at.desc()).limit(6).all()
     reviewed_count = Review.query.filter_by(user_id=user.id).count()
-    reviewed_movies = []
-    for review in reviews:
-        movie = _get_tmdb_details_cached(review.tmdb_movie_id)
-        if movie:
-            reviewed_movies.append({
-                'movie': movie,
-                'review': review
-            })
-    
     # Get user's watchlist with movie details from TMDB
     watchlist_entries = (
         Watchlist.query
@@ -186,23 +171,42 @@ def profile():
     )
     watchlist_count = Watchlist.query.filter_by(user_id=user.id).count()
 
-    watchlist_movies = []
-    enrich_limit = 6
-    for idx, entry in enumerate(watchlist_entries):
-        card = build_watchlist_card(entry)
+    progress_entries = [
+        progress for progress in (
+            WatchProgress.query
+            .filter_by(user_id=user.id)
+            .order_by(WatchProgress.updated_at.desc())
+            .limit(8)
+            .all()
+        )
+        if not (float(progress.progress_percent or 0.0) >= 95.0 and (progress.last_event or "") in {"ended", "complete", "finished"})
+    ]
+
+    # Resolve every card on the page in one batched TMDB lookup.
+    _get_tmdb_details_many(
+        [(review.tmdb_movie_id, None) for review in reviews]
+        + [(entry.tmdb_movie_id, getattr(entry, 'media_type', 'movie')) for entry in watchlist_entries]
+        + [(progress.tmdb_id, progress.media_type) for progress in progress_entries]
+    )
 
-        # Enrich only top cards with TMDB detail calls to avoid N remote requests.
-        if idx < enrich_limit:
-            try:
-                details = fetch_tmdb_details(entry)
-                if details:
-                    details['media_type'] = details.get('media_type') or card['media_type']
-                    watchlist_movies.append(details)
-                    continue
-            except Exception as e:
-                print(f"Error resolving watchlist entry {entry.tmdb_movie_id}: {e}")
+    reviewed_movies = []
+    for review in reviews:
+        movie = _get_tmdb_details_cached(review.tmdb_movie_id)
+        if movie:
+            reviewed_movies.append({
+                'movie': movie,
+                'review': review
+            })
 
-        watchlist_movies.append(card)
+    watchlist_movies = []
+    for entry in watchlist_entries:
+        card = build_watchlist_card(entry)
+        details = fetch_tmdb_details(entry)
+        if details:
+            details['media_type'] = details.get('media_type') or card['media_type']
+            watchlist_movies.append(details)
+        else:
+            watchlist_movies.append(card)
     
     # Get followers and following counts
     followers_count = user.followers.count()
@@ -212,16 +216,7 @@ def profile():
     unread_notifications = Notification.query.filter_by(user_id=user.id, is_read=False).count()
     
     continue_watching = []
-    progress_entries = (
-        WatchProgress.query
-        .filter_by(user_id=user.id)
-        .order_by(WatchProgress.updated_at.desc())
-        .limit(8)
-        .all()
-    )
     for progress in progress_entries:
-        if float(progress.progress_percent or 0.0) >= 95.0 and (progress.last_event or "") in {"ended", "complete", "finished"}:
-            continue
         item = build_progress_item(progress)
         if item:
             continue_watching.append(item)
@@ -253,10 +248,14 @@ def continue_watching():
         .all()
     )
 
+    entries = [
+        progress for progress in entries
+        if not (float(progress.progress_percent or 0.0) >= 95.0 and (progress.last_event or "") in {"ended", "complete", "finished"})
+    ]
+    _get_tmdb_details_many([(progress.tmdb_id, progress.media_type) for progress in entries])
+
     items = []
     for progress in entries:
-        if float(progress.progress_percent or 0.0) >= 95.0 and (progress.last_event or "") in {"ended", "complete", "finished"}:
-            continue
         item = build_progress_item(progress)
         if item:
             items.append(item)
@@ -371,6 +370,16 @@ def public_profile(username):
     # Get user's reviews (public)
     reviews = Review.query.filter_by(user_id=user.id).order_by(Review.created_at.desc()).limit(6).all()
     reviewed_count = Review.query.filter_by(user_id=user.id).count()
+    # Get user's watchlist (public)
+    watchlist_entries = Watchlist.query.filter_by(user_id=user.id).order_by(Watchlist.added_at.desc()).limit(8).all()
+    watchlist_count = Watchlist.query.filter_by(user_id=user.id).count()
+
+    # Resolve every card on the page in one batched TMDB lookup.
+    _get_tmdb_details_many(
+        [(review.tmdb_movie_id, None) for review in reviews]
+        + [(entry.tmdb_movie_id, getattr(entry, 'media_type', 'movie')) for entry in watchlist_entries]
+    )
+
     reviewed_movies = []
     for review in reviews:
         movie = _get_tmdb_details_cached(review.tmdb_movie_id)
@@ -379,24 +388,16 @@ def public_profile(username):
                 'movie': movie,
                 'review': review
             })
-    
-    # Get user's watchlist (public)
-    watchlist_entries = Watchlist.query.filter_by(user_id=user.id).order_by(Watchlist.added_at.desc()).limit(8).all()
-    watchlist_count = Watchlist.query.filter_by(user_id=user.id).count()
 
     watchlist_movies = []
-    enrich_limit = 4
-    for idx, entry in enumerate(watchlist_entries):
+    for entry in watchlist_entries:
         card = build_watchlist_card(entry)
-
-        if idx < enrich_limit:
-            details = fetch_tmdb_details(entry)
-            if details:
-                details['media_type'] = details.get('media_type') or card['media_type']
-                watchlist_movies.append(details)
-                continue
-
-        watchlist_movies.append(card)
+        details = fetch_tmdb_details(entry)
+        if details:
+            details['media_type'] = details.get('media_type') or card['media_type']
+            watchlist_movies.append(details)
+        else:
+            watchlist_movies.append(card)
     
     # Get followers and following counts
     followers_count = user.followers.count()
@@ -621,8 +622,8 @@ def activity_feed():
             .all()
         )
 
-        for review in recent_reviews:
-            movie = _get_tmdb_details_cached(review.tmdb_movie_id, "movie")
+        movies = _get_tmdb_details_many([(review.tmdb_movie_id, "movie") for review in recent_reviews])
+        for review, movie in zip(recent_reviews, movies):
             if not movie:
                 continue
 
@@ -0,0 +1,82 @@
+"""
+``{% cache %}`` tag for reusing rendered template fragments.
+
+    {% cache "sections:movies:trending" %} ... {% endcache %}
+    {% cache "genre:%s:page:%s" % (current_genre_id, page), 600 %} ... {% endcache %}
+
+The body is rendered once and kept in the public fragment cache, so it is
+shared by every worker and, as long as the body itself does not depend on
+the visitor, by logged-in users whose pages only differ in the header. Keys
+are combined with the build stamps of the route payloads loaded for the
+request (see ``main._get_cached_public_payload``): a rebuilt payload gets
+freshly rendered HTML instead of markup rendered from the previous one.
+Fragments are rendered uncached when one of those payloads was not stored,
+e.g. while TMDB is degraded.
+"""
+
+import hashlib
+import threading
+
+from flask import current_app, g, has_request_context
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from ..services.fragment_cache import get_public_fragment_cache
+
+
+class FragmentCacheExtension(Extension):
+    """Adds ``{% cache key[, ttl] %}...{% endcache %}`` with hit/miss counters."""
+
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "uncached": 0}
+        environment.extend(template_fragment_stats=self.stats)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        if parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        else:
+            args.append(nodes.Const(None))
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(self.call_method("_render_cached", args), [], [], body).set_lineno(lineno)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def _render_cached(self, key, ttl, caller):
+        if not has_request_context() or not current_app.config.get("TEMPLATE_FRAGMENT_CACHE_ENABLED", True):
+            return caller()
+
+        payload_versions = getattr(g, "public_payload_versions", None) or {}
+        if any(built_at is None for built_at in payload_versions.values()):
+            self._count("uncached")
+            return caller()
+        stamp = ",".join(f"{name}@{built_at}" for name, built_at in sorted(payload_versions.items()))
+        fragment_key = f"template:{key}:{hashlib.sha1(stamp.encode('utf-8')).hexdigest()[:16]}"
+
+        rendered = []
+
+        def render():
+            rendered.append(True)
+            return str(caller())
+
+        html = get_public_fragment_cache().get_or_build(
+            fragment_key,
+            render,
+            int(ttl or current_app.config.get("TEMPLATE_FRAGMENT_CACHE_SECONDS", 300)),
+            version=current_app.config.get("PUBLIC_FRAGMENT_CACHE_VERSION", "v1"),
+            store_if=lambda: not getattr(g, "tmdb_degraded", False),
+        )
+        self._count("misses" if rendered else "hits")
+        return Markup(html)
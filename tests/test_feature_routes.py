@@ -1,8 +1,13 @@
 """Feature route tests."""
 
+import time
+
 import pytest
+from flask import g
 from app import app
 from tmdb_service import TMDBService
+from lumo.services.fragment_cache import ExpiringLRUCache, PublicFragmentCache
+from lumo.services.tmdb_service import TMDBCache, is_negative, negative_entry
 
 
 @pytest.fixture
@@ -55,3 +60,189 @@ def test_social_pages_require_login(client, path):
     """Authenticated-only social pages should not be public."""
     response = client.get(path)
     assert response.status_code in {302, 401}
+
+
+def test_details_many_batches_and_falls_back_to_other_media_type(monkeypatch, tmp_path):
+    """Bulk details keep input order and retry titles TMDB reports missing under their media type."""
+    batches = []
+
+    def fake_fetch_many(calls, retries=3, timeout=None):
+        batches.append([endpoint for endpoint, _ in calls])
+        known = {"movie/1": {"id": 1, "title": "One"}, "tv/2": {"id": 2, "name": "Two"}}
+        for endpoint, _ in calls:
+            if endpoint in ("movie/2", "tv/3", "movie/3"):
+                TMDBService.cache.set(f"{endpoint}_{{}}", negative_entry(404))
+        # movie/5 fails transiently: no negative entry, so it is not retried as tv/5.
+        return [known.get(endpoint) for endpoint, _ in calls]
+
+    monkeypatch.setattr(TMDBService, "fetch_many", staticmethod(fake_fetch_many))
+    with app.test_request_context():
+        monkeypatch.setattr(TMDBService, "cache", TMDBCache(cache_dir=tmp_path))
+        results = TMDBService.get_details_many([(2, "movie"), (None, "tv"), (1, None), (3, "tv"), (5, "movie")])
+
+    assert batches == [["movie/2", "movie/1", "tv/3", "movie/5"], ["tv/2", "movie/3"]]
+    assert results[0]["title"] == "Two" and results[0]["media_type"] == "tv"
+    assert "overview" not in results[0]
+    assert results[1] is None
+    assert results[2]["media_type"] == "movie"
+    assert results[3] is None
+    assert results[4] is None
+
+
+def test_card_projection_is_cached_and_served_without_fetching(monkeypatch, tmp_path):
+    """List payloads populate the card tier so later grids skip TMDB entirely."""
+    def fail_fetch_many(calls, retries=3, timeout=None):
+        raise AssertionError(f"unexpected fetch: {calls}")
+
+    with app.test_request_context():
+        monkeypatch.setattr(TMDBService, "cache", TMDBCache(cache_dir=tmp_path))
+        TMDBService._store_cards([
+            ("trending/tv/week", {"results": [{"id": 7, "name": "Seven", "overview": "long", "poster_path": "/p.jpg"}]}),
+        ])
+        monkeypatch.setattr(TMDBService, "fetch_many", staticmethod(fail_fetch_many))
+        (card,) = TMDBService.get_details_many([(7, "tv")])
+
+    assert card["title"] == "Seven"
+    assert card["media_type"] == "tv"
+    assert card["poster_url"].endswith("/p.jpg")
+    assert "overview" not in card
+
+
+def test_not_found_responses_are_negatively_cached(monkeypatch, tmp_path):
+    """A 404 is stored once and later lookups read it as None without calling TMDB."""
+    requests_made = []
+
+    def fake_request(base_url, endpoint, params, request_timeout, retries):
+        requests_made.append(endpoint)
+        return negative_entry(404)
+
+    monkeypatch.setattr(TMDBService, "_request_with_retries", staticmethod(fake_request))
+    with app.test_request_context():
+        cache = TMDBCache(cache_dir=tmp_path)
+        monkeypatch.setattr(TMDBService, "cache", cache)
+        assert TMDBService._make_request("movie/999999") is None
+        cache.memory_cache.clear()
+        assert TMDBService.fetch_many([("movie/999999", {})]) == [None]
+
+    assert requests_made == ["movie/999999"]
+    entry = cache.get_with_state("movie/999999_{}")
+    assert is_negative(entry[0])
+    assert cache.metrics.snapshot()["families"]["movie/{id}"]["shared"]["outcomes"]["negative"] == 1
+
+
+def test_media_type_index_resolves_untyped_ids_in_one_request(monkeypatch, tmp_path):
+    """Ids learned from list payloads are fetched under their known type without a fallback."""
+    batches = []
+
+    def fake_fetch_many(calls, retries=3, timeout=None):
+        batches.append([endpoint for endpoint, _ in calls])
+        return [{"id": int(endpoint.split("/")[1]), "name": "Show"} for endpoint, _ in calls]
+
+    with app.test_request_context():
+        cache = TMDBCache(cache_dir=tmp_path)
+        monkeypatch.setattr(TMDBService, "cache", cache)
+        TMDBService._store_cards([("search/multi", {"results": [{"id": 41, "media_type": "tv", "name": "Show"}]})])
+        cache.memory_cache.clear()
+        monkeypatch.setattr(TMDBService, "fetch_many", staticmethod(fake_fetch_many))
+        (details,) = TMDBService.get_details_many([(41, None)], fields="full")
+
+        assert TMDBService.known_media_types(41) == frozenset({"tv"})
+        assert TMDBService.resolve_media_types([(41, "movie"), (42, None)]) == ["movie", "movie"]
+
+    assert batches == [["tv/41"]]
+    assert details["media_type"] == "tv"
+
+
+def test_spent_request_budget_serves_cache_and_skips_tmdb(monkeypatch, tmp_path):
+    """Past the route deadline cached data is still returned but nothing new is fetched."""
+    def fail_request(*args, **kwargs):
+        raise AssertionError("TMDB must not be called once the budget is spent")
+
+    monkeypatch.setattr(TMDBService, "_request_with_retries", staticmethod(fail_request))
+    with app.test_request_context():
+        cache = TMDBCache(cache_dir=tmp_path)
+        monkeypatch.setattr(TMDBService, "cache", cache)
+        cache.set("movie/1_{}", {"id": 1})
+        g.tmdb_deadline = time.monotonic() - 1
+
+        assert TMDBService._make_request("movie/1") == {"id": 1}
+        assert TMDBService._make_request("movie/2") is None
+        assert TMDBService.fetch_many([("movie/1", {}), ("tv/2", {}), ("tv/3", {})]) == [{"id": 1}, None, None]
+        assert g.tmdb_degraded is True
+
+
+def test_detail_pages_only_switch_media_type_on_a_cached_not_found(monkeypatch, client, tmp_path):
+    """A transient failure on /movie/<id> renders an error instead of redirecting to an unrelated show."""
+    requested = []
+
+    def fake_request(base_url, endpoint, params, request_timeout, retries):
+        requested.append(endpoint)
+        if endpoint == "movie/8":
+            return negative_entry(404)
+        if endpoint.startswith("tv/"):
+            return {"id": int(endpoint.split("/")[1]), "name": "Show"}
+        return None
+
+    monkeypatch.setattr(TMDBService, "_request_with_retries", staticmethod(fake_request))
+    monkeypatch.setattr(TMDBService, "cache", TMDBCache(cache_dir=tmp_path))
+
+    response = client.get("/movies/7")
+    assert response.status_code == 503
+    assert requested == ["movie/7"]
+
+    response = client.get("/movies/8")
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith("/movies/tv/8")
+
+
+def test_tmdb_budget_is_only_set_for_tmdb_backed_routes():
+    """Static files and health checks skip the per-request TMDB deadline."""
+    for path, expects_deadline in (("/static/css/style.css", False), ("/health", False), ("/genres", True)):
+        with app.test_request_context(path):
+            app.preprocess_request()
+            assert (getattr(g, "tmdb_deadline", None) is not None) is expects_deadline, path
+
+
+def test_anonymous_pages_are_cached_with_etags(monkeypatch, client):
+    """Anonymous page views reuse the rendered HTML and revalidate with 304."""
+    degraded = []
+
+    def fake_genres():
+        if degraded:
+            g.tmdb_degraded = True
+        return [{"id": 28, "name": "Action"}]
+
+    monkeypatch.setattr(TMDBService, "get_genres", staticmethod(fake_genres))
+    monkeypatch.setitem(app.extensions, "public_fragment_cache", PublicFragmentCache())
+    monkeypatch.setitem(app.extensions, "public_page_cache", ExpiringLRUCache(16))
+
+    degraded.append(True)
+    assert client.get("/genres").headers.get("X-Page-Cache") is None
+    degraded.clear()
+
+    first = client.get("/genres")
+    assert first.headers["X-Page-Cache"] == "miss"
+    assert b"Action" in first.data
+
+    compressed = client.get("/genres", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["X-Page-Cache"] == "hit"
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.headers["Content-Type"] == first.headers["Content-Type"]
+    assert "Cookie" in compressed.headers["Vary"] and "Accept-Encoding" in compressed.headers["Vary"]
+    assert compressed.headers["ETag"] == first.headers["ETag"][:-1] + ':gzip"'
+
+    revalidated = client.get("/genres", headers={"If-None-Match": first.headers["ETag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b""
+
+    gzip_revalidated = client.get(
+        "/genres", headers={"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["ETag"]}
+    )
+    assert gzip_revalidated.status_code == 304
+    assert gzip_revalidated.headers["ETag"] == compressed.headers["ETag"]
+
+    # Encoding follows the app's Flask-Compress settings rather than a private code path.
+    monkeypatch.setitem(app.config, "COMPRESS_MIMETYPES", ["application/json"])
+    plain = client.get("/genres", headers={"Accept-Encoding": "gzip"})
+    assert plain.headers["X-Page-Cache"] == "hit"
+    assert "Content-Encoding" not in plain.headers
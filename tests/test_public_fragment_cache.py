@@ -0,0 +1,118 @@
+"""Public fragment cache tests."""
+
+import threading
+import time
+
+from lumo.services.fragment_cache import ExpiringLRUCache, PublicFragmentCache, _SQLiteFragmentStore
+from lumo.services.shared_cache import SQLiteCacheBackend
+
+
+def _worker_cache(path, **kwargs):
+    """A cache as one worker process would build it over the host-shared store."""
+    return PublicFragmentCache(_SQLiteFragmentStore(SQLiteCacheBackend(path)), generation_poll_seconds=0, **kwargs)
+
+
+def test_local_tier_expires_by_heap_and_evicts_least_recently_used():
+    """Expired entries drop off the heap on write and the LRU entry is evicted at capacity."""
+    cache = ExpiringLRUCache(max_entries=3, shard_count=1)
+    cache.set("genre:28:page:1", "a", expires_at=100, now_ts=0)
+    cache.set("genre:28:page:2", "b", expires_at=500, now_ts=0)
+    cache.set("genre:28:page:3", "c", expires_at=500, now_ts=0)
+    assert cache.get("genre:28:page:2", now_ts=50) == "b"
+
+    cache.set("genre:28:page:4", "d", expires_at=500, now_ts=200)
+    assert len(cache) == 3
+    cache.set("genre:28:page:5", "e", expires_at=500, now_ts=200)
+
+    assert cache.get("genre:28:page:1", now_ts=200) is None
+    assert cache.get("genre:28:page:3", now_ts=200) is None
+    assert [cache.get(f"genre:28:page:{n}", now_ts=200) for n in (2, 4, 5)] == ["b", "d", "e"]
+
+
+def test_concurrent_misses_across_workers_build_once(tmp_path):
+    """Threads of two workers missing the same key share a single builder call."""
+    workers = [_worker_cache(tmp_path / "fragments.sqlite3") for _ in range(2)]
+    calls = []
+    release = threading.Event()
+
+    def builder():
+        calls.append(1)
+        release.wait(2)
+        return {"items": [1, 2, 3]}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda cache=cache: results.append(cache.get_or_build("sections:movies", builder, 60)))
+        for cache in workers for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [{"items": [1, 2, 3]}] * 6
+
+
+def test_stale_entries_are_served_while_rebuilding_and_purge_reaches_all_workers(tmp_path):
+    """Past its TTL the old payload is served to non-builders, and purge drops it everywhere."""
+    first, second = (_worker_cache(tmp_path / "fragments.sqlite3", stale_seconds=60) for _ in range(2))
+    assert first.get_or_build("sections:anime", lambda: "v1", 60) == "v1"
+    assert second.get_or_build("sections:anime", lambda: "unused", 60) == "v1"
+
+    key = f"v1:{second.current_generation()}:sections:anime"
+    stale_until, expires_at = time.time() - 1, time.time() + 60
+    second.store.set(key, '"v1"', stale_until, expires_at)
+    second._local.set(key, (stale_until, expires_at, "v1"), expires_at)
+    second.store.acquire(key, 30)  # another worker is already rebuilding
+    assert second.get_or_build("sections:anime", lambda: "v2", 60) == "v1"
+    assert second.stats()["stale_hits"] == 1
+
+    first.purge()
+    assert second.get_or_build("sections:anime", lambda: "v3", 60) == "v3"
+    assert second.stats()["generation"] == 1
+
+
+def test_cache_tag_reuses_fragments_until_the_payload_is_rebuilt(monkeypatch):
+    """``{% cache %}`` renders once per payload stamp and counts hits and misses."""
+    from flask import g
+    from jinja2 import Environment
+
+    from app import app
+    from lumo.web.template_cache import FragmentCacheExtension
+
+    monkeypatch.setitem(app.extensions, "public_fragment_cache", PublicFragmentCache())
+    env = Environment(autoescape=True, extensions=[FragmentCacheExtension])
+    template = env.from_string('{% cache "grid:%s" % page %}{% for m in movies %}<b>{{ m }}</b>{% endfor %}{% endcache %}')
+
+    def render(movies, built_at):
+        with app.test_request_context():
+            g.public_payload_versions = {"sections:movies": built_at}
+            return template.render(movies=movies, page=1)
+
+    assert render(["Heat"], 100.0) == "<b>Heat</b>"
+    assert render(["Ignored"], 100.0) == "<b>Heat</b>"
+    assert render(["Alien"], 200.0) == "<b>Alien</b>"
+    assert render(["Uncached"], None) == "<b>Uncached</b>"
+    assert env.template_fragment_stats() == {"hits": 1, "misses": 2, "uncached": 1}
+
+
+def test_build_locks_are_owned_and_dropped_after_use(tmp_path):
+    """A lock taken over after expiry survives the first holder's release; per-key locks don't pile up."""
+    store = _SQLiteFragmentStore(SQLiteCacheBackend(tmp_path / "fragments.sqlite3"))
+    overrun = store.acquire("sections:movies", 0.05)
+    time.sleep(0.1)
+    current = store.acquire("sections:movies", 30)
+    assert overrun and current and overrun != current
+
+    store.release("sections:movies", overrun)
+    assert store.acquire("sections:movies", 30) is None
+    store.release("sections:movies", current)
+    assert store.acquire("sections:movies", 30)
+
+    cache = _worker_cache(tmp_path / "pages.sqlite3")
+    for page in range(20):
+        cache.get_or_build(f"sections:genre:28:page:{page}", lambda: [page], 60)
+    assert cache._build_locks == {}
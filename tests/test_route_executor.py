@@ -0,0 +1,89 @@
+"""Route fan-out executor tests."""
+
+import threading
+import time
+
+import pytest
+
+from flask import g
+
+from app import app
+from lumo.services.route_executor import RouteExecutor
+from lumo.web.routes.main import FetchNode, _run_fetch_graph, _run_parallel
+
+
+def test_saturated_pool_runs_calls_on_the_request_thread(monkeypatch):
+    """Past workers + queue, calls run inline instead of queueing without bound."""
+    executor = RouteExecutor(max_workers=1, max_queue=0)
+    monkeypatch.setitem(app.extensions, "route_executor", executor)
+    request_thread = threading.current_thread().name
+
+    with app.test_request_context():
+        results = _run_parallel({
+            "pooled": lambda: threading.current_thread().name,
+            "inline": lambda: threading.current_thread().name,
+        })
+
+    assert results["pooled"].startswith("route-fanout")
+    assert results["inline"] == request_thread
+    stats = executor.stats()
+    assert (stats["submitted"], stats["saturated"], stats["completed"]) == (1, 1, 1)
+    assert stats["queue_depth"] == 0 and stats["running"] == 0
+
+
+def test_calls_past_the_fanout_timeout_are_dropped_and_flag_the_page(monkeypatch):
+    """A call still running at the timeout comes back as None and marks the page degraded."""
+    executor = RouteExecutor(max_workers=2, max_queue=2)
+    monkeypatch.setitem(app.extensions, "route_executor", executor)
+    monkeypatch.setitem(app.config, "ROUTE_FANOUT_TIMEOUT_SECONDS", 0.2)
+    release = threading.Event()
+
+    worker_deadlines = []
+
+    def slow():
+        worker_deadlines.append(g.tmdb_deadline)
+        return release.wait(5)
+
+    with app.test_request_context():
+        started = time.monotonic()
+        results = _run_parallel({"fast": lambda: [1], "slow": slow})
+        assert results == {"fast": [1], "slow": None}
+        assert g.tmdb_degraded is True
+
+    # The abandoned call holds its slot until it returns, and its TMDB budget ends at the timeout.
+    assert executor.stats()["abandoned"] == 1
+    assert worker_deadlines[0] <= started + 0.3
+    release.set()
+    for _ in range(50):
+        if executor.stats()["abandoned"] == 0:
+            break
+        time.sleep(0.02)
+
+    stats = executor.stats()
+    assert (stats["timed_out"], stats["abandoned"]) == (1, 0)
+
+
+def test_fetch_graph_starts_nodes_as_soon_as_their_dependencies_finish(monkeypatch):
+    """A dependent node runs while an unrelated slow node is still in flight."""
+    monkeypatch.setitem(app.extensions, "route_executor", RouteExecutor(max_workers=4, max_queue=4))
+    dependent_done = threading.Event()
+
+    def slow_trending():
+        # Only finishes once the genre row, which waits on the genre list alone, is done.
+        return dependent_done.wait(2)
+
+    def action_row(genres):
+        dependent_done.set()
+        return [genre["id"] for genre in genres]
+
+    with app.test_request_context():
+        results = _run_fetch_graph([
+            FetchNode("trending", slow_trending),
+            FetchNode("genres", lambda: [{"id": 28}]),
+            FetchNode("action", action_row, deps=("genres",)),
+        ])
+
+    assert results == {"trending": True, "genres": [{"id": 28}], "action": [28]}
+
+    with pytest.raises(ValueError):
+        _run_fetch_graph([FetchNode("a", lambda b: b, deps=("b",)), FetchNode("b", lambda a: a, deps=("a",))])
@@ -0,0 +1,124 @@
+"""Async TMDB engine tests against a local HTTP server."""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app import app
+from lumo.services.rate_limiter import LocalTokenBucket
+from lumo.services.tmdb_async import AsyncTMDBClient
+from lumo.services.tmdb_service import TMDBCache, TMDBService
+
+
+class _TMDBStubHandler(BaseHTTPRequestHandler):
+    failures = {}
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].strip("/")
+        if path.startswith("3/missing"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        remaining = self.failures.get(path, 0)
+        if remaining:
+            self.failures[path] = remaining - 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = json.dumps({"path": path}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def tmdb_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _TMDBStubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/3"
+    server.shutdown()
+
+
+def test_fetch_many_returns_results_in_order(tmdb_stub):
+    """Batches keep call order, turn client errors into None and count HTTP attempts."""
+    client = AsyncTMDBClient(tmdb_stub, LocalTokenBucket(rate=100, burst=50), max_concurrency=4)
+    calls = [(f"movie/{i}", {"api_key": "k"}) for i in range(10)] + [("missing/1", {})]
+
+    results, api_calls = client.fetch_many(calls, timeout=5, retries=0)
+
+    assert [result["path"] for result in results[:10]] == [f"3/movie/{i}" for i in range(10)]
+    assert results[10] is None
+    assert api_calls == 11
+
+
+def test_fetch_many_retries_server_errors(tmdb_stub, monkeypatch):
+    """Retryable statuses are retried with backoff like the blocking client."""
+    monkeypatch.setattr("lumo.services.tmdb_async.asyncio.sleep", _no_sleep)
+    _TMDBStubHandler.failures["3/tv/5"] = 1
+    client = AsyncTMDBClient(tmdb_stub, LocalTokenBucket(rate=100, burst=50))
+
+    results, api_calls = client.fetch_many([("tv/5", {})], timeout=5, retries=2)
+
+    assert results == [{"path": "3/tv/5"}]
+    assert api_calls == 2
+
+
+def test_shared_rate_limiter_runs_off_the_event_loop(tmdb_stub):
+    """A Redis-backed bucket's blocking round trip never runs on the loop thread."""
+    threads = []
+
+    class SharedBucket:
+        def try_acquire(self, tokens=1):
+            threads.append(threading.current_thread().name)
+            return 0
+
+    client = AsyncTMDBClient(tmdb_stub, SharedBucket())
+    results, _ = client.fetch_many([("movie/1", {}), ("movie/2", {})], timeout=5, retries=0)
+
+    assert [result["path"] for result in results] == ["3/movie/1", "3/movie/2"]
+    assert threads and "tmdb-async" not in threads
+
+
+def test_stuck_batches_are_cancelled_at_the_deadline(tmdb_stub):
+    """The calling thread is released at the deadline even if the loop never finishes."""
+    client = AsyncTMDBClient(tmdb_stub, LocalTokenBucket(rate=100, burst=50))
+
+    async def stuck(*args):
+        await asyncio.sleep(30)
+
+    client._gather = stuck
+    started = time.monotonic()
+    results, _ = client.fetch_many([("movie/1", {}), ("movie/2", {})], deadline=time.monotonic() + 0.1)
+
+    assert results == [None, None]
+    assert time.monotonic() - started < 5
+
+
+def test_batches_fall_back_to_blocking_requests_without_httpx(monkeypatch, tmp_path):
+    """When the async engine can't be built, batched misses are fetched one by one."""
+    monkeypatch.setattr("lumo.services.tmdb_async.httpx", None)
+    monkeypatch.setattr(TMDBService, "_async_client", None)
+    monkeypatch.setattr(TMDBService, "_async_unavailable", False)
+    monkeypatch.setattr(
+        TMDBService, "_request_with_retries", staticmethod(lambda base_url, endpoint, *a: {"endpoint": endpoint})
+    )
+    with app.test_request_context():
+        monkeypatch.setattr(TMDBService, "cache", TMDBCache(cache_dir=tmp_path))
+        results = TMDBService.fetch_many([("movie/1", {}), ("tv/2", {})])
+
+    assert results == [{"endpoint": "movie/1"}, {"endpoint": "tv/2"}]
+    assert TMDBService._async_unavailable is True
+
+
+async def _no_sleep(_seconds):
+    return None
@@ -0,0 +1,225 @@
+"""TMDB cache tier tests."""
+
+import os
+import threading
+import time
+
+import pytest
+
+from lumo.services.disk_cache import HEADER, DiskCacheBackend, DiskCacheJanitor
+from lumo.services.shared_cache import SQLiteCacheBackend
+from lumo.services.tmdb_service import (
+    CachePolicy,
+    CachePolicyTable,
+    ShardedLRUCache,
+    SingleFlight,
+    TMDBCache,
+)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    """Recently read keys should survive eviction triggered by new writes."""
+    cache = ShardedLRUCache(max_bytes=300, shard_count=1)
+    cache.set("movie/popular", {"page": 1}, expires_at=float("inf"), size=100)
+    cache.set("movie/1", {"id": 1}, expires_at=float("inf"), size=100)
+    cache.set("movie/2", {"id": 2}, expires_at=float("inf"), size=100)
+
+    assert cache.get("movie/popular") == {"page": 1}
+    cache.set("movie/3", {"id": 3}, expires_at=float("inf"), size=100)
+
+    assert cache.get("movie/popular") == {"page": 1}
+    assert cache.get("movie/1") is None
+    assert cache.stats()["bytes"] == 300
+
+
+def test_memory_tier_rejects_oversized_and_expired_entries():
+    """Payloads larger than a shard budget are skipped and expired entries miss."""
+    cache = ShardedLRUCache(max_bytes=100, shard_count=1)
+
+    assert cache.set("movie/big", {"id": 1}, expires_at=float("inf"), size=500) is False
+    assert cache.get("movie/big") is None
+
+    cache.set("movie/old", {"id": 2}, expires_at=10, size=10)
+    assert cache.get("movie/old", now_ts=20) is None
+    assert cache.stats() == {"entries": 0, "bytes": 0, "max_bytes": 100}
+
+
+def test_single_flight_shares_result_and_errors():
+    """Concurrent callers for one key should run the function once."""
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch():
+        calls.append(1)
+        release.wait(2)
+        return {"id": 42}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("movie/42", slow_fetch, wait_timeout=2)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    while flight.in_flight() == 0:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result == {"id": 42} for result, _ in results)
+    assert sorted(shared for _, shared in results) == [False, True, True, True]
+
+    def failing_fetch():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        flight.do("movie/43", failing_fetch)
+    assert flight.in_flight() == 0
+
+
+def test_cache_serves_stale_entries_until_hard_ttl(tmp_path):
+    """Entries past the soft TTL are reported stale instead of missing."""
+    cache = TMDBCache(cache_dir=tmp_path)
+    stale_policy = CachePolicy(ttl=0, hard_ttl=3600)
+    cache.set("movie/7_{}", {"id": 7}, stale_policy)
+
+    assert cache.get("movie/7_{}") is None
+    assert cache.get_with_state("movie/7_{}") == ({"id": 7}, True)
+
+    cache.memory_cache.clear()
+    assert cache.get_with_state("movie/7_{}") == ({"id": 7}, True)
+
+    cache.set("movie/8_{}", {"id": 8}, CachePolicy(ttl=0, hard_ttl=0))
+    cache.memory_cache.clear()
+    assert cache.get_with_state("movie/8_{}") is None
+
+
+def test_cache_get_many_and_set_many_use_disk_fallback(tmp_path):
+    """Batch reads return hits from every tier and skip missing or expired keys."""
+    cache = TMDBCache(cache_dir=tmp_path)
+    cache.set_many(
+        {"movie/1_{}": {"id": 1}, "movie/2_{}": {"id": 2}, "movie/3_{}": {"id": 3}},
+        {"movie/3_{}": CachePolicy(ttl=0, hard_ttl=0)},
+    )
+    cache.set("movie/4_{}", {"id": 4}, CachePolicy(ttl=0, hard_ttl=3600))
+    cache.memory_cache.pop("movie/2_{}")
+    cache.memory_cache.pop("movie/4_{}")
+
+    found = cache.get_many(["movie/1_{}", "movie/2_{}", "movie/3_{}", "movie/4_{}", "movie/5_{}"])
+
+    assert found == {
+        "movie/1_{}": ({"id": 1}, False),
+        "movie/2_{}": ({"id": 2}, False),
+        "movie/4_{}": ({"id": 4}, True),
+    }
+    assert cache.memory_cache.get("movie/2_{}") is not None
+
+
+def test_cache_policy_table_controls_ttl_and_tiers(tmp_path):
+    """Endpoint patterns pick TTLs and keep excluded tiers empty."""
+    table = CachePolicyTable(
+        [
+            {"pattern": "genre/*", "ttl": 86400},
+            {"pattern": "search/*", "ttl": 60, "tiers": ["disk"]},
+            {"pattern": "movie/[0-9]*", "max_bytes": {"memory": 10}},
+        ],
+        default_ttl=600,
+    )
+    assert table.resolve("genre/movie/list").ttl == 86400
+    assert table.resolve("movie/popular").ttl == 600
+    assert table.resolve("movie/550").max_bytes == {"memory": 10}
+
+    cache = TMDBCache(cache_dir=tmp_path)
+    cache.policies = table
+    cache.set('search/multi_{"query": "x"}', {"results": []})
+    cache.set("movie/550_{}", {"id": 550, "title": "Fight Club"})
+
+    assert cache.memory_cache.stats()["entries"] == 0
+    assert cache.get('search/multi_{"query": "x"}') == {"results": []}
+    assert cache.get("movie/550_{}") == {"id": 550, "title": "Fight Club"}
+
+
+def test_disk_backend_layout_and_header_expiry(tmp_path):
+    """Disk entries are sharded, compressed and expire from the header alone."""
+    backend = DiskCacheBackend(tmp_path)
+    backend.write("movie/1_{}", '{"data":{"id":1}}', fresh_until=100, expires_at=200)
+
+    path = backend.path_for("movie/1_{}")
+    assert path.exists()
+    assert path.relative_to(tmp_path).parts[:2] == (path.stem[:2], path.stem[2:4])
+    assert backend.read("movie/1_{}", now_ts=150) == (100.0, 200.0, '{"data":{"id":1}}')
+
+    # Expired entries are dropped without decompressing the (here invalid) payload.
+    path.write_bytes(path.read_bytes()[:HEADER.size] + b"not-zlib")
+    assert backend.read("movie/1_{}", now_ts=250) is None
+    assert not path.exists()
+    assert list(tmp_path.glob("*/*/.tmp-*")) == []
+
+
+def test_disk_janitor_expires_and_caps_by_access_time(tmp_path):
+    """Sweeps drop expired entries first, then the least recently read ones."""
+    backend = DiskCacheBackend(tmp_path)
+    backend.write("expired_{}", "x" * 200, fresh_until=10, expires_at=20)
+    for name, atime in (("old_{}", 100), ("new_{}", 200)):
+        backend.write(name, name * 50, fresh_until=1000, expires_at=2000)
+        os.utime(backend.path_for(name), (atime, atime))
+
+    janitor = DiskCacheJanitor(backend, interval_seconds=60, max_bytes=backend.path_for("new_{}").stat().st_size)
+    report = janitor.run_once(now_ts=500)
+
+    assert report["expired"] == 1
+    assert report["evicted"] == 1
+    assert report["remaining_entries"] == 1
+    assert backend.path_for("new_{}").exists()
+    assert not backend.path_for("old_{}").exists()
+    assert janitor.run_once(now_ts=510) is None
+
+
+def test_shared_tier_is_visible_across_cache_instances(tmp_path):
+    """A second worker's cache reads entries written by the first without touching disk files."""
+    writer = TMDBCache(cache_dir=tmp_path)
+    reader = TMDBCache(cache_dir=tmp_path)
+    writer.set("movie/9_{}", {"id": 9})
+
+    assert list(writer.disk.iter_entry_paths()) == []
+    assert reader.get("movie/9_{}") == {"id": 9}
+    assert reader.get_many(["movie/9_{}", "movie/10_{}"]) == {"movie/9_{}": ({"id": 9}, False)}
+
+
+def test_shared_backend_sweep_expires_and_caps_by_access_time(tmp_path):
+    """Sweeps drop rows past their hard TTL, then the least recently read ones."""
+    backend = SQLiteCacheBackend(tmp_path / "shared.sqlite3")
+    now = time.time()
+    backend.write("expired", "x" * 100, now - 10, now - 1)
+    sizes = backend.write_many([(f"live-{i}", str(i) * 2000, now + 60, now + 60) for i in range(3)])
+    backend._connect().execute("UPDATE entries SET accessed_at = ? WHERE key = 'live-0'", (now - 3600,))
+
+    report = backend.sweep(now, max_bytes=sum(sizes.values()) - 1)
+
+    assert report["expired"] == 1
+    assert report["evicted"] == 1
+    assert backend.read("live-0", now) is None
+    assert backend.read("live-1", now)[2] == "1" * 2000
+    assert backend.stats()["entries"] == 2
+
+
+def test_cache_metrics_track_tier_outcomes_per_endpoint_family(tmp_path):
+    """Lookups are counted per endpoint family and tier with latency samples."""
+    cache = TMDBCache(cache_dir=tmp_path)
+    cache.set("movie/550_{}", {"id": 550})
+    cache.get("movie/550_{}")
+    cache.memory_cache.clear()
+    cache.get("movie/550_{}")
+    cache.get('trending/movie/week_{"page": 1}')
+
+    snapshot = cache.metrics.snapshot()
+    movie = snapshot["families"]["movie/{id}"]
+    assert movie["memory"]["outcomes"] == {"hit": 1, "miss": 1}
+    assert movie["shared"]["outcomes"] == {"hit": 1}
+    assert movie["shared"]["latency"]["count"] == 1
+    assert snapshot["families"]["trending"]["disk"]["outcomes"] == {"miss": 1}
+    assert snapshot["tiers"]["memory"]["hit_ratio"] == pytest.approx(1 / 3, abs=1e-3)
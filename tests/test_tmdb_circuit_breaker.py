@@ -0,0 +1,47 @@
+"""TMDB circuit breaker tests."""
+
+import time
+
+from flask import g
+
+from app import app
+from tmdb_service import TMDBService
+from lumo.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from lumo.services.tmdb_service import TMDBCache
+
+
+def test_breaker_opens_on_failures_and_recovers_through_a_probe():
+    """Failures trip the breaker, and after the open period one probe decides its state."""
+    breaker = CircuitBreaker(failure_threshold=3, failure_ratio=0.5, window_seconds=60, open_seconds=1)
+    breaker.record_success()
+    for _ in range(3):
+        breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert breaker.allow() is False
+
+    breaker._opened_until = time.monotonic()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record_success()
+
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["trips"] == 1
+    assert breaker.snapshot()["short_circuits"] == 2
+
+
+def test_open_circuit_fails_fast_and_flags_the_request(monkeypatch, tmp_path):
+    """With the circuit open no HTTP call is made and the request is marked degraded."""
+    def fail_session():
+        raise AssertionError("TMDB must not be called while the circuit is open")
+
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=60)
+    breaker.record_failure()
+    monkeypatch.setattr(TMDBService, "_circuit_breaker", breaker)
+    monkeypatch.setattr(TMDBService, "_get_http_session", staticmethod(fail_session))
+    with app.test_request_context():
+        monkeypatch.setattr(TMDBService, "cache", TMDBCache(cache_dir=tmp_path))
+        assert TMDBService._make_request("movie/1") is None
+        assert TMDBService.fetch_many([("movie/2", {}), ("tv/3", {})]) == [None, None]
+        assert g.tmdb_degraded is True
@@ -0,0 +1,41 @@
+"""TMDB outbound rate limiter tests."""
+
+import threading
+import time
+
+from lumo.services.rate_limiter import LocalTokenBucket, build_rate_limiter
+
+
+def test_token_bucket_allows_burst_then_refills():
+    """A full bucket serves a burst immediately and then paces callers at the refill rate."""
+    bucket = LocalTokenBucket(rate=20, burst=3)
+
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() > 0
+
+    started = time.monotonic()
+    assert bucket.acquire(timeout=1) is True
+    assert time.monotonic() - started >= 0.03
+
+
+def test_token_bucket_is_shared_by_threads_and_honours_timeout():
+    """Concurrent threads never take more tokens than the bucket holds."""
+    bucket = LocalTokenBucket(rate=0.01, burst=4)
+    results = []
+
+    def worker():
+        results.append(bucket.acquire(timeout=0.2))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == 4
+    assert results.count(False) == 4
+
+
+def test_rate_limiter_falls_back_to_local_bucket_without_redis():
+    """Without a Redis client each process gets its own bucket."""
+    assert isinstance(build_rate_limiter(4, 10), LocalTokenBucket)
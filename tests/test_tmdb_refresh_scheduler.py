@@ -0,0 +1,145 @@
+"""TMDB refresh scheduler tests."""
+
+from flask import g
+
+from app import app
+from tmdb_service import TMDBService
+from lumo.core.app import _run_refresh_task
+from lumo.services.refresh_scheduler import AccessTracker, CacheRefreshScheduler, RefreshTask
+from lumo.services.tmdb_service import TMDBCache, negative_entry
+
+
+def test_scheduler_refreshes_tasks_ahead_of_expiry_under_a_leader_lock(tmp_path):
+    """Only tasks near expiry run, one process leads a tick, and state survives restarts."""
+    calls = []
+    tasks = [
+        RefreshTask("short", 600, lambda: calls.append("short")),
+        RefreshTask("long", 3600, lambda: calls.append("long")),
+    ]
+
+    def build():
+        return CacheRefreshScheduler(lambda: tasks, lambda task: task.fn(), state_dir=tmp_path, lead_seconds=120)
+
+    scheduler = build()
+    first = scheduler.run_once(now_ts=1000)
+    assert sorted(first["refreshed"]) == ["long", "short"]
+
+    calls.clear()
+    assert build().run_once(now_ts=1000 + 300) is None
+    summary = build().run_once(now_ts=first["finished_at"] + 600 - 120)
+    assert summary["refreshed"] == ["short"]
+    assert calls == ["short"]
+
+    (tmp_path / "tmdb_refresh.lock").write_text("other-worker", encoding="utf-8")
+    assert build().run_once(now_ts=first["finished_at"] + 7200) is None
+
+    status = build().status()
+    assert status["last_run"]["refreshed"] == ["short"]
+    assert status["tasks_tracked"] == 2
+
+
+def test_forced_refresh_bypasses_fresh_cache_entries(monkeypatch, tmp_path):
+    """A refresh task re-fetches from TMDB and rewrites the cached entry."""
+    payloads = iter([{"results": ["old"]}, {"results": ["new"]}])
+    monkeypatch.setattr(TMDBService, "_request_with_retries", staticmethod(lambda *a, **k: next(payloads)))
+    with app.test_request_context():
+        monkeypatch.setattr(TMDBService, "cache", TMDBCache(cache_dir=tmp_path))
+        assert TMDBService._make_request("movie/popular", {"page": 1}) == {"results": ["old"]}
+        assert TMDBService._make_request("movie/popular", {"page": 1}) == {"results": ["old"]}
+
+        g.tmdb_force_refresh = True
+        assert TMDBService._make_request("movie/popular", {"page": 1}) == {"results": ["new"]}
+        g.tmdb_force_refresh = False
+        assert TMDBService._make_request("movie/popular", {"page": 1}) == {"results": ["new"]}
+
+
+def test_access_counts_decay_and_feed_hot_keys_into_the_warm_set(monkeypatch, tmp_path):
+    """Decayed access counts rank keys across flushes, and hot keys become refresh tasks."""
+    tracker = AccessTracker(tmp_path, half_life_seconds=3600)
+    for _ in range(4):
+        tracker.record("movie/1_{}", "movie/1", {})
+    tracker.record("tv/2_{}", "tv/2", {})
+    assert tracker.flush(now_ts=1000)
+    for _ in range(2):
+        tracker.record("tv/2_{}", "tv/2", {})
+    assert tracker.flush(now_ts=1000 + 3600)
+
+    ranked = AccessTracker(tmp_path, half_life_seconds=3600).top(5, now_ts=1000 + 3600)
+    assert [(key, score) for key, _, _, score in ranked] == [("tv/2_{}", 2.5), ("movie/1_{}", 2.0)]
+
+    monkeypatch.setattr(TMDBService, "_request_with_retries", staticmethod(lambda *a, **k: {"id": 7}))
+    with app.test_request_context():
+        monkeypatch.setattr(TMDBService, "cache", TMDBCache(cache_dir=tmp_path / "cache"))
+        for _ in range(3):
+            TMDBService._make_request("movie/7", {"language": "en-US"})
+        TMDBService.cache.access.flush()
+
+        tasks = TMDBService.refresh_tasks("quick", hot_keys=5, hot_min_score=2)
+        hot = [task for task in tasks if task.name.startswith("hot ")]
+        assert [task.name for task in hot] == ['hot movie/7_{"language": "en-US"}']
+        assert hot[0].fn() == {"id": 7}
+
+
+def test_empty_or_degraded_refreshes_are_failures_retried_next_tick(tmp_path):
+    """Swallowed TMDB failures keep the task due instead of stamping it refreshed."""
+    def degraded():
+        g.tmdb_degraded = True
+        return [{"id": 1}]
+
+    tasks = [
+        RefreshTask("ok", 600, lambda: [{"id": 1}]),
+        RefreshTask("empty", 600, lambda: []),
+        RefreshTask("degraded", 600, degraded),
+    ]
+
+    def build():
+        return CacheRefreshScheduler(lambda: tasks, lambda task: _run_refresh_task(app, task), state_dir=tmp_path)
+
+    first = build().run_once(now_ts=1000)
+    assert first["refreshed"] == ["ok"]
+    assert sorted(first["failed"]) == ["degraded", "empty"]
+    assert sorted(build().run_once(now_ts=1060)["failed"]) == ["degraded", "empty"]
+
+
+def test_hot_keys_tmdb_reports_missing_are_not_refetched_every_tick(monkeypatch, tmp_path):
+    """A hot 404 key counts as refreshed and drops out of the warm set while its negative entry lives."""
+    requested = []
+
+    def fake_request(base_url, endpoint, params, request_timeout, retries):
+        requested.append(endpoint)
+        return negative_entry(404) if endpoint == "movie/404" else {"id": 7}
+
+    monkeypatch.setattr(TMDBService, "_request_with_retries", staticmethod(fake_request))
+    monkeypatch.setattr(TMDBService, "cache", TMDBCache(cache_dir=tmp_path / "cache"))
+    for _ in range(3):
+        TMDBService.cache.access.record("movie/404_{}", "movie/404", {})
+        TMDBService.cache.access.record("movie/7_{}", "movie/7", {})
+    TMDBService.cache.access.flush()
+
+    def hot_tasks():
+        with app.app_context():
+            return [task for task in TMDBService.refresh_tasks("quick", hot_keys=5) if task.name.startswith("hot ")]
+
+    def build():
+        return CacheRefreshScheduler(hot_tasks, lambda task: _run_refresh_task(app, task), state_dir=tmp_path)
+
+    first = build().run_once(now_ts=1000)
+    assert sorted(first["refreshed"]) == ["hot movie/404_{}", "hot movie/7_{}"]
+    assert first["failed"] == []
+    assert requested.count("movie/404") == 1
+
+    assert [task.name for task in hot_tasks()] == ["hot movie/7_{}"]
+    build().run_once(now_ts=first["finished_at"] + 24 * 3600)
+    assert requested.count("movie/404") == 1
+
+
+def test_warm_set_fetches_each_list_endpoint_once(monkeypatch, tmp_path):
+    """Section and page-1 callers of the same list share one refresh task."""
+    monkeypatch.setattr(TMDBService, "get_genres", staticmethod(lambda: [{"id": 28}, {"id": 35}]))
+    with app.test_request_context():
+        monkeypatch.setattr(TMDBService, "cache", TMDBCache(cache_dir=tmp_path))
+        names = [task.name for task in TMDBService.refresh_tasks("full", genre_count=2)]
+
+    assert len(names) == len(set(names))
+    assert not [name for name in names if "(section)" in name]
+    assert [name for name in names if name.startswith("genre ")] == ["genre 28", "genre 35"]